@@ -0,0 +1,67 @@
+"""Time critical-column classification and check what it detects on known columns.
+
+Run from the `streamlit_app` directory:
+
+    python -m benchmarks.bench_classify --rows 1000000
+
+Each column below has an expected kind (None: nothing sensitive), including
+look-alikes such as status words for SWIFT codes and dates or IP addresses
+for phone numbers. Any column detected otherwise is reported and the exit
+status is 1.
+"""
+import argparse
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from section.utils.classify import classify_columns, detect_values
+from section.utils.helper import CRITICAL_KEYWORDS
+
+# column -> (values, expected kind)
+CASES = {
+    'bic': (['DEUTDEFF', 'BNPAFRPP', 'CHASUS33', 'HSBCGB2LXXX', 'SBININBB104'], 'swift'),
+    'status': (['APPROVED', 'REJECTED', 'TRANSFER', 'WITHDRAW', 'COMPLETE', 'CANCELED'], None),
+    'iban': (['GB82WEST12345698765432', 'DE89370400440532013000', 'FR1420041010050500013M02606'], 'iban'),
+    'telephone': (['+44 20 7946 0958', '(212) 555-0100', '020 7946 0958', '+91 98765 43210'], 'phone'),
+    'value_date': (['2026-10-18', '2025-01-02', '18.10.2026', '01-02-2024'], None),
+    'client_ip': (['192.168.1.10', '10.0.0.1', '172.16.254.3', '8.8.8.8'], None),
+    'contact': (['jane.doe@example.com', 'j.smith@bank.co.uk'], 'email'),
+    'card': (['4111 1111 1111 1111', '5500-0000-0000-0004', '340000000000009'], 'card_number'),
+    # Card numbers read from a CSV with a blank cell come back as float64
+    'card_float': ([4111111111111111.0, 5500000000000004.0, 340000000000009.0, np.nan], 'card_number'),
+    'amount': ([12.5, 99.99, 1500.0, np.nan], None),
+    'account_id': (['1000001', '1000002', '1000003'], None),
+}
+
+
+def make_frame(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({column: rng.choice(values, rows) for column, (values, _) in CASES.items()})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    args = parser.parse_args()
+
+    df = make_frame(args.rows)
+    start = time.perf_counter()
+    classify_columns(df, CRITICAL_KEYWORDS)
+    print(f"classify_columns: {time.perf_counter() - start:8.3f}s  ({args.rows} rows x {len(df.columns)} cols)")
+
+    wrong = 0
+    for column, (_, expected) in CASES.items():
+        detected, share = detect_values(df[column])
+        ok = detected == expected
+        wrong += not ok
+        print(f"{column:12} expected {str(expected):12} detected {str(detected):12} {share:5.2f}"
+              f"{'' if ok else '  <-- wrong'}")
+    if wrong:
+        print(f"{wrong} column(s) misdetected.")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
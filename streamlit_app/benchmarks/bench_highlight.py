@@ -0,0 +1,111 @@
+"""Benchmark the vectorized highlight engine against the original per-cell loop.
+
+Run from the `streamlit_app` directory:
+
+    python -m benchmarks.bench_highlight --rows 200000 --cols 40
+"""
+import argparse
+import time
+
+import numpy as np
+import pandas as pd
+
+from section.utils.diff import compute_change_masks, style_frame
+
+
+def legacy_highlight_critical_and_edited(df, original_df, critical_columns):
+    """The original nested-loop implementation, kept here as the reference."""
+    styles = pd.DataFrame("", index=df.index, columns=df.columns)
+
+    for col in df.columns:
+        for i in df.index:
+            val_df = df.at[i, col]
+            val_orig = original_df.at[i, col] if col in original_df.columns and i in original_df.index else None
+
+            style = ""
+            edited = False
+            if val_orig is not None:
+                if pd.isnull(val_orig) and pd.isnull(val_df):
+                    edited = False
+                elif str(val_df) != str(val_orig):
+                    edited = True
+            elif pd.notnull(val_df):
+                edited = True
+
+            if edited:
+                style = 'background-color: #90ee90; color: black;'
+            elif pd.isnull(val_df):
+                style = 'background-color: yellow;'
+            elif col in critical_columns:
+                style = 'background-color: #ffd8a8; color: black;'
+
+            styles.at[i, col] = style
+
+    return styles
+
+
+def make_frames(rows, cols, edit_ratio=0.01, null_ratio=0.05, seed=0):
+    """Build an original frame and an edited copy with a few changed cells."""
+    rng = np.random.default_rng(seed)
+    data = {}
+    for j in range(cols):
+        kind = j % 4
+        if kind == 0:
+            values = rng.integers(0, 1_000_000, rows).astype('float64')
+        elif kind == 1:
+            values = rng.normal(1000, 250, rows).round(2)
+        elif kind == 2:
+            values = rng.choice(['USD', 'EUR', 'GBP', 'INR'], rows).astype(object)
+        else:
+            values = pd.Series(pd.date_range('2024-01-01', periods=rows, freq='min'))
+        series = pd.Series(values)
+        series[rng.random(rows) < null_ratio] = None
+        data[f'col_{j}'] = series
+    original = pd.DataFrame(data)
+
+    edited = original.copy()
+    n_edits = max(1, int(rows * cols * edit_ratio))
+    for _ in range(n_edits):
+        i = int(rng.integers(0, rows))
+        j = int(rng.integers(0, cols))
+        if j % 4 in (0, 1):
+            edited.iat[i, j] = float(rng.integers(0, 10))
+        elif j % 4 == 2:
+            edited.iat[i, j] = 'JPY'
+    return edited, original
+
+
+def _timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=20_000)
+    parser.add_argument('--cols', type=int, default=40)
+    parser.add_argument('--skip-legacy', action='store_true',
+                        help='Only time the vectorized engine (the loop takes minutes on large frames).')
+    args = parser.parse_args()
+
+    edited, original = make_frames(args.rows, args.cols)
+    critical = [c for i, c in enumerate(edited.columns) if i % 3 == 0]
+
+    def vectorized(df, original_df, critical_columns):
+        masks = compute_change_masks(df, original_df)
+        return style_frame(df, *masks, critical_columns)
+
+    fast, fast_time = _timed(vectorized, edited, original, critical)
+    print(f"vectorized: {fast_time:8.3f}s  ({args.rows} rows x {args.cols} cols)")
+
+    if not args.skip_legacy:
+        slow, slow_time = _timed(legacy_highlight_critical_and_edited, edited, original, critical)
+        print(f"legacy:     {slow_time:8.3f}s")
+        print(f"speedup:    {slow_time / fast_time:8.1f}x")
+        mismatches = int((fast != slow).to_numpy().sum())
+        print(f"mismatching cells: {mismatches}")
+
+
+if __name__ == '__main__':
+    main()
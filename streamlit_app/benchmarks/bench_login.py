@@ -0,0 +1,126 @@
+"""Benchmark login latency under concurrent sessions, old lookup vs the auth layer.
+
+Runs against a throwaway SQLite database with simulated network latency per
+statement. Run from the `streamlit_app` directory:
+
+    python -m benchmarks.bench_login --sessions 32 --logins 20 --latency-ms 20
+"""
+import argparse
+import hashlib
+import os
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+from sqlalchemy import event, text
+
+from section.utils.auth import authenticate, invalidate_credentials
+from section.utils.engines import USERS_DB, configure, get_engine, reset_engines
+from migrations.add_username_indexes import add_username_indexes
+
+
+def _hash(password):
+    return hashlib.sha256(password.encode()).hexdigest()
+
+
+def make_accounts(engine, users, admins):
+    with engine.begin() as conn:
+        for table in ('user_information', 'admin_information'):
+            conn.execute(text(f"DROP TABLE IF EXISTS {table}"))
+            conn.execute(text(f"""
+                CREATE TABLE {table} (
+                    userID INTEGER, username TEXT, password TEXT, email TEXT,
+                    signup_time TEXT, role TEXT
+                )
+            """))
+        for table, count, prefix in (('user_information', users, 'user'), ('admin_information', admins, 'admin')):
+            conn.execute(
+                text(f"INSERT INTO {table} (userID, username, password, email, role) "
+                     f"VALUES (:id, :username, :password, :email, :role)"),
+                [{"id": i, "username": f"{prefix}{i}", "password": _hash(f"pw{i}"),
+                  "email": f"{prefix}{i}@bank.test", "role": prefix} for i in range(count)],
+            )
+
+
+def legacy_login(engine, username, password_hash):
+    """The original flow: SELECT * from users, then from admins, one connection each."""
+    with engine.connect() as conn:
+        user = conn.execute(text("SELECT * FROM user_information WHERE username = :username"),
+                            {"username": username}).fetchone()
+    if user and user._mapping.get('password') == password_hash:
+        return 'user'
+    with engine.connect() as conn:
+        admin = conn.execute(text("SELECT * FROM admin_information WHERE username = :username"),
+                             {"username": username}).fetchone()
+    if admin and admin._mapping.get('password') == password_hash:
+        return 'admin'
+    return None
+
+
+def run(login, engine, names, sessions, logins):
+    def session(seed):
+        rng = np.random.default_rng(seed)
+        timings = []
+        for _ in range(logins):
+            username, password = names[int(rng.integers(len(names)))]
+            start = time.perf_counter()
+            assert login(engine, username, _hash(password)) is not None
+            timings.append(time.perf_counter() - start)
+        return timings
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as pool:
+        timings = [t for result in pool.map(session, range(sessions)) for t in result]
+    wall = time.perf_counter() - start
+    timings.sort()
+    return {
+        'p50_ms': 1000 * statistics.median(timings),
+        'p95_ms': 1000 * timings[int(0.95 * (len(timings) - 1))],
+        'logins_per_s': len(timings) / wall,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--users', type=int, default=50_000)
+    parser.add_argument('--admins', type=int, default=50)
+    parser.add_argument('--active-users', type=int, default=100,
+                        help='Distinct accounts logging in during the spike.')
+    parser.add_argument('--sessions', type=int, default=16)
+    parser.add_argument('--logins', type=int, default=20)
+    parser.add_argument('--latency-ms', type=float, default=10.0,
+                        help='Simulated network round trip added to every statement.')
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(), 'bench_login.db')
+    configure(USERS_DB, url=f'sqlite:///{path}', pool_size=args.sessions)
+    engine = get_engine(USERS_DB)
+    make_accounts(engine, args.users, args.admins)
+    add_username_indexes(engine)
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _round_trip(*_):
+        time.sleep(args.latency_ms / 1000)
+
+    # Mostly users, some admins (the slow path before: two queries)
+    names = [(f"user{i}", f"pw{i}") for i in range(0, args.users, max(1, args.users // args.active_users))]
+    names += [(f"admin{i}", f"pw{i}") for i in range(args.admins)]
+
+    results = {'legacy': run(legacy_login, engine, names, args.sessions, args.logins)}
+    invalidate_credentials()
+    results['auth (cold cache)'] = run(lambda e, u, p: (invalidate_credentials(u), authenticate(e, u, p))[1],
+                                       engine, names, args.sessions, args.logins)
+    invalidate_credentials()
+    results['auth (ttl cache)'] = run(authenticate, engine, names, args.sessions, args.logins)
+
+    print(f"{args.sessions} sessions x {args.logins} logins, {args.latency_ms:g} ms per statement")
+    for name, result in results.items():
+        print(f"{name:18} p50 {result['p50_ms']:8.2f} ms   p95 {result['p95_ms']:8.2f} ms   "
+              f"{result['logins_per_s']:8.1f} logins/s")
+    reset_engines()
+
+
+if __name__ == '__main__':
+    main()
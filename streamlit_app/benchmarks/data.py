@@ -0,0 +1,45 @@
+"""Synthetic banking datasets for the benchmarks."""
+import numpy as np
+import pandas as pd
+
+CURRENCIES = ['USD', 'EUR', 'GBP', 'INR', 'JPY', 'SGD']
+TRANSACTION_TYPES = ['deposit', 'withdrawal', 'transfer', 'payment', 'fee', 'interest']
+
+
+def make_banking_frame(rows, null_ratio=0.02, cardinality=0.1, seed=0):
+    """A transactions table with account, transaction, amount, date and currency columns.
+
+    `cardinality` is the number of distinct accounts (and customer names and
+    branches scale with it) as a share of `rows`; `null_ratio` is the share
+    of missing values in the nullable columns.
+    """
+    rng = np.random.default_rng(seed)
+    accounts = max(1, int(rows * cardinality))
+    account_ids = rng.integers(1_000_000, 1_000_000 + accounts, rows)
+    branches = max(1, accounts // 100)
+
+    df = pd.DataFrame({
+        'transaction_id': np.arange(1, rows + 1, dtype='int64'),
+        'account_id': account_ids,
+        'customer_name': 'Customer ' + pd.Series(account_ids % 997_331).astype(str),
+        'branch': 'BR' + pd.Series(rng.integers(0, branches, rows)).astype(str).str.zfill(4),
+        'transaction_type': rng.choice(TRANSACTION_TYPES, rows),
+        'amount': rng.lognormal(4, 1.2, rows).round(2),
+        'balance': rng.normal(25_000, 9_000, rows).round(2),
+        'currency': rng.choice(CURRENCIES, rows, p=[0.4, 0.25, 0.15, 0.1, 0.05, 0.05]),
+        'transaction_date': pd.Timestamp('2023-01-01') + pd.to_timedelta(rng.integers(0, 730 * 86_400, rows), unit='s'),
+    })
+    for col in ('amount', 'branch', 'currency', 'transaction_type'):
+        missing = rng.random(rows) < null_ratio
+        df[col] = df[col].where(~missing)
+    return df
+
+
+def edit_frame(df, ratio=0.01, seed=1):
+    """A copy of `df` with a share of amounts changed, as if edited in the dashboard."""
+    rng = np.random.default_rng(seed)
+    edited = df.copy()
+    rows = rng.choice(len(df), max(1, int(len(df) * ratio)), replace=False)
+    column = edited.columns.get_loc('amount')
+    edited.iloc[rows, column] = rng.lognormal(4, 1.2, len(rows)).round(2)
+    return edited
@@ -0,0 +1,219 @@
+"""Time the dashboard's hot paths on synthetic banking data and compare with a baseline.
+
+Run from the `streamlit_app` directory:
+
+    python -m benchmarks.run_suite --sizes 10000 100000 --output bench_results.json
+    python -m benchmarks.run_suite --save-baseline          # store benchmarks/baseline.json
+    python -m benchmarks.run_suite --baseline other_results.json --tolerance 1.25
+
+Results are written as JSON (one record per benchmark and size, plus the
+library versions). They are compared with `--baseline`, or with the
+committed benchmarks/baseline.json when none is given; any benchmark more
+than `--tolerance` times slower is reported and the exit status is 1.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+import sqlalchemy
+
+from benchmarks.data import edit_frame, make_banking_frame
+from section.utils.engines import DATA_DB, configure, reset_engines
+from section.utils.helper import (CRITICAL_KEYWORDS, highlight_critical_and_edited, identify_critical_columns,
+                                  save_dataframe_to_db, search_database)
+from section.utils.classify import classify_columns
+from section.utils.export import available_formats, write_export
+from section.utils.impute import run_plan
+from section.utils.ingest import read_delimited, read_excel, read_json_lines
+from section.utils.optimize import optimize_dtypes
+from section.utils.query_cache import clear_results
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(__file__), 'baseline.json')
+# openpyxl writes and reads a few thousand rows a second; larger sizes skip XLSX
+MAX_XLSX_ROWS = 100_000
+# Styling builds one CSS string per cell; larger sizes skip it
+MAX_STYLE_ROWS = 1_000_000
+# Timings below this are too noisy to flag as regressions
+NOISE_FLOOR = 0.001
+
+
+def _time(fn, repeats):
+    """Best and median wall time of `repeats` calls (the result of the last call is returned)."""
+    timings = []
+    result = None
+    for _ in range(repeats):
+        start = time.perf_counter()
+        result = fn()
+        timings.append(time.perf_counter() - start)
+    return min(timings), statistics.median(timings), result
+
+
+def _write_inputs(df, directory, rows):
+    paths = {
+        'csv': os.path.join(directory, f'{rows}.csv'),
+        'txt': os.path.join(directory, f'{rows}.txt'),
+        'json': os.path.join(directory, f'{rows}.json'),
+    }
+    df.to_csv(paths['csv'], index=False)
+    df.to_csv(paths['txt'], index=False, sep='\t')
+    df.to_json(paths['json'], orient='records', lines=True, date_format='iso')
+    if rows <= MAX_XLSX_ROWS:
+        paths['xlsx'] = os.path.join(directory, f'{rows}.xlsx')
+        df.to_excel(paths['xlsx'], index=False)
+    return paths
+
+
+def _reader(path, read, *args, **kwargs):
+    def run():
+        with open(path, 'rb') as f:
+            return read(f, *args, **kwargs)
+    return run
+
+
+def run_size(rows, directory, repeats, null_ratio, cardinality):
+    df = make_banking_frame(rows, null_ratio=null_ratio, cardinality=cardinality)
+    paths = _write_inputs(df, directory, rows)
+    cases = [
+        ('load.csv (arrow)', _reader(paths['csv'], read_delimited, ',')),
+        ('load.csv (pandas)', _reader(paths['csv'], read_delimited, ',', use_arrow=False)),
+        ('load.txt', _reader(paths['txt'], read_delimited, '\t')),
+        ('load.json', _reader(paths['json'], read_json_lines)),
+    ]
+    if 'xlsx' in paths:
+        cases.append(('load.xlsx', _reader(paths['xlsx'], read_excel)))
+    cases.append(('optimize_dtypes', lambda: optimize_dtypes(df)))
+
+    optimized, _ = optimize_dtypes(df)
+    edited = edit_frame(optimized)
+    critical = identify_critical_columns(optimized.columns, CRITICAL_KEYWORDS)
+    cases.append(('identify_critical_columns', lambda: identify_critical_columns(optimized.columns, CRITICAL_KEYWORDS)))
+    cases.append(('classify_columns', lambda: classify_columns(optimized, CRITICAL_KEYWORDS)))
+    impute_plan = [('amount', 'group median', None, 'account_id'), ('branch', 'group mode', None, 'account_id'),
+                   ('currency', 'mode', None, None), ('transaction_type', 'constant', 'unknown', None)]
+    cases.append(('impute plan', lambda: run_plan(optimized, impute_plan)))
+    if rows <= MAX_STYLE_ROWS:
+        cases.append(('highlight_critical_and_edited', lambda: highlight_critical_and_edited(edited, optimized, critical)))
+
+    for label in available_formats():
+        if label != 'Excel (XLSX)' or rows <= MAX_XLSX_ROWS:
+            cases.append((f'export {label}', lambda label=label: write_export(optimized, label, os.path.join(directory, 'export'))))
+
+    table = f'bench_{rows}'
+
+    def save_full():
+        ok, message = save_dataframe_to_db(optimized, table, incremental=False)
+        assert ok, message
+
+    def save_delta():
+        ok, message = save_dataframe_to_db(edited, table)
+        assert ok, message
+        ok, message = save_dataframe_to_db(optimized, table)  # and back, so each repeat does the same work
+        assert ok, message
+
+    query = (f"SELECT currency, COUNT(*) AS n, SUM(amount) AS total FROM {table} "
+             f"WHERE amount > 100 GROUP BY currency")
+
+    def search_cold():
+        clear_results()
+        return search_database(query)
+
+    cases += [
+        ('save_dataframe_to_db (full)', save_full),
+        ('save_dataframe_to_db (delta x2)', save_delta),
+        ('search_database', search_cold),
+        ('search_database (cached)', lambda: search_database(query)),
+    ]
+
+    results = []
+    for name, fn in cases:
+        best, median, _ = _time(fn, repeats)
+        results.append({'benchmark': name, 'rows': rows, 'best_s': best, 'median_s': median,
+                        'rows_per_s': rows / best if best else None, 'repeats': repeats})
+        print(f"{name:34} {rows:>10,} rows  best {best:9.4f}s  median {median:9.4f}s")
+    return results
+
+
+def environment():
+    import streamlit
+    return {
+        'timestamp': pd.Timestamp.now().isoformat(timespec='seconds'),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+        'sqlalchemy': sqlalchemy.__version__,
+        'streamlit': streamlit.__version__,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Slowdowns against the baseline, as (benchmark, rows, ratio) tuples sorted worst first."""
+    previous = {(r['benchmark'], r['rows']): r['best_s'] for r in baseline['results']}
+    regressions = []
+    for r in results:
+        before = previous.get((r['benchmark'], r['rows']))
+        if before:
+            ratio = r['best_s'] / before
+            slower = ratio > tolerance and r['best_s'] > NOISE_FLOOR
+            marker = '  <-- slower' if slower else ''
+            print(f"{r['benchmark']:34} {r['rows']:>10,} rows  {before:9.4f}s -> {r['best_s']:9.4f}s  x{ratio:5.2f}{marker}")
+            if slower:
+                regressions.append((r['benchmark'], r['rows'], ratio))
+    return sorted(regressions, key=lambda r: -r[2])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000],
+                        help='Row counts to generate (up to 10,000,000).')
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--null-ratio', type=float, default=0.02)
+    parser.add_argument('--cardinality', type=float, default=0.1,
+                        help='Distinct accounts as a share of rows.')
+    parser.add_argument('--database-url', default=None,
+                        help='Database for the save/search benchmarks (default: a temporary SQLite file).')
+    parser.add_argument('--output', default='bench_results.json')
+    parser.add_argument('--baseline', default=None,
+                        help=f'Results file to compare against (default: {DEFAULT_BASELINE} if it exists).')
+    parser.add_argument('--save-baseline', action='store_true', help=f'Also write the results to {DEFAULT_BASELINE}.')
+    parser.add_argument('--tolerance', type=float, default=1.25,
+                        help='Slowdown factor against the baseline that counts as a regression.')
+    args = parser.parse_args()
+    # Saving a new baseline does not compare against the one it replaces, unless asked to
+    if args.baseline is None and not args.save_baseline and os.path.exists(DEFAULT_BASELINE):
+        args.baseline = DEFAULT_BASELINE
+
+    with tempfile.TemporaryDirectory() as directory:
+        configure(DATA_DB, url=args.database_url or f"sqlite:///{os.path.join(directory, 'bench.db')}")
+        try:
+            results = [r for rows in args.sizes
+                       for r in run_size(rows, directory, args.repeats, args.null_ratio, args.cardinality)]
+        finally:
+            reset_engines()
+
+    report = {'environment': environment(), 'results': results}
+    for path in [args.output] + ([DEFAULT_BASELINE] if args.save_baseline else []):
+        with open(path, 'w') as f:
+            json.dump(report, f, indent=2)
+        print(f"Results written to {path}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        # Timings only compare on similar machines; the baseline records where it was taken
+        print(f"Compared with {args.baseline} (taken on {baseline['environment']['platform']}):")
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"{len(regressions)} benchmark(s) slower than x{args.tolerance} of the baseline.")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,48 @@
+"""Index `username` on the account tables, so each login is one index lookup.
+
+A one-off setup step, run once per database (it skips tables already
+indexed). Run from the `streamlit_app` directory with the same settings as
+the app (`DATABASE_2_URL`, `BANKING_DB_CONFIG` or the DB_* variables):
+
+    python -m migrations.add_username_indexes
+"""
+import sys
+
+from sqlalchemy import text
+
+from section.utils.engines import USERS_DB, get_engine
+from section.utils.schema import table_info
+
+ACCOUNT_TABLES = ('user_information', 'admin_information')
+
+
+def add_username_indexes(engine):
+    """Create the missing `username` indexes; returns {table: what happened}."""
+    outcome = {}
+    for table in ACCOUNT_TABLES:
+        info = table_info(engine, table)
+        if any(index['columns'][:1] == ['username'] for index in info['indexes']):
+            outcome[table] = 'already indexed'
+            continue
+        column_type = next(c['type'] for c in info['columns'] if c['name'] == 'username')
+        # MySQL can only index a prefix of TEXT/BLOB columns
+        prefix = '(191)' if engine.dialect.name == 'mysql' and column_type.upper() in ('TEXT', 'BLOB') else ''
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE INDEX ix_{table}_username ON {table} (username{prefix})"))
+        outcome[table] = 'index created'
+    return outcome
+
+
+def main():
+    engine = get_engine(USERS_DB)
+    try:
+        outcome = add_username_indexes(engine)
+    except Exception as e:
+        print(f"Could not index {engine.url.render_as_string(hide_password=True)}: {e}")
+        sys.exit(1)
+    for table, result in outcome.items():
+        print(f"{table:20} {result}")
+
+
+if __name__ == '__main__':
+    main()
@@ -3,23 +3,388 @@ import pandas as pd
 import plotly.express as px
 import numpy as np
 from streamlit import column_config
-from section.utils.helper import save_dataframe_to_db, search_database, highlight_critical_and_edited, identify_critical_columns, CRITICAL_KEYWORDS, is_safe_sql
+from section.utils.helper import (save_dataset, start_search, search_is_current, explain_search, CRITICAL_KEYWORDS,
+                                  is_safe_sql)
 from section.database import database_page
 from section.user import user_page
+from section.performance import performance_page
+from section.utils.ingest import read_delimited, read_excel, read_json_lines
+from section.utils.optimize import content_hash
+from section.utils.disk_cache import add_owner, disown, list_datasets, remove_dataset, store_dataset
+from section.utils.shared_store import holders, lookup, share
+from section.utils.classify import dataset_classification
+from section.utils.charts import MAX_POINTS, TOP_N, downsample, histogram_bins, numeric_columns, top_n
+from section.utils.correlation import (LABEL_COLUMNS, METHODS, PRECISIONS, TOP_K, WIDE_COLUMNS, dataset_correlation,
+                                       strongest_pairs)
+from section.utils.diff import compute_change_masks, style_frame
+from section.utils.window import (EDITOR_PAGE_SIZE, EDITOR_PAGE_SIZES, REVIEW_PAGE_SIZE, STYLE_CELL_BUDGET,
+                                  change_summary, dataset_null_counts, dataset_window_order, page_of)
+from section.utils.convert import TARGETS as CONVERSION_TARGETS, convert_columns, dataset_schema
+from section.utils.impute import (STRATEGIES as IMPUTE_STRATEGIES, dataset_preview as dataset_impute_preview,
+                                  run_plan as run_impute_plan)
+from section.utils.export import FORMATS as EXPORT_FORMATS, available_formats, cached_export, export_file
+from section.utils.explain import history_summary, record_query
+from section.utils.perf import Aggregates, bind_session, laps
+from section.utils.profile import APPROX_THRESHOLD, numeric_summary_table, profile_dataframe
+
+
+def query_results():
+    """Results of the SQL search box; polls while the query runs in the background."""
+    handle = st.session_state.get('query_handle')
+    if handle is None:
+        return
+    if handle.running:
+        st.info(f"⏳ Running query... {handle.elapsed:.1f}s")
+        if st.button("⏹️ Cancel query", key="cancel_query"):
+            handle.cancel()
+        return
+    if st.session_state.get('query_polling'):
+        # Finished while polling: rerun the app once so the fragment stops polling
+        st.session_state.query_polling = False
+        st.rerun()
+    if handle.error is None and not getattr(handle, 'recorded', False):
+        record_query(st.session_state.setdefault('query_history', []), handle.sql, handle.stats)
+        handle.recorded = True
+
+    if handle.error is not None:
+        st.error(f"Query Error: {handle.error}")
+    elif handle.frame is None:
+        st.info("No data returned for the query.")
+    else:
+        st.dataframe(handle.frame)
+        stats = handle.stats
+        first_row = handle.page * handle.row_cap
+        caption = (f"Rows {first_row + 1:,}–{first_row + stats['rows']:,} · "
+                   f"{stats['bytes'] / 1024**2:.2f} MB · {stats['seconds']:.2f}s")
+        if stats['cached']:
+            caption += " · cached"
+
+        if stats['stopped_by'] in ('byte budget', 'cancelled'):
+            caption += f" · stopped by {stats['stopped_by']}"
+        elif stats['stopped_by'] == 'row cap' and not stats['has_more']:
+            caption += f" · first {handle.row_cap:,} rows only"
+        st.caption(caption)
+
+        export_panel(handle.frame, ('query', handle.uid), "query_results", key="query_export")
+
+        col1, col2 = st.columns(2)
+        with col1:
+            if handle.page > 0 and st.button("⏮️ Previous page", key="query_previous"):
+                st.session_state.query_handle = start_search(handle.sql, **handle.page_limits(handle.page - 1))
+                st.rerun()
+        with col2:
+            if stats['has_more'] and stats['stopped_by'] != 'byte budget' and st.button("⏭️ Next page", key="query_next"):
+                st.session_state.query_handle = start_search(handle.sql, **handle.page_limits(handle.page + 1))
+                st.rerun()
+
+
+def export_panel(frame, data_key, file_stem, key):
+    """Format picker and download button; files are only written when asked for, then kept per `data_key`."""
+    formats = available_formats()
+    col1, col2 = st.columns([1, 2])
+    label = col1.selectbox("Format", formats, key=f"{key}_format", label_visibility="collapsed")
+    extension, mime = EXPORT_FORMATS[label]
+    path = cached_export(data_key, label)
+    if path is None and col2.button(f"📦 Prepare {label}", key=f"{key}_prepare"):
+        try:
+            path = export_file(frame, label, data_key)
+        except Exception as e:
+            st.error(f"Export Error: {e}")
+    if path is not None:
+        def read_export():
+            with open(path, 'rb') as f:
+                return f.read()
+        # Read only when the button is clicked, not on every rerun that shows it
+        col2.download_button(f"⬇️ Download {label}", read_export, f"{file_stem}.{extension}", mime, key=key)
+
+
+def explain_panel(sql):
+    """Plan of the search query, flagged full scans and this session's query history."""
+    analyze = st.checkbox("Use EXPLAIN ANALYZE (runs the query)", key="explain_analyze")
+    history = st.session_state.setdefault('query_history', [])
+    explained = st.session_state.get('explain_result')
+    if explained is None or explained[0] != (sql, analyze):
+        try:
+            plan, warnings, seconds = explain_search(sql, analyze)
+        except Exception as e:
+            st.error(f"Explain Error: {e}")
+            return
+        explained = ((sql, analyze), plan, warnings, seconds)
+        st.session_state.explain_result = explained
+        record_query(history, sql, {'seconds': seconds, 'rows': len(plan)}, mode='analyze' if analyze else 'explain')
+
+    _, plan, warnings, seconds = explained
+    st.dataframe(plan, hide_index=True)
+    st.caption(f"Plan computed in {seconds:.3f}s")
+    for warning in warnings:
+        st.warning(f"⚠️ {warning}")
+    if not warnings:
+        st.success("No full table scans on dataset tables.")
+
+    summary = history_summary(history)
+    if not summary.empty:
+        st.markdown("##### ⏱️ Query history (this session)")
+        st.dataframe(summary)
+        with st.expander("All runs"):
+            st.dataframe(pd.DataFrame(history).iloc[::-1], hide_index=True)
+
+
+def edit_window(dataset, table_name, col_configs):
+    """Edit one filtered, sorted page of the dataset; edits are merged back by row label."""
+    columns = list(dataset.current.columns)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_column = st.selectbox("Sort by", [None] + columns, key="edit_sort")
+        descending = st.checkbox("Descending", key="edit_desc", disabled=sort_column is None)
+    with col2:
+        filter_column = st.selectbox("Filter column", [None] + columns, key="edit_filter_col")
+        filter_text = st.text_input("Contains", key="edit_filter_text", disabled=filter_column is None)
+    with col3:
+        page_size = st.selectbox("Rows per page", EDITOR_PAGE_SIZES,
+                                 index=EDITOR_PAGE_SIZES.index(EDITOR_PAGE_SIZE), key="edit_page_size")
+
+    # Filtering and sorting happen here; only the current page goes to the browser
+    positions = dataset_window_order(dataset, filter_column, filter_text, sort_column, descending)
+    pages = max(1, -(-len(positions) // page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="edit_page") - 1
+    window = page_of(dataset.current, positions, page, page_size)
+
+    # A new version or window gets a fresh editor, so old edits are never replayed
+    signature = (dataset.version, sort_column, descending, filter_column, filter_text, page_size, page)
+    edited_df = st.data_editor(
+        window,
+        use_container_width=True,
+        num_rows="dynamic",
+        key=f"editable_table_{abs(hash(signature))}",
+        column_config=col_configs
+    )
+    st.caption(f"Rows {page * page_size + min(1, len(window)):,}–{page * page_size + len(window):,} "
+               f"of {len(positions):,} ({len(dataset.current):,} in the dataset)")
+
+    # Journal whatever the editor changed in this window
+    before = dataset.version
+    if dataset.apply_frame(edited_df, labels=window.index):
+        changed_rows = dataset.rows_changed_since(before)
+        # Auto-save to database, hashing only the changed rows
+        save_successful, message = save_dataset(dataset, table_name)
+        if save_successful:
+            st.success(f"{len(changed_rows) if changed_rows is not None else 'All'} rows changed; "
+                       "saved to database automatically")
+        else:
+            st.error(f"Error saving changes: {message}")
+
+
+def review_changes(dataset, critical_columns):
+    """Changed cells with old and new values, per-column counts, and a budgeted styled view."""
+    changes = dataset.change_set()
+    nulls = dataset_null_counts(dataset)
+    current = dataset.current
+    budget = st.sidebar.number_input("Styled table cell budget", min_value=0, value=STYLE_CELL_BUDGET,
+                                     step=50_000, help="Tables with more cells show the change review only")
+    cells = current.shape[0] * current.shape[1]
+    views = ["Changes", "Highlighted rows"] + (["Full table"] if cells <= budget else [])
+    view = st.radio("View", views, horizontal=True, key="review_view")
+    if cells > budget:
+        st.caption(f"Full styled table hidden: {cells:,} cells is over the budget of {budget:,}.")
+
+    summary = change_summary(changes, nulls)
+    st.dataframe(summary[(summary['changed'] > 0) | (summary['nulls'] > 0)], hide_index=True)
+
+    if view == "Full table":
+        edited_mask, null_mask = dataset.change_masks()
+        st.write(current.style.apply(
+            lambda x: style_frame(current, edited_mask, null_mask, critical_columns),
+            axis=None
+        ))
+        return
+
+    if view == "Changes":
+        rows = changes
+    else:
+        labels = changes['row'].dropna()
+        rows = pd.Index(labels[labels.isin(current.index)].unique())
+    if len(rows) == 0:
+        st.info("No changes yet.")
+        return
+    pages = -(-len(rows) // REVIEW_PAGE_SIZE)
+    page = st.number_input(f"Review page (of {pages})", min_value=1, max_value=pages, value=1,
+                           key=f"review_page_{view}") - 1
+    start = page * REVIEW_PAGE_SIZE
+    if view == "Changes":
+        shown = rows.iloc[start:start + REVIEW_PAGE_SIZE].astype({'old_value': str, 'new_value': str})
+        st.dataframe(shown, hide_index=True)
+    else:
+        shown = current.loc[rows[start:start + REVIEW_PAGE_SIZE]]
+        base = dataset.base
+        edited_mask, null_mask = compute_change_masks(shown, base.loc[base.index.intersection(shown.index)])
+        st.write(shown.style.apply(
+            lambda x: style_frame(shown, edited_mask, null_mask, critical_columns),
+            axis=None
+        ))
+    st.caption(f"{len(rows):,} {'changed cells' if view == 'Changes' else 'changed rows'}")
+
+
+def imputation_plan(dataset, table_name, null_cols):
+    """Plan null fills for many columns, preview them, then apply them as one edit with one save."""
+    st.subheader("Null Value Imputation Options")
+    df = dataset.current
+    plan_rows = pd.DataFrame({
+        "column": null_cols,
+        "dtype": [str(df[c].dtype) for c in null_cols],
+        "nulls": [int(n) for n in dataset_null_counts(dataset)[null_cols]],
+        "strategy": "skip",
+        "value": "",
+        "group_by": None,
+    })
+    edited = st.data_editor(
+        plan_rows,
+        hide_index=True,
+        num_rows="fixed",
+        disabled=["column", "dtype", "nulls"],
+        column_config={
+            "strategy": st.column_config.SelectboxColumn("Strategy", options=list(IMPUTE_STRATEGIES), required=True),
+            "value": st.column_config.TextColumn("Constant", help="Used by the constant strategy"),
+            "group_by": st.column_config.SelectboxColumn(
+                "Group by", options=[str(c) for c in df.columns],
+                help="Used by the group strategies, e.g. median amount per account_id"),
+        },
+        key=f"impute_plan_{abs(hash(tuple(null_cols)))}",
+    )
+    plan = [(row.column, row.strategy, row.value if isinstance(row.value, str) else "",
+             row.group_by if isinstance(row.group_by, str) else None)
+            for row in edited.itertuples(index=False) if row.strategy != "skip"]
+    if not plan:
+        st.caption("Pick a strategy for each column to fill, then apply them all at once.")
+        return
+
+    preview = dataset_impute_preview(dataset, plan)
+    st.dataframe(
+        preview,
+        hide_index=True,
+        column_config={
+            "nulls_before": st.column_config.NumberColumn("Nulls before"),
+            "nulls_after": st.column_config.NumberColumn("Nulls after"),
+            "filled": st.column_config.NumberColumn("Filled"),
+        },
+    )
+    runnable = preview[preview['problem'].isna()]
+    if st.button(f"Replace Nulls in {len(runnable)} columns", disabled=runnable.empty or not runnable['filled'].any()):
+        # One journal entry (one undo step) and one save for the whole plan
+        changed = dataset.update_columns(run_impute_plan(dataset.current, plan))
+        save_successful, message = save_dataset(dataset, table_name)
+        if save_successful:
+            # Shown after the rerun, once the table reflects the fills
+            st.session_state.impute_message = (
+                f"Filled {int(runnable['filled'].sum()):,} nulls in {changed} columns and saved to database.")
+            st.rerun()
+        st.error(f"Error saving changes: {message}")
+
+
+def type_conversions(dataset):
+    """Proposed types for every column (from a sample), converted together as one edit."""
+    report = st.session_state.pop('conversion_report', None)
+    if report is not None:
+        st.success(f"Converted {len(report)} columns; {int(report['coerced_to_null'].sum()):,} values "
+                   "could not be parsed and became null.")
+        st.dataframe(report, hide_index=True)
+
+    proposals = dataset_schema(dataset)
+    plan_rows = proposals.rename_axis('column').reset_index()
+    plan_rows['format'] = plan_rows['format'].astype(object).where(plan_rows['format'].notna(), "")
+    edited = st.data_editor(
+        plan_rows,
+        hide_index=True,
+        num_rows="fixed",
+        disabled=["column", "current", "parsed_share", "example"],
+        column_config={
+            "target": st.column_config.SelectboxColumn("Convert to", options=CONVERSION_TARGETS, required=True),
+            "format": st.column_config.TextColumn(
+                "Format", help="Date format (e.g. %d/%m/%Y) or the decimal mark of numbers ('.' or ',')"),
+            "parsed_share": st.column_config.ProgressColumn(
+                "Parsed (sample)", min_value=0.0, max_value=1.0, format="%.2f"),
+        },
+        key=f"convert_plan_{abs(hash(tuple(proposals['target'].items())))}",
+    )
+    plan = {row.column: (row.target, row.format or None)
+            for row in edited.itertuples(index=False) if row.target != 'keep'}
+    st.caption("Money columns become exact decimals; values that do not parse become null and are counted.")
+    if st.button(f"💾 Convert {len(plan)} columns", disabled=not plan):
+        try:
+            converted, report = convert_columns(dataset.current, plan)
+        except Exception as e:
+            st.error(f"Error changing data types: {e}")
+            return
+        # One journal entry, so a single undo restores every column
+        dataset.update_columns(converted)
+        st.session_state.conversion_report = report
+        st.rerun()
+
+
+def open_dataset(dataset, token, name, report, original_dtypes):
+    """Make `dataset` (from the shared store) this session's dataset, as if `name` had just been uploaded.
+
+    The session's VersionedDataset is its copy-on-write overlay: the shared
+    base is read, edited columns are copied into the session.
+    """
+    st.session_state.dataset = dataset
+    st.session_state.uploaded_filename = name
+    st.session_state.dataset_token = token
+    st.session_state.optimization_report = report
+    st.session_state.original_dtypes = original_dtypes
+    st.session_state.upload_error = None
+
+
+def cached_datasets_sidebar():
+    """Reopen (or drop) datasets kept in the on-disk cache without uploading them again.
+
+    Users see the files they uploaded; admins see every cached file.
+    """
+    is_admin = st.session_state.get('user_role') == 'admin'
+    cached = list_datasets(None if is_admin else st.session_state.get('username'))
+    if cached.empty:
+        return
+    with st.sidebar.expander(f"🗄️ Cached datasets ({len(cached)})"):
+        st.dataframe(pd.DataFrame({
+            "Name": cached['name'],
+            "Rows": cached['rows'],
+            "MB": (cached['bytes'] / 1024**2).round(1),
+            "Last opened": cached['last_access'].dt.strftime('%Y-%m-%d %H:%M'),
+        }), hide_index=True)
+        labels = dict(zip(cached['token'], cached['name']))
+        token = st.selectbox("Dataset", list(labels), format_func=lambda t: f"{labels[t]} ({t[:8]})",
+                             key="cached_dataset")
+        col1, col2 = st.columns(2)
+        if col1.button("📂 Open", key="open_cached_dataset"):
+            shared = lookup(token, st.session_state.get('username'))
+            if shared is None:
+                st.error("That dataset is no longer in the cache.")
+            else:
+                dataset, meta = shared
+                open_dataset(dataset, token, meta['name'], meta['report'], meta['original_dtypes'])
+                st.rerun()
+        if col2.button("🗑️ Remove", key="remove_cached_dataset"):
+            # Users only drop their own copy; the file stays while someone else uploaded it
+            if is_admin:
+                remove_dataset(token)
+            else:
+                disown(token, st.session_state.get('username'))
+            st.rerun()
 
 
 def show_dashboard():
+    # Per-section timings for the ⏱ Performance page (no-ops unless recording)
+    bind_session(st.session_state.setdefault('perf_spans', Aggregates()), st.session_state.get('username'))
+    timer = laps('dashboard')
+
     # Session State Initialization
-    if 'uploaded_data' not in st.session_state:
-        st.session_state.uploaded_data = None
+    if 'dataset' not in st.session_state:
+        st.session_state.dataset = None
     if 'active_page' not in st.session_state:
         st.session_state.active_page = "Dashboard"
     if 'uploaded_filename' not in st.session_state:
         st.session_state.uploaded_filename = None
     if 'upload_error' not in st.session_state:
         st.session_state.upload_error = None
-    if 'original_data' not in st.session_state:
-        st.session_state.original_data = None
     if 'original_dtypes' not in st.session_state:
         st.session_state.original_dtypes = None
 
@@ -28,6 +393,10 @@ def show_dashboard():
     "🗃️ Database": "Database",
     "👮 User": "User"
     }
+    if st.session_state.get('user_role') == 'admin':
+        page_map["⏱ Performance"] = "Performance"
+    if st.session_state.active_page not in page_map.values():
+        st.session_state.active_page = "Dashboard"
     
     if "active_page" not in st.session_state:
         st.session_state.active_page = "Dashboard"
@@ -44,102 +413,116 @@ def show_dashboard():
     st.sidebar.title("Upload File")
     uploaded_file = st.sidebar.file_uploader("Choose a file", type=["csv", "xlsx", "txt", "json"])
 
-    if uploaded_file and uploaded_file != st.session_state.get('uploaded_filename'):
+    # A different upload (not just a rerun with the same file) resets the dataset
+    is_new_upload = uploaded_file is not None and uploaded_file.file_id != st.session_state.get('uploaded_file_id')
+    if is_new_upload:
         st.session_state.upload_error = None
         # Clear previous data if new file is selected
-        st.session_state.uploaded_data = None
+        st.session_state.dataset = None
         st.session_state.uploaded_filename = None
 
-    if uploaded_file:
-        @st.cache_data(show_spinner="Loading file...")
+    if is_new_upload:
         def load_file(uploaded_file):
             try:
                 if uploaded_file.size == 0:
                     return None, "Uploaded file is empty (0 bytes)"
 
                 file_ext = uploaded_file.name.split('.')[-1].lower()
+                progress_bar = st.progress(0.0, text=f"Reading {uploaded_file.name}...")
 
-                if file_ext == 'csv':
-                    try:
-                        return pd.read_csv(uploaded_file, low_memory=False), None
-                    except UnicodeDecodeError:
+                def report(fraction):
+                    progress_bar.progress(fraction, text=f"Reading {uploaded_file.name}... {fraction:.0%}")
+
+                try:
+                    if file_ext == 'csv':
                         try:
-                            return pd.read_csv(uploaded_file, encoding='latin1', low_memory=False), None
+                            return read_delimited(uploaded_file, ',', progress=report), None
                         except Exception as e:
                             return None, f"CSV Error: {str(e)}"
 
-                elif file_ext == 'xlsx':
-                    try:
-                        return pd.read_excel(uploaded_file), None
-                    except Exception as e:
-                        return None, f"Excel Error: {str(e)}"
+                    elif file_ext == 'xlsx':
+                        try:
+                            return read_excel(uploaded_file, progress=report), None
+                        except Exception as e:
+                            return None, f"Excel Error: {str(e)}"
 
-                elif file_ext == 'txt':
-                    try:
-                        return pd.read_csv(uploaded_file, delimiter='\t', low_memory=False), None
-                    except Exception as e:
-                        return None, f"Text File Error: {str(e)}"
+                    elif file_ext == 'txt':
+                        try:
+                            return read_delimited(uploaded_file, '\t', progress=report), None
+                        except Exception as e:
+                            return None, f"Text File Error: {str(e)}"
 
-                elif file_ext == 'json':
-                    try:
-                        return pd.read_json(uploaded_file, lines=True), None
-                    except Exception as e:
-                        return None, f"JSON Error: {str(e)}"
+                    elif file_ext == 'json':
+                        try:
+                            return read_json_lines(uploaded_file, progress=report), None
+                        except Exception as e:
+                            return None, f"JSON Error: {str(e)}"
+                finally:
+                    progress_bar.empty()
 
                 return None, "Unsupported file format"
 
             except Exception as e:
                 return None, f"Unexpected error: {str(e)}"
         
-        # Load file and get both data and error
-        data, error = load_file(uploaded_file)
-        
-        if error:
-            st.session_state.upload_error = error
-            st.error(f"⚠️ File Error: {error}")  # Show only in main area
-            st.session_state.uploaded_data = None
-        elif data is not None:
-            st.session_state.uploaded_data = data
-            st.session_state.uploaded_filename = uploaded_file.name
-            st.session_state.original_data = data.copy()
-            st.session_state.original_dtypes = data.dtypes.to_dict()
-            st.sidebar.success(f"Loaded {uploaded_file.name}")
+        # A file another session already opened is shared, one seen before is reopened from the
+        # on-disk Arrow cache; only new content is parsed
+        dataset_token = content_hash(uploaded_file)
+        shared = lookup(dataset_token, st.session_state.get('username'))
+        if shared is not None:
+            dataset, meta = shared
+            open_dataset(dataset, dataset_token, uploaded_file.name, meta['report'], meta['original_dtypes'])
+            add_owner(dataset_token, st.session_state.get('username'))
+            st.session_state.uploaded_file_id = uploaded_file.file_id
+            st.sidebar.success(f"Loaded {uploaded_file.name} from the dataset cache")
+        else:
+            # Load file and get both data and error
+            data, error = load_file(uploaded_file)
+
+            if error:
+                st.session_state.upload_error = error
+                # Remember the file so reruns show the stored error instead of parsing it again
+                st.session_state.uploaded_file_id = uploaded_file.file_id
+                st.error(f"⚠️ File Error: {error}")  # Show only in main area
+                st.session_state.dataset = None
+            elif data is not None:
+                # The readers optimize each chunk as it is parsed and report the parsed dtypes and sizes
+                optimized, report = data
+                original_dtypes = dict(zip(report['Column'], report['Before']))
+                store_dataset(dataset_token, optimized, uploaded_file.name, report, original_dtypes,
+                              owner=st.session_state.get('username'))
+                dataset, meta = share(dataset_token, optimized, uploaded_file.name, report, original_dtypes,
+                                      st.session_state.get('username'))
+                open_dataset(dataset, dataset_token, uploaded_file.name, meta['report'], meta['original_dtypes'])
+                st.session_state.uploaded_file_id = uploaded_file.file_id
+                st.sidebar.success(f"Loaded {uploaded_file.name}")
+    elif st.session_state.upload_error:
+        st.error(f"⚠️ File Error: {st.session_state.upload_error}")
+    cached_datasets_sidebar()
+    timer.lap('upload')
 
     # Main Dashboard
     if st.session_state.active_page == "Dashboard":
         st.write(f"Welcome, {st.session_state.get('username', 'User')}!")
         st.title("📊 Banking Data Dashboard")
 
-        if st.session_state.uploaded_data is not None:
-            # Always work with a copy from session state
-            df = st.session_state.uploaded_data.copy()
+        dataset = st.session_state.dataset
+        if dataset is not None:
+            # The optimizer ran once when the file was loaded; reruns just read its report
+            df = dataset.current
+            optimized_df = df
+            edited_df = df
+            report = st.session_state.get('optimization_report')
 
             # --- Memory Optimization ---
             st.subheader("Optimizing Data...")
             with st.spinner("Optimizing data types to reduce memory usage..."):
-                original_memory = df.memory_usage(deep=True).sum() / (1024**2)
-                optimized_df = df.copy()
-
-                for col in optimized_df.columns:
-                    if optimized_df[col].dtype == 'object':
-                        if optimized_df[col].nunique() < 0.5 * len(optimized_df[col]):
-                            try:
-                                optimized_df[col] = optimized_df[col].astype('category')
-                            except:
-                                pass
-                    elif optimized_df[col].dtype in ['int64', 'float64']:
-                        try:
-                            optimized_df[col] = pd.to_numeric(optimized_df[col], downcast='integer')
-                        except:
-                            try:
-                                optimized_df[col] = pd.to_numeric(optimized_df[col], downcast='float')
-                            except:
-                                pass
-
-                optimized_memory = optimized_df.memory_usage(deep=True).sum() / (1024**2)
-                st.success(f"Memory usage reduced from {original_memory:.2f} MB to {optimized_memory:.2f} MB.")
-                st.session_state.uploaded_data = optimized_df.copy()
-                edited_df = st.session_state.uploaded_data.copy()
+                if report is not None:
+                    original_memory = report['Before (MB)'].sum()
+                    optimized_memory = report['After (MB)'].sum()
+                    st.success(f"Memory usage reduced from {original_memory:.2f} MB to {optimized_memory:.2f} MB.")
+                    with st.expander("Optimization report"):
+                        st.dataframe(report, use_container_width=True)
 
                 # Pie Chart for Data Types
                 data_types = optimized_df.dtypes.value_counts().reset_index()
@@ -190,18 +573,33 @@ def show_dashboard():
                 )
                 fig_pie.update_traces(textposition='inside', textinfo='percent+label')
 
-            # Metrics
-            null_values = optimized_df.isnull().sum().sum()
+            timer.lap('optimization')
+
+            # Metrics, from one profiling pass cached per dataset version
+            approx_threshold = st.sidebar.number_input(
+                "Approximate statistics above (rows)", min_value=0, value=APPROX_THRESHOLD, step=100_000,
+                help="Larger datasets use HyperLogLog distinct counts and sampled quantiles"
+            )
+            profile = dataset.cached(
+                f"profile:{approx_threshold}",
+                lambda frame: profile_dataframe(frame, approx_threshold)
+            )
+            approximate = bool(profile['approximate'].any())
+            null_values = int(profile['nulls'].sum())
             total_rows = len(optimized_df)
             total_columns = len(optimized_df.columns)
-            total_dtypes = optimized_df.dtypes.nunique()
+            total_dtypes = profile['dtype'].nunique()
 
-            # Bar Chart for Uniqueness
+            # Bar Chart for Uniqueness (the TOP_N most distinct columns on wide datasets)
+            distinct = top_n(profile['distinct'], TOP_N)
             total_summary = pd.DataFrame({
-                'Column': optimized_df.columns,
-                'Count': optimized_df.nunique()
+                'Column': distinct.index,
+                'Count': distinct.to_numpy()
             })
-            fig_bar = px.bar(total_summary, x='Column', y='Count', title='Total Summary of Data')
+            title = 'Total Summary of Data'
+            if len(distinct) < len(profile):
+                title += f' (top {len(distinct)} of {len(profile)} columns by distinct values)'
+            fig_bar = px.bar(total_summary, x='Column', y='Count', title=title)
 
             # Layout
             col1, col2, col3 = st.columns([3, 1, 3])
@@ -212,25 +610,35 @@ def show_dashboard():
             col2.metric("Columns", total_columns)
             col2.metric("Data Types", total_dtypes)
 
-            numeric_summary = df.describe().T[['mean', 'std', 'min', 'max']]
+            numeric_summary = numeric_summary_table(profile)
             col3.subheader("📊 Numeric Summary")
             col3.dataframe(numeric_summary)
 
             table_data = pd.DataFrame({
-                "Data Type": [type_map.get(str(dtype), str(dtype)) for dtype in optimized_df.dtypes],
-                "Unique Values": optimized_df.nunique(),
-                "Missing Values": optimized_df.isnull().sum(),
-                "Example Value": optimized_df.iloc[0] if not optimized_df.empty else None # Handle empty DataFrame
+                "Data Type": [type_map.get(dtype, dtype) for dtype in profile['dtype']],
+                "Unique Values (≈)" if approximate else "Unique Values": profile['distinct'],
+                "Missing Values": profile['nulls'],
+                "Example Value": profile['example'].where(profile['example'].notna(), '').astype(str)
             })
 
+            timer.lap('metrics')
             st.subheader("📋 Data Dictionary")
             st.dataframe(table_data)
 
-            # **Update original_data before displaying the editor**
-            st.session_state.original_data = st.session_state.uploaded_data.copy()
-            # Identify critical columns
-            critical_cols_to_highlight = identify_critical_columns(df.columns, CRITICAL_KEYWORDS)
-            st.write(f"Identified potential critical columns: {critical_cols_to_highlight}") # For debugging
+            # Identify critical columns from their names and a sample of their values
+            classification = dataset_classification(dataset, CRITICAL_KEYWORDS)
+            critical_cols_to_highlight = classification.index[classification['critical']].tolist()
+            with st.expander(f"⚠️ Critical columns ({len(critical_cols_to_highlight)})"):
+                st.dataframe(
+                    classification.sort_values('confidence', ascending=False),
+                    column_config={
+                        "keyword": "Name keyword",
+                        "detected": "Detected values",
+                        "match_share": st.column_config.NumberColumn("Sample match", format="percent"),
+                        "confidence": st.column_config.ProgressColumn("Confidence", min_value=0, max_value=1),
+                        "critical": "Critical",
+                    },
+                )
 
             col_configs = {}
             for col in optimized_df.columns:
@@ -243,147 +651,65 @@ def show_dashboard():
                 else:
                     col_configs[col] = column_config.Column(label=col)
 
-            st.subheader("🧹 Clean & Edit Your Data")  
-            edited_df = st.data_editor(  
-                st.session_state.uploaded_data,  
-                use_container_width=True,  
-                num_rows="dynamic",  
-                key="editable_table",  
-                column_config=col_configs  
-            )  
-
-            # Check if data was edited by comparing with session state
-            if not edited_df.equals(st.session_state.uploaded_data):
-                st.session_state.uploaded_data = edited_df.copy()
-
-                # Auto-save to database  
-                table_name = st.session_state.uploaded_filename.split('.')[0]  
-                save_successful, message = save_dataframe_to_db(st.session_state.uploaded_data, table_name)  
-                if save_successful:  
-                    st.success("Changes saved to database automatically")  
-                else:  
+            timer.lap('data_dictionary')
+            st.subheader("🧹 Clean & Edit Your Data")
+            table_name = st.session_state.uploaded_filename.split('.')[0]
+
+            undo_col, redo_col, compact_col, memory_col = st.columns([1, 1, 1, 3])
+            history_action = None
+            if undo_col.button("↩️ Undo", disabled=not dataset.can_undo):
+                history_action = dataset.undo
+            if redo_col.button("↪️ Redo", disabled=not dataset.can_redo):
+                history_action = dataset.redo
+            if compact_col.button("🗜️ Compact", disabled=not dataset.journal_length,
+                                  help="Fold the edit history into a new snapshot (clears undo)"):
+                dataset.compact()
+                st.rerun()
+            footprint = dataset.memory_usage()
+            sharing = holders(dataset.token)
+            memory_col.caption(
+                f"Dataset memory: {footprint['total'] / 1024**2:.2f} MB "
+                f"(base {footprint['base'] / 1024**2:.2f} MB, edited columns {footprint['overlay'] / 1024**2:.2f} MB, "
+                f"history {footprint['journal'] / 1024**2:.2f} MB, {dataset.journal_length} edits)"
+                + (f"; the base is shared by {sharing} open copies" if sharing > 1 else "")
+            )
+            if history_action is not None:
+                history_action()
+                save_successful, message = save_dataset(dataset, table_name)
+                if not save_successful:
                     st.error(f"Error saving changes: {message}")
+                st.rerun()
+
+            edit_window(dataset, table_name, col_configs)
 
-            if st.session_state.uploaded_data is not None:
-                df = st.session_state.uploaded_data
+            if dataset.current is not None:
+                df = dataset.current
 
                 # Detect columns with nulls
-                null_cols = df.columns[df.isnull().any()].tolist()
+                nulls = dataset_null_counts(dataset)
+                null_cols = nulls.index[nulls > 0].tolist()
 
+                if 'impute_message' in st.session_state:
+                    st.success(st.session_state.pop('impute_message'))
                 if null_cols:
-                    st.subheader("Null Value Imputation Options")
-
-                    selected_col = st.selectbox("Select column to impute nulls", null_cols)
-                    col_dtype = df[selected_col].dtype  # Define dtype here safely
-
-                    option = st.radio(
-                        f"How do you want to replace nulls in '{selected_col}'?",
-                        ('Mean', 'Zero', 'Custom Value')
-                    )
-
-                    replacement = None  # Initialize
-
-                    if option == 'Custom Value':
-                        custom_val = st.text_input("Enter your custom replacement value:")
-
-                        if custom_val.strip() == "":
-                            st.warning("Please enter a value.")
-                        else:
-                            # Try to convert custom_val to appropriate type based on col_dtype
-                            try:
-                                if np.issubdtype(col_dtype, np.integer):
-                                    val_float = float(custom_val)
-                                    if val_float.is_integer():
-                                        replacement = int(val_float)
-                                    else:
-                                        st.warning("Float will be truncated to int.")
-                                        replacement = int(val_float)
-                                elif np.issubdtype(col_dtype, np.floating):
-                                    replacement = float(custom_val)
-                                else:
-                                    # For non-numeric columns, keep as string
-                                    replacement = custom_val
-                            except ValueError:
-                                st.error("Custom value must match the column data type.")
-
-                    if st.button("Replace Nulls"):
-                        if option == 'Mean':
-                            if np.issubdtype(col_dtype, np.number):
-                                replacement = df[selected_col].mean()
-                            else:
-                                st.error("Mean imputation only available for numeric columns.")
-                                replacement = None
-                        elif option == 'Zero':
-                            if np.issubdtype(col_dtype, np.number):
-                                replacement = 0
-                            else:
-                                st.error("Zero replacement only available for numeric columns.")
-                                replacement = None
-                        # For custom value, replacement was already set above
-
-                        if replacement is not None:
-                            df[selected_col].fillna(replacement, inplace=True)
-                            st.success(f"Null values in '{selected_col}' replaced with {replacement}")
-
-                            # Save back to session state
-                            st.session_state.uploaded_data = df.copy()
-
-                            # Save to DB immediately
-                            table_name = st.session_state.uploaded_filename.split('.')[0]
-                            save_successful, message = save_dataframe_to_db(df, table_name)
-                            if save_successful:
-                                st.success("Updated data saved to database.")
-                            else:
-                                st.error(f"Error saving changes: {message}")
+                    imputation_plan(dataset, table_name, null_cols)
 
             # Column Operations
             st.subheader("🛠️ Column Operations")
 
             # Change Data Type
-            with st.expander("🔀 Change Column Data Type"):
-                col_to_change = st.selectbox("Select column to change:", edited_df.columns)
-                current_dtype = str(edited_df[col_to_change].dtype)
-                
-                # Simplified dtype options and index finding
-                dtype_options = ['int64', 'int32', 'int16', 'int8', 'float64', 'float32', 'object', 'category', 'datetime64[ns]']
-                current_index = dtype_options.index(current_dtype) if current_dtype in dtype_options else 0
-                
-                new_dtype = st.selectbox("Select new data type:", dtype_options, index=current_index)
-                
-                change_type_button = st.button("💾 Apply Data Type Change")
-                
-                if change_type_button:
-                    try:
-                        # Create a copy of the DataFrame to modify
-                        modified_df = edited_df.copy()
-                        
-                        if new_dtype == 'datetime64[ns]':
-                            # Use pd.to_datetime and assign back to column
-                            modified_df[col_to_change] = pd.to_datetime(
-                                modified_df[col_to_change], 
-                                errors='coerce'
-                            )
-                        else:
-                            # Direct assignment for other types
-                            modified_df[col_to_change] = modified_df[col_to_change].astype(new_dtype)
-                        
-                        # Update the session state with the modified DataFrame
-                        st.session_state.uploaded_data = modified_df
-                        st.success(f"Data type of '{col_to_change}' changed to '{new_dtype}'.")
-                        
-                    except Exception as e:
-                        st.error(f"Error changing data type: {e}")
+            with st.expander("🔀 Change Column Data Types"):
+                type_conversions(dataset)
 
             # Delete Columns
             with st.expander("🗑️ Delete Column"):
-                columns_to_delete = st.multiselect("Select columns to delete:", st.session_state.uploaded_data.columns)
+                columns_to_delete = st.multiselect("Select columns to delete:", dataset.current.columns)
                 if st.button("Delete Selected Columns"):
                     if columns_to_delete:
                         try:
-                            st.session_state.uploaded_data = st.session_state.uploaded_data.drop(columns=columns_to_delete)
+                            dataset.drop_columns(columns_to_delete)
                             # Save immediately after deletion
-                            table_name = st.session_state.uploaded_filename.split('.')[0]
-                            save_successful, message = save_dataframe_to_db(st.session_state.uploaded_data, table_name)
+                            save_successful, message = save_dataset(dataset, table_name)
                             if save_successful:
                                 st.success(f"Deleted columns and saved: {', '.join(columns_to_delete)}")
                             else:
@@ -391,77 +717,139 @@ def show_dashboard():
                         except Exception as e:
                             st.error(f"Error: {e}")
                    
+            timer.lap('editor')
             st.markdown("### 📦 Final Edited Data")
 
-            # Always get the current and original data from session state
-            final_df = st.session_state.get('uploaded_data')
-            original_df = st.session_state.get('original_data')
-
-            if final_df is not None and original_df is not None:
-                # Align columns and indexes
-                original_df = original_df[final_df.columns]
-                final_df.reset_index(drop=True, inplace=True)
-                original_df.reset_index(drop=True, inplace=True)
+            # Current version against the uploaded base, comparing only journaled columns
+            final_df = dataset.current
 
-                if final_df.shape[0] == original_df.shape[0]:
-                    styled_df = final_df.style.apply(
-                        lambda x: highlight_critical_and_edited(final_df, original_df, critical_cols_to_highlight),
-                        axis=None
-                    )
-                    st.write(styled_df)
-                else:
-                    st.dataframe(final_df, use_container_width=True)
+            if final_df is not None:
+                # Only changed cells and one page of rows are rendered, unless the table fits the budget
+                review_changes(dataset, critical_cols_to_highlight)
             else:
                 st.warning("No data found. Please upload a file.")
 
+            timer.lap('final_table')
             st.markdown("### 📥 Export Data")
-            csv = final_df.to_csv(index=False).encode("utf-8")
-            st.download_button("⬇️ Download CSV", csv, "updated_data.csv", "text/csv", key="downl")
-                        
-            
+            # Written in chunks on request and kept per dataset version
+            export_panel(final_df, ('dataset', dataset.uid, dataset.version), "updated_data", key="downl")
+
+            timer.lap('export')
+
             # Search SQL
             st.subheader("🔍 Search Database")
             search_input = st.text_area("Enter SQL query", key="database_search_input", height=150)
+            explain_mode = st.toggle("🔬 Explain / Profile", key="explain_mode")
 
             if search_input:
                 user_role = st.session_state.get("user_role", "user")  # Default to 'user' if not set
 
                 if is_safe_sql(search_input, user_role):
-                    try:
-                        results_df = search_database(search_input)
-                        if results_df is not None:
-                            st.dataframe(results_df)
-                        else:
-                            st.info("No data returned for the query.")
-                    except Exception as e:
-                        st.error(f"Query Error: {e}")
+                    handle = st.session_state.get('query_handle')
+                    if handle is None or handle.sql != search_input:
+                        handle = start_search(search_input)
+                        st.session_state.query_handle = handle
+                    elif not handle.running and not search_is_current(handle):
+                        # A table it reads was saved or edited since: run the same page again
+                        handle = start_search(handle.sql, **handle.page_limits(handle.page))
+                        st.session_state.query_handle = handle
+                    # Poll every half second while the query runs, so it can be cancelled
+                    st.session_state.query_polling = handle.running
+                    st.fragment(query_results, run_every=0.5 if handle.running else None)()
+                    if explain_mode:
+                        explain_panel(search_input)
                 else:
                     st.error("⚠️ You are not allowed to run this type of SQL command.")
 
+            timer.lap('sql_search')
+
             # Optional Charts Section
             st.sidebar.subheader("Optional Charts")
-            final_df = st.session_state.uploaded_data
+            final_df = dataset.current
 
             if st.sidebar.checkbox("🌡️ Correlation Heatmap"):
                 st.subheader("Correlation Heatmap")
-                numeric_cols = final_df.select_dtypes(include=['int64', 'float64']).columns
+                numeric_cols = numeric_columns(final_df)
                 if len(numeric_cols) > 1:
-                    corr = final_df[numeric_cols].corr()
-                    fig_corr = px.imshow(corr, text_auto=True, color_continuous_scale="Viridis", title="Correlation Heatmap")
-                    st.plotly_chart(fig_corr, use_container_width=True)
+                    col1, col2, col3 = st.columns([1, 1, 2])
+                    method = col1.radio("Method", METHODS, horizontal=True, key="corr_method",
+                                        format_func=str.capitalize)
+                    precision = col2.radio("Precision", PRECISIONS, horizontal=True, key="corr_precision",
+                                           help="float32 is faster on wide tables, accurate to about 6 digits.")
+                    view = col3.radio("View", ["Matrix", "Strongest pairs"], horizontal=True, key="corr_view",
+                                      index=1 if len(numeric_cols) > WIDE_COLUMNS else 0)
+                    # Cached per dataset version; an edit to one column only recomputes its row and column
+                    corr = dataset_correlation(dataset, method, precision)
+                    if view == "Matrix":
+                        fig_corr = px.imshow(corr, text_auto='.2f' if len(numeric_cols) <= LABEL_COLUMNS else False,
+                                             color_continuous_scale="Viridis", zmin=-1, zmax=1, title="Correlation Heatmap")
+                        st.plotly_chart(fig_corr, use_container_width=True)
+                    else:
+                        k = st.slider("Pairs", 5, 200, TOP_K, key="corr_top_k")
+                        st.dataframe(
+                            strongest_pairs(corr, k),
+                            hide_index=True,
+                            column_config={"correlation": st.column_config.ProgressColumn(
+                                "Correlation", format="%.3f", min_value=-1, max_value=1)},
+                        )
                 else:
                     st.warning("At least two numeric columns are needed for the correlation heatmap.")
 
             if st.sidebar.checkbox("📊 Histogram (Frequency Distribution)"):
                 st.subheader("Histogram (Frequency Distribution)")
-                numeric_cols = final_df.select_dtypes(include=['int64', 'float64']).columns
+                numeric_cols = numeric_columns(final_df)
                 if len(numeric_cols) > 0:
-                    col_to_hist = st.selectbox("Select numeric column for histogram:", numeric_cols)
-                    fig_hist = px.histogram(final_df, x=col_to_hist, title=f"Frequency Distribution of {col_to_hist}")
+                    col1, col2, col3 = st.columns([2, 1, 1])
+                    col_to_hist = col1.selectbox("Select numeric column for histogram:", numeric_cols)
+                    bin_rule = col2.selectbox("Bins", ["auto", "fd", "sturges", "sqrt", 10, 25, 50, 100], key="hist_bins")
+                    log_scale = col3.checkbox("Log scale", key="hist_log")
+                    # Bins are computed here and cached per dataset version; only they go to the browser
+                    bins = dataset.cached(
+                        ('histogram', col_to_hist, bin_rule, log_scale),
+                        lambda frame: histogram_bins(frame[col_to_hist], bin_rule, log_scale)
+                    )
+                    if log_scale:
+                        fig_hist = px.bar(bins, x='label', y='count', title=f"Frequency Distribution of {col_to_hist} (log bins)")
+                        fig_hist.update_xaxes(title=col_to_hist)
+                    else:
+                        fig_hist = px.bar(bins, x=(bins['left'] + bins['right']) / 2, y='count', hover_data=['label'],
+                                          title=f"Frequency Distribution of {col_to_hist}")
+                        fig_hist.update_traces(width=(bins['right'] - bins['left']).to_numpy())
+                        fig_hist.update_xaxes(title=col_to_hist)
+                    fig_hist.update_layout(bargap=0)
                     st.plotly_chart(fig_hist, use_container_width=True)
+                    if bins.attrs['dropped']:
+                        st.caption(f"{bins.attrs['dropped']:,} missing{' or non-positive' if log_scale else ''} values not shown.")
                 else:
                     st.warning("No numeric columns available for the histogram.")
 
+            if st.sidebar.checkbox("📈 Line / Scatter"):
+                st.subheader("Line / Scatter")
+                numeric_cols = numeric_columns(final_df)
+                if len(numeric_cols) > 0:
+                    col1, col2, col3 = st.columns([2, 2, 1])
+                    y_col = col1.selectbox("Y axis", numeric_cols, key="line_y")
+                    x_col = col2.selectbox("X axis", ["Row order"] + numeric_cols, key="line_x")
+                    kind = col3.radio("Kind", ["Line", "Scatter"], key="line_kind")
+
+                    def prepare(frame):
+                        if x_col == "Row order":
+                            return downsample(np.arange(len(frame)), frame[y_col].to_numpy(dtype='float64', na_value=np.nan))
+                        ordered = frame[[x_col, y_col]].dropna(subset=[x_col]).sort_values(x_col, kind='stable')
+                        return downsample(ordered[x_col].to_numpy(), ordered[y_col].to_numpy(dtype='float64', na_value=np.nan))
+
+                    points = dataset.cached(('downsample', x_col, y_col, MAX_POINTS), prepare)
+                    plot = px.line if kind == "Line" else px.scatter
+                    fig_line = plot(points, x='x', y='y', title=f"{y_col} by {x_col}")
+                    fig_line.update_layout(xaxis_title=x_col, yaxis_title=y_col)
+                    st.plotly_chart(fig_line, use_container_width=True)
+                    if len(points) < len(final_df):
+                        st.caption(f"Showing {len(points):,} of {len(final_df):,} points (min/max per bucket).")
+                else:
+                    st.warning("No numeric columns available to plot.")
+
+            timer.lap('charts')
+
         else:
             st.warning("📂 Upload a file to see the dashboard.")
 
@@ -469,9 +857,15 @@ def show_dashboard():
     elif st.session_state.active_page == "Database":
         try:
             database_page()
+            timer.lap('database_page')
         except ImportError:
             st.error("The 'database.py' file or the 'database_page' function was not found.")
 
     # User Page
     elif st.session_state.active_page == "User":
         user_page()
+        timer.lap('user_page')
+
+    # Performance Page (admins only)
+    elif st.session_state.active_page == "Performance":
+        performance_page()
@@ -1,6 +1,11 @@
-from section.utils.helper import engine1
+from section.utils.helper import data_engine
+from section.utils.persistence import forget_table
+from section.utils.browse import PAGE_SIZE, PAGE_SIZES, count_rows, fetch_page
+from section.utils.engines import pool_stats
+from section.utils.query_cache import bump_table, cache_stats, clear_results
+from section.utils.schema import invalidate, table_info, table_stats
 import streamlit as st
-from sqlalchemy import inspect, text
+from sqlalchemy import text
 import pandas as pd
 
 def _is_admin():
@@ -9,61 +14,132 @@ def _is_admin():
 
 def _delete_table(table_name):
     """Dangerous: Delete a table from the database."""
-    with engine1.connect() as conn:
+    with data_engine().connect() as conn:
         conn.execute(text(f"DROP TABLE IF EXISTS {table_name}"))
         conn.commit()
+    forget_table(data_engine(), table_name)
+    invalidate(data_engine(), table_name)
+    bump_table(data_engine(), table_name)
 
-def _fetch_table_names():
-    """Helper function to get table names."""
-    inspector = inspect(engine1)
-    return inspector.get_table_names()
+def _format_bytes(size):
+    if size is None or pd.isna(size):
+        return "–"
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:,.0f} {unit}" if unit == "B" else f"{size:,.1f} {unit}"
+        size /= 1024
 
-def _display_tables(table_names):
-    """Helper function to display tables with admin controls."""
-    if not table_names:
+def _page_cursor(table, signature, page):
+    """Last key of the previous page, if that page was already visited with the same settings."""
+    cursors = st.session_state.setdefault('browse_cursors', {})
+    if cursors.get(table, {}).get('signature') != signature:
+        cursors[table] = {'signature': signature, 'after': {}}
+    return cursors[table]['after'].get(page)
+
+def _remember_cursor(table, page, last_key):
+    st.session_state['browse_cursors'][table]['after'][page + 1] = last_key
+
+def _browse_table(table, total_rows):
+    """Show one page of `table`; sorting, filtering and paging all run in SQL."""
+    info = table_info(data_engine(), table)
+    columns = [c['name'] for c in info['columns']]
+    key = info['primary_key']
+
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_column = st.selectbox("Sort by", columns, index=columns.index(key) if key else 0,
+                                   key=f"sort_{table}")
+        descending = st.checkbox("Descending", key=f"desc_{table}")
+    with col2:
+        filter_column = st.selectbox("Filter column", [None] + columns, key=f"filter_col_{table}")
+        filter_text = st.text_input("Contains", key=f"filter_text_{table}", disabled=filter_column is None)
+    with col3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(PAGE_SIZE),
+                                 key=f"page_size_{table}")
+
+    if filter_column and filter_text:
+        total_rows = count_rows(data_engine(), table, filter_column, filter_text)
+    pages = max(1, -(-int(total_rows or 0) // page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1,
+                           key=f"page_{table}") - 1
+
+    # Keyset pagination when sorting on the primary key and the previous page is known
+    signature = (sort_column, descending, filter_column, filter_text, page_size)
+    after = _page_cursor(table, signature, page) if sort_column == key else None
+    df = fetch_page(data_engine(), table, columns, page, page_size, sort_column, descending,
+                    filter_column, filter_text, after=after)
+    if sort_column == key and not df.empty:
+        _remember_cursor(table, page, df[key].tolist()[-1])
+
+    st.dataframe(df)
+    st.caption(f"Rows {page * page_size + 1:,}–{page * page_size + len(df):,} of {int(total_rows or 0):,}")
+
+def _display_tables(stats):
+    """Helper function to list tables and browse the one that is opened."""
+    if stats.empty:
         st.warning("No tables found in the database.")
         return
 
-    st.success(f"Found {len(table_names)} tables.")
-    
-    for table in table_names:
-        with st.expander(f"📄 {table}"):
-            # Table content display
-            try:
-                df = pd.read_sql_table(table, con=engine1)
-                st.dataframe(df)
-                
-                # ADMIN-ONLY CONTROLS
-                if _is_admin():
-                    st.markdown("---")
-                    st.warning("🔐 Admin Actions")
-                    
-                    col1, col2 = st.columns(2)
-                    
-                    with col1:
-                        if st.button(f"❌ Delete {table}", key=f"delete_{table}"):
-                            _delete_table(table)
-                            st.rerun()  # Refresh the page
-                    
-                    with col2:
-                        if st.button(f"🔁 Refresh {table}", key=f"refresh_{table}"):
-                            st.rerun()
-                            
-            except Exception as e:
-                st.error(f"Error reading table {table}: {e}")
+    st.success(f"Found {len(stats)} tables.")
+    st.dataframe(pd.DataFrame({
+        "Table": stats['table'],
+        "Rows": stats['rows'],
+        "Size": [_format_bytes(size) for size in stats['bytes']],
+    }), hide_index=True)
+
+    table = st.selectbox("📄 Open table", [None] + list(stats['table']), key="browse_table")
+    if table is None:
+        return
+
+    try:
+        total_rows = stats.loc[stats['table'] == table, 'rows'].iloc[0]
+        _browse_table(table, total_rows)
+
+        # ADMIN-ONLY CONTROLS
+        if _is_admin():
+            st.markdown("---")
+            st.warning("🔐 Admin Actions")
+
+            col1, col2 = st.columns(2)
+
+            with col1:
+                if st.button(f"❌ Delete {table}", key=f"delete_{table}"):
+                    _delete_table(table)
+                    st.rerun()  # Refresh the page
+
+            with col2:
+                if st.button(f"🔁 Refresh {table}", key=f"refresh_{table}"):
+                    invalidate(data_engine(), table)
+                    st.rerun()
+
+    except Exception as e:
+        st.error(f"Error reading table {table}: {e}")
 
 def database_page():
     """Displays the database page with admin controls."""
     st.title("🗃️ Database Tables")
     
     try:
-        table_names = _fetch_table_names()
+        stats = table_stats(data_engine())
         
         # ADMIN-ONLY WARNING
         if _is_admin():
             st.warning("⚠️ ADMIN MODE: You have table management privileges", icon="⚠️")
+            with st.expander("🔌 Connection pools"):
+                st.dataframe(pd.DataFrame(pool_stats()), hide_index=True)
+            with st.expander("🧮 Query result cache"):
+                cache = cache_stats()
+                col1, col2, col3, col4 = st.columns(4)
+                col1.metric("Hits", cache['hits'])
+                col2.metric("Misses", cache['misses'])
+                col3.metric("Hit rate", f"{cache['hit_rate']:.0%}" if cache['hit_rate'] is not None else "–")
+                col4.metric("Cached", f"{cache['bytes'] / 1024**2:.1f} / {cache['budget'] / 1024**2:.0f} MB")
+                st.caption(f"{cache['entries']} results cached, {cache['evictions']} evicted.")
+                if st.button("🧹 Clear query cache", key="clear_query_cache"):
+                    clear_results()
+                    st.rerun()
         
-        _display_tables(table_names)
+        _display_tables(stats)
 
     except Exception as e:
         st.error(f"Database error: {e}")
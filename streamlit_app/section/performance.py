@@ -0,0 +1,84 @@
+import streamlit as st
+from section.utils import perf, shared_store
+
+
+def _is_admin():
+    return st.session_state.get('user_role') == 'admin'
+
+
+def _show_spans(summary, kinds, title, limit=20):
+    rows = summary[summary['kind'].isin(kinds)].head(limit)
+    st.subheader(title)
+    if rows.empty:
+        st.info("Nothing recorded yet.")
+        return
+    st.dataframe(
+        rows.drop(columns=['kind']),
+        hide_index=True,
+        column_config={
+            "total_s": st.column_config.NumberColumn("Total (s)", format="%.3f"),
+            "p50_s": st.column_config.NumberColumn("p50 (s)", format="%.4f"),
+            "p95_s": st.column_config.NumberColumn("p95 (s)", format="%.4f"),
+            "max_s": st.column_config.NumberColumn("Max (s)", format="%.4f"),
+        },
+    )
+
+
+def _show_shared_datasets():
+    datasets, stats = shared_store.usage()
+    st.subheader("📦 Shared datasets")
+    st.caption(
+        f"{stats['datasets']} datasets, {stats['bytes'] / 1024**2:,.1f} MB of {stats['budget'] / 1024**2:,.0f} MB "
+        f"budget · {stats['hits']} shared opens, {stats['reloads']} reloaded from disk, {stats['spills']} spilled"
+    )
+    if datasets.empty:
+        st.info("No dataset is open.")
+        return
+    datasets['bytes'] = datasets['bytes'] / 1024**2
+    st.dataframe(
+        datasets.drop(columns=['token']),
+        hide_index=True,
+        column_config={
+            "bytes": st.column_config.NumberColumn("Memory (MB)", format="%.1f"),
+            "holders": st.column_config.NumberColumn("Open copies"),
+            "on_disk": st.column_config.CheckboxColumn("On disk"),
+            "last_access": st.column_config.DatetimeColumn("Last used", format="YYYY-MM-DD HH:mm"),
+        },
+    )
+    if st.button("💾 Spill idle datasets", key="shared_spill",
+                 help="Move every dataset no session has open out of memory, into the disk cache."):
+        shared_store.trim(0)
+        st.rerun()
+
+
+def performance_page():
+    """Admin-only view of where reruns and database calls spend their time."""
+    st.title("⏱ Performance")
+    if not _is_admin():
+        st.error("Only admins can view performance data.")
+        return
+
+    recording = st.toggle("Record timings", value=perf.enabled(), key="perf_recording",
+                          help="Applies to every session; when off, the timers cost next to nothing.")
+    perf.set_enabled(recording)
+
+    scope = st.radio("Scope", ["This session", "All sessions"], horizontal=True, key="perf_scope")
+    aggregates = st.session_state.get('perf_spans') if scope == "This session" else perf.process
+    if aggregates is None:
+        aggregates = perf.Aggregates()
+    summary = aggregates.summary()
+
+    _show_spans(summary, ['section'], "🐢 Slowest dashboard sections")
+    _show_spans(summary, ['db', 'query'], "🗄️ Slowest database calls and queries")
+    _show_shared_datasets()
+
+    col1, col2 = st.columns(2)
+    with col1:
+        st.download_button("⬇️ Download spans (JSON lines)", perf.export_jsonl(), "perf_spans.jsonl",
+                           "application/jsonl", key="perf_download")
+    with col2:
+        if st.button("🧹 Clear timings", key="perf_clear"):
+            perf.clear()
+            if 'perf_spans' in st.session_state:
+                st.session_state.perf_spans.clear()
+            st.rerun()
@@ -1,21 +1,43 @@
 import streamlit as st
-import pandas as pd
 import hashlib
 import time 
-from section.utils.helper import engine2
+from section.utils.helper import users_engine
+from section.utils.browse import PAGE_SIZE, PAGE_SIZES, count_rows, fetch_page
+from section.utils.diff import compute_change_masks
+from section.utils.schema import table_info
+from section.utils.auth import invalidate_credentials
+from section.utils.query_cache import bump_table
 from sqlalchemy import text
 
+def _user_window():
+    """Fetch one filtered, sorted page of users (all of it runs in SQL) and the controls that picked it."""
+    # Never read the password column
+    columns = [c['name'] for c in table_info(users_engine(), 'user_information')['columns'] if c['name'] != 'password']
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        sort_column = st.selectbox("Sort by", columns, index=columns.index('userID') if 'userID' in columns else 0,
+                                   key="users_sort")
+        descending = st.checkbox("Descending", key="users_desc")
+    with col2:
+        filter_column = st.selectbox("Filter column", [None] + columns, key="users_filter_col")
+        filter_text = st.text_input("Contains", key="users_filter_text", disabled=filter_column is None)
+    with col3:
+        page_size = st.selectbox("Rows per page", PAGE_SIZES, index=PAGE_SIZES.index(PAGE_SIZE), key="users_page_size")
+
+    total_rows = count_rows(users_engine(), 'user_information', filter_column, filter_text)
+    pages = max(1, -(-int(total_rows or 0) // page_size))
+    page = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1, key="users_page") - 1
+    df = fetch_page(users_engine(), 'user_information', columns, page, page_size, sort_column, descending,
+                    filter_column, filter_text)
+    st.caption(f"Rows {page * page_size + min(1, len(df)):,}–{page * page_size + len(df):,} of {int(total_rows or 0):,}")
+    return df, (sort_column, descending, filter_column, filter_text, page_size, page)
+
+
 def user_page():
     st.title("👥 User Information")
 
-    # Fetch users from the database
-    with engine2.connect() as conn:
-        df_users = pd.read_sql("SELECT * FROM user_information", conn)
-
-    # Drop the password column before displaying
-    if 'password' in df_users.columns:
-        df_users = df_users.drop(columns=["password"])
-    
+    # Fetch only the page of users being shown
+    df_users, window = _user_window()
     original_df = df_users.copy()
 
     if st.session_state.get("user_role") == "admin":
@@ -24,10 +46,13 @@ def user_page():
         edited_df = st.data_editor(
             df_users,
             column_config={"userID": st.column_config.NumberColumn("User ID")},  # Show editable userID
-            num_rows="dynamic",
+            num_rows="fixed",
             use_container_width=True,
-            key="user_editor"
+            key=f"user_editor_{abs(hash(window))}"  # a fresh editor for every page
         )
+        # Rows are matched by position within the page; only rows with a changed cell are written
+        edited_mask, _ = compute_change_masks(edited_df, original_df)
+        changed_rows = edited_mask.to_numpy().any(axis=1).nonzero()[0]
 
         # Handle adding a new user
         st.subheader("➕ Add New User")
@@ -45,7 +70,7 @@ def user_page():
                         # Hash the password
                         hashed_password = hashlib.sha256(new_password.encode()).hexdigest()
 
-                        with engine2.begin() as conn:
+                        with users_engine().begin() as conn:
                             conn.execute(text("""
                                 INSERT INTO user_information (userID, username, email, password, role)
                                 VALUES (:userID, :username, :email, :password, 'User')
@@ -55,6 +80,8 @@ def user_page():
                                 "email": new_email,
                                 "password": hashed_password,
                             })
+                        invalidate_credentials(new_username)
+                        bump_table(users_engine(), 'user_information')
                         st.success("✅ New user added successfully.")
                         time.sleep(1.5)
                         st.rerun()
@@ -63,11 +90,12 @@ def user_page():
                 else:
                     st.warning("Please fill in all fields.")
 
-        if not edited_df.equals(original_df):
+        if len(changed_rows):
+            st.caption(f"{len(changed_rows)} user(s) changed on this page.")
             if st.button("💾 Save Changes"):
                 try:
-                    with engine2.begin() as conn:
-                        for i in range(len(edited_df)):
+                    with users_engine().begin() as conn:
+                        for i in changed_rows:
                             row = edited_df.iloc[i]
                             original_userID = original_df.iloc[i]["userID"]  # original
                             conn.execute(text(""" 
@@ -82,6 +110,8 @@ def user_page():
                                 "email": row["email"],
                                 "original_userID": original_userID
                             })
+                    invalidate_credentials()  # usernames may have changed
+                    bump_table(users_engine(), 'user_information')
                     st.success("Changes saved successfully.")
                     time.sleep(1.5)
                     st.rerun()
@@ -90,14 +120,25 @@ def user_page():
 
         # Delete row
         st.subheader("🗑️ Delete User")
-        user_ids = df_users["userID"].tolist()
-        selected_id = st.selectbox("Select a user ID to delete", user_ids)
+        # Any user can be deleted, not only those on this page; the ID is looked up by key
+        selected_id = st.number_input("User ID to delete", min_value=0, step=1, value=None, key="delete_user_id")
+        target = None
+        if selected_id is not None:
+            with users_engine().connect() as conn:
+                target = conn.execute(text("SELECT username FROM user_information WHERE userID = :userID"),
+                                      {"userID": int(selected_id)}).first()
+            if target is None:
+                st.warning(f"No user with ID {int(selected_id)}.")
+            else:
+                st.caption(f"User {int(selected_id)}: {target.username}")
 
-        if st.button("Delete User"):
+        if st.button("Delete User", disabled=target is None):
             try:
-                with engine2.begin() as conn:
-                    conn.execute(text("DELETE FROM user_information WHERE userID = :userID"), {"userID": selected_id})
-                st.success(f"User with ID {selected_id} deleted.")
+                with users_engine().begin() as conn:
+                    conn.execute(text("DELETE FROM user_information WHERE userID = :userID"), {"userID": int(selected_id)})
+                invalidate_credentials()
+                bump_table(users_engine(), 'user_information')
+                st.success(f"User with ID {int(selected_id)} deleted.")
                 time.sleep(1.5)
                 st.rerun()
             except Exception as e:
@@ -0,0 +1,59 @@
+import threading
+import time
+
+from sqlalchemy import text
+
+# Seconds a resolved (or unknown) username is trusted before it is looked up again
+AUTH_TTL = 60
+AUTH_CACHE_SIZE = 1024
+
+# Users first, so a name present in both tables resolves the same way as before.
+# Both tables need an index on `username` (see migrations/add_username_indexes.py)
+_LOOKUP = text("""
+    SELECT 'user' AS role, password FROM user_information WHERE username = :username
+    UNION ALL
+    SELECT 'admin' AS role, password FROM admin_information WHERE username = :username
+""")
+
+# username -> (expires at, ((role, password hash), ...))
+_credentials = {}
+_credentials_lock = threading.Lock()
+
+
+def invalidate_credentials(username=None):
+    """Forget the cached record for `username` (or every username)."""
+    with _credentials_lock:
+        if username is None:
+            _credentials.clear()
+        else:
+            _credentials.pop(username, None)
+
+
+def lookup_credentials(engine, username, ttl=AUTH_TTL):
+    """(role, password hash) records for `username`, from cache or one UNION query."""
+    now = time.monotonic()
+    with _credentials_lock:
+        hit = _credentials.get(username)
+    if hit is not None and hit[0] > now:
+        return hit[1]
+
+    with engine.connect() as conn:
+        records = tuple((row.role, row.password) for row in conn.execute(_LOOKUP, {"username": username}))
+
+    with _credentials_lock:
+        if len(_credentials) >= AUTH_CACHE_SIZE:
+            # Drop expired entries first, then the oldest ones
+            for name in [n for n, (expires, _) in _credentials.items() if expires <= now]:
+                del _credentials[name]
+            while len(_credentials) >= AUTH_CACHE_SIZE:
+                del _credentials[next(iter(_credentials))]
+        _credentials[username] = (now + ttl, records)
+    return records
+
+
+def authenticate(engine, username, password_hash):
+    """Return 'user' or 'admin' when the hash matches, otherwise None."""
+    for role, stored_hash in lookup_credentials(engine, username):
+        if stored_hash == password_hash:
+            return role
+    return None
@@ -0,0 +1,53 @@
+import pandas as pd
+from sqlalchemy import String, cast, column, func, select, table
+
+PAGE_SIZE = 100
+PAGE_SIZES = [25, 50, 100, 250, 500]
+# Escape character for LIKE patterns; not a backslash, which MySQL string literals treat specially
+LIKE_ESCAPE = '/'
+
+
+def _contains_pattern(text):
+    """LIKE pattern matching `text` anywhere, with its own % and _ taken literally."""
+    for char in (LIKE_ESCAPE, '%', '_'):
+        text = text.replace(char, LIKE_ESCAPE + char)
+    return f"%{text}%"
+
+
+def _filtered(query, filter_column, filter_text):
+    if filter_column and filter_text:
+        query = query.where(cast(column(filter_column), String).like(_contains_pattern(filter_text),
+                                                                      escape=LIKE_ESCAPE))
+    return query
+
+
+def count_rows(engine, table_name, filter_column=None, filter_text=None):
+    """Number of rows matching the filter, counted by the database."""
+    query = _filtered(select(func.count()).select_from(table(table_name)), filter_column, filter_text)
+    with engine.connect() as conn:
+        return conn.execute(query).scalar()
+
+
+def fetch_page(engine, table_name, columns, page, page_size=PAGE_SIZE, sort_column=None,
+               descending=False, filter_column=None, filter_text=None, after=None):
+    """Read one page of a table, with sorting and filtering done in SQL.
+
+    Identifiers are quoted by SQLAlchemy and the filter text is a bound
+    parameter. Pages are addressed with LIMIT/OFFSET, or, when `after` holds
+    the last `sort_column` value of the previous page (keyset pagination on a
+    unique key), with `WHERE sort_column > after` so deep pages cost the same
+    as the first one.
+    """
+    source = table(table_name, *[column(c) for c in columns])
+    query = _filtered(select(*source.columns), filter_column, filter_text)
+    if sort_column:
+        key = source.c[sort_column]
+        query = query.order_by(key.desc() if descending else key.asc())
+        if after is not None:
+            query = query.where(key < after if descending else key > after)
+    if after is None:
+        query = query.offset(page * page_size)
+    query = query.limit(page_size)
+    with engine.connect() as conn:
+        result = conn.execute(query)
+        return pd.DataFrame(result.fetchall(), columns=list(result.keys()))
@@ -0,0 +1,199 @@
+import csv
+import decimal
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import BigInteger, Boolean, DateTime, Float, Integer, Numeric, SmallInteger, String, Text, text
+from sqlalchemy.dialects import mysql
+
+DEFAULT_PACKET_BYTES = 4 * 1024 * 1024
+MAX_CHUNK_ROWS = 20_000
+MAX_VARCHAR = 255
+
+
+def _integer_type(dtype, is_mysql):
+    np_dtype = np.dtype(dtype.numpy_dtype if hasattr(dtype, 'numpy_dtype') else dtype)
+    unsigned = np_dtype.kind == 'u'
+    size = np_dtype.itemsize
+    if is_mysql:
+        mysql_types = {1: mysql.TINYINT, 2: mysql.SMALLINT, 4: mysql.INTEGER, 8: mysql.BIGINT}
+        return mysql_types[size](unsigned=unsigned)
+    if size <= 2 and not (unsigned and size == 2):
+        return SmallInteger()
+    if size <= 4 and not (unsigned and size == 4):
+        return Integer()
+    return BigInteger()
+
+
+def _decimal_type(values):
+    digits, scale = 1, 0
+    for value in values:
+        sign, value_digits, exponent = value.as_tuple()
+        if not isinstance(exponent, int):  # NaN / Infinity
+            continue
+        value_scale = max(0, -exponent)
+        scale = max(scale, value_scale)
+        digits = max(digits, len(value_digits) - value_scale)
+    return Numeric(precision=min(digits + scale, 65), scale=min(scale, 30))
+
+
+def _string_type(values):
+    """VARCHAR(MAX_VARCHAR) when every value fits, else TEXT.
+
+    Delta saves append into the table the first save created, so columns are
+    never sized to the current values (nor made ENUMs of the current
+    categories): a longer edit or a new category would be truncated or
+    rejected.
+    """
+    lengths = values.astype(str).str.len()
+    max_len = int(lengths.max()) if len(lengths) else 1
+    return String(MAX_VARCHAR) if max_len <= MAX_VARCHAR else Text()
+
+
+def sql_column_types(frame, dialect_name):
+    """Map the frame's (optimized) dtypes to compact SQL column types.
+
+    Downcast integers keep their width (TINYINT/SMALLINT/...), float32 becomes
+    a single-precision FLOAT, Decimal objects and Arrow decimals become
+    DECIMAL(p, s), and strings and text categories of up to MAX_VARCHAR
+    characters become VARCHAR(MAX_VARCHAR) instead of TEXT. Columns that
+    don't fit any rule are left for pandas to decide.
+    """
+    is_mysql = dialect_name in ('mysql', 'mariadb')
+    types = {}
+    for col, dtype in frame.dtypes.items():
+        series = frame[col]
+        if pd.api.types.is_bool_dtype(dtype):
+            types[col] = Boolean()
+        elif pd.api.types.is_integer_dtype(dtype):
+            types[col] = _integer_type(dtype, is_mysql)
+        elif pd.api.types.is_float_dtype(dtype):
+            double = np.dtype(getattr(dtype, 'numpy_dtype', dtype)).itemsize > 4
+            if is_mysql:
+                types[col] = mysql.DOUBLE() if double else mysql.FLOAT()
+            else:
+                types[col] = Float(precision=53 if double else 24)
+        elif isinstance(dtype, pd.ArrowDtype) and str(dtype.pyarrow_dtype).startswith('decimal'):
+            # Exact money columns (Arrow decimal128) keep their precision and scale
+            arrow_type = dtype.pyarrow_dtype
+            types[col] = Numeric(precision=min(arrow_type.precision, 65), scale=min(arrow_type.scale, 30))
+        elif pd.api.types.is_datetime64_any_dtype(dtype):
+            types[col] = DateTime(timezone=getattr(dtype, 'tz', None) is not None)
+        elif isinstance(dtype, pd.CategoricalDtype):
+            categories = dtype.categories
+            if pd.api.types.is_integer_dtype(categories.dtype):
+                types[col] = _integer_type(categories.dtype, is_mysql)
+            elif pd.api.types.is_float_dtype(categories.dtype):
+                types[col] = Float(precision=53)
+            elif len(categories):
+                types[col] = _string_type(pd.Series(categories))
+        elif pd.api.types.is_object_dtype(dtype) or pd.api.types.is_string_dtype(dtype):
+            values = series.dropna()
+            if len(values) == 0:
+                continue
+            if pd.api.types.is_object_dtype(dtype) and values.map(type).eq(decimal.Decimal).all():
+                types[col] = _decimal_type(values)
+            elif pd.api.types.infer_dtype(values, skipna=True) == 'string':
+                types[col] = _string_type(values)
+    return types
+
+
+def _packet_bytes(conn):
+    if conn.dialect.name not in ('mysql', 'mariadb'):
+        return DEFAULT_PACKET_BYTES
+    try:
+        return int(conn.execute(text('SELECT @@max_allowed_packet')).scalar())
+    except Exception:
+        return DEFAULT_PACKET_BYTES
+
+
+def insert_chunk_size(frame, conn):
+    """Rows per INSERT batch so one statement stays well inside the packet limit."""
+    if frame.empty:
+        return 1
+    sample = frame.head(1000)
+    row_bytes = max(1.0, sample.memory_usage(deep=True, index=False).sum() / len(sample))
+    # SQL literals are bigger than the in-memory values; leave generous headroom.
+    rows = int(_packet_bytes(conn) / 4 / (row_bytes * 2))
+    return max(1, min(rows, MAX_CHUNK_ROWS))
+
+
+def _load_data_local_infile(frame, table_name, conn):
+    """Stream the frame through a temporary CSV and `LOAD DATA LOCAL INFILE`."""
+    quote = conn.dialect.identifier_preparer.quote
+    out = frame.copy(deep=False)
+    for col in out.columns:
+        if pd.api.types.is_bool_dtype(out[col].dtype):
+            out[col] = out[col].astype('Int8')
+
+    fd, path = tempfile.mkstemp(suffix='.csv')
+    os.close(fd)
+    try:
+        out.to_csv(path, index=False, header=False, na_rep='NULL', quoting=csv.QUOTE_MINIMAL,
+                   date_format='%Y-%m-%d %H:%M:%S.%f', chunksize=100_000)
+        columns = ', '.join(quote(str(c)) for c in frame.columns)
+        conn.execute(text(
+            f"LOAD DATA LOCAL INFILE :path INTO TABLE {quote(table_name)} "
+            "CHARACTER SET utf8mb4 FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '\"' ESCAPED BY '' "
+            f"LINES TERMINATED BY '\\n' ({columns})"
+        ), {'path': path})
+    finally:
+        os.remove(path)
+
+
+def bulk_load(frame, table_name, engine, index_columns=(), local_infile=False, key_column=None):
+    """Create `table_name` from `frame` and load it as fast as the backend allows.
+
+    The table is created empty with compact column types, the rows are loaded
+    with `LOAD DATA LOCAL INFILE` when requested and the server accepts it, or
+    with chunked batched INSERTs otherwise, and indexes are built after the
+    data is in. `key_column` (unique and non-null) gets a unique index, so the
+    table has a key to page on even though it has no PRIMARY KEY constraint.
+    Returns load statistics including rows per second.
+    """
+    start = time.perf_counter()
+    dtype = sql_column_types(frame, engine.dialect.name)
+    method = 'batched-insert'
+    chunksize = None
+
+    with engine.begin() as conn:
+        frame.head(0).to_sql(table_name, con=conn, if_exists='replace', index=False, dtype=dtype)
+
+        loaded = False
+        if local_infile and engine.dialect.name in ('mysql', 'mariadb') and not frame.empty:
+            try:
+                with conn.begin_nested():
+                    _load_data_local_infile(frame, table_name, conn)
+                method = 'load-data-local-infile'
+                loaded = True
+            except Exception:
+                loaded = False  # server or client has local_infile disabled
+
+        if not loaded:
+            chunksize = insert_chunk_size(frame, conn)
+            # executemany lets the driver batch rows into multi-row INSERTs
+            # (PyMySQL rewrites them, SQLite steps one prepared statement),
+            # which is much cheaper than compiling a giant VALUES clause.
+            frame.to_sql(table_name, con=conn, if_exists='append', index=False, chunksize=chunksize, dtype=dtype)
+
+        quote = engine.dialect.identifier_preparer.quote
+        if key_column is not None:
+            index_name = f"ux_{table_name}_{key_column}"[:64]
+            conn.execute(text(f"CREATE UNIQUE INDEX {quote(index_name)} ON {quote(table_name)} "
+                              f"({quote(str(key_column))})"))
+        for col in index_columns:
+            index_name = f"ix_{table_name}_{col}"[:64]
+            conn.execute(text(f"CREATE INDEX {quote(index_name)} ON {quote(table_name)} ({quote(str(col))})"))
+
+    seconds = time.perf_counter() - start
+    return {
+        'mode': 'replace',
+        'rows': len(frame),
+        'method': method,
+        'chunksize': chunksize,
+        'seconds': seconds,
+        'rows_per_second': len(frame) / seconds if seconds > 0 else float('inf'),
+    }
@@ -0,0 +1,91 @@
+import numpy as np
+import pandas as pd
+
+# Upper bound on histogram bins, whatever rule picked the count
+MAX_BINS = 200
+# Bars shown in per-column summaries before the rest are left out
+TOP_N = 30
+# Points sent to the browser for line/scatter views
+MAX_POINTS = 2000
+
+
+def numeric_columns(df):
+    """Columns that can be binned or plotted on a numeric axis (every int/float width, no bools)."""
+    return [c for c in df.columns
+            if pd.api.types.is_numeric_dtype(df[c].dtype) and not pd.api.types.is_bool_dtype(df[c].dtype)]
+
+
+def _finite(series):
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    return values[np.isfinite(values)]
+
+
+def histogram_bins(series, bins='auto', log_scale=False, max_bins=MAX_BINS):
+    """Bin a numeric column with NumPy and return only the bins.
+
+    `bins` is a NumPy rule ('auto', 'fd', 'sturges', ...) or a count. Integer
+    columns with a small range get one bin per value. With `log_scale`, bins
+    are evenly spaced in log10 and non-positive values are left out (their
+    number is in `frame.attrs['dropped']`). Returns a DataFrame with
+    left/right edges, count and a readable label per bin.
+    """
+    values = _finite(series)
+    dropped = len(series) - len(values)
+    if log_scale:
+        positive = values > 0
+        dropped += int((~positive).sum())
+        values = values[positive]
+
+    if len(values) == 0:
+        frame = pd.DataFrame(columns=['left', 'right', 'count', 'label'])
+    else:
+        low, high = values.min(), values.max()
+        if log_scale:
+            count = bins if isinstance(bins, int) else len(np.histogram_bin_edges(np.log10(values), bins=bins)) - 1
+            edges = np.geomspace(low, high if high > low else low * 10, min(max(count, 1), max_bins) + 1)
+        elif pd.api.types.is_integer_dtype(series.dtype) and high - low < max_bins:
+            edges = np.arange(low, high + 2) - 0.5
+        else:
+            edges = np.histogram_bin_edges(values, bins=bins)
+            if len(edges) - 1 > max_bins:
+                edges = np.linspace(low, high, max_bins + 1)
+        counts, edges = np.histogram(values, bins=edges)
+        frame = pd.DataFrame({'left': edges[:-1], 'right': edges[1:], 'count': counts})
+        frame['label'] = [f"{a:,.4g} – {b:,.4g}" for a, b in zip(frame['left'], frame['right'])]
+    frame.attrs['dropped'] = dropped
+    return frame
+
+
+def top_n(values, n=TOP_N, other_label=None):
+    """The `n` largest entries of a Series; the rest are summed under `other_label` (or dropped)."""
+    values = values.sort_values(ascending=False)
+    if len(values) <= n:
+        return values
+    head = values.iloc[:n]
+    if other_label is None:
+        return head
+    return pd.concat([head, pd.Series({f"{other_label} ({len(values) - n})": values.iloc[n:].sum()})])
+
+
+def downsample(x, y, max_points=MAX_POINTS):
+    """Reduce a line/scatter series to about `max_points` points, keeping each bucket's min and max.
+
+    Peaks and dips survive, which plain striding would miss. `x` must be
+    sorted for line views (use the row order or a sorted column).
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype='float64')
+    n = len(y)
+    if n <= max_points:
+        return pd.DataFrame({'x': x, 'y': y})
+    buckets = max_points // 2
+    edges = np.linspace(0, n, buckets + 1).astype(np.int64)
+    keep = []
+    filled = np.where(np.isnan(y), np.nanmean(y) if np.isfinite(y).any() else 0.0, y)
+    for start, stop in zip(edges[:-1], edges[1:]):
+        if stop <= start:
+            continue
+        chunk = filled[start:stop]
+        keep.extend(sorted({start + int(chunk.argmin()), start + int(chunk.argmax())}))
+    keep = np.asarray(keep)
+    return pd.DataFrame({'x': x[keep], 'y': y[keep]})
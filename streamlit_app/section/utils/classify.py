@@ -0,0 +1,179 @@
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+# Values inspected per column, whatever the number of rows
+SAMPLE_SIZE = 2000
+# Share of sampled values a detector must match before it counts
+VALUE_THRESHOLD = 0.6
+# Confidence given by a keyword in the column name alone
+NAME_SCORE = 0.6
+# Columns at or above this confidence are treated as critical
+CRITICAL_CONFIDENCE = 0.5
+
+CLASSIFICATION_COLUMNS = ['keyword', 'detected', 'match_share', 'confidence', 'critical']
+
+_CAMEL = re.compile(r'(?<=[a-z0-9])(?=[A-Z])')
+_SEPARATORS = re.compile(r'[^0-9a-z]+')
+
+_PATTERNS = {
+    'email': r'[\w.+-]+@[\w-]+(?:\.[\w-]+)+',
+    'iban': r'[A-Z]{2}\d{2}[A-Z0-9]{11,30}',
+    'swift': r'[A-Z]{4}[A-Z]{2}[A-Z0-9]{2}(?:[A-Z0-9]{3})?',
+    'ifsc': r'[A-Z]{4}0[A-Z0-9]{6}',
+    # US SSN, Indian Aadhaar (grouped) and PAN, UK National Insurance number
+    'national_id': r'\d{3}-\d{2}-\d{4}|\d{4} \d{4} \d{4}|[A-Z]{5}\d{4}[A-Z]|[A-CEGHJ-PR-TW-Z]{2}\d{6}[A-D]',
+    # A leading + or separators are required, so bare account numbers don't count as phones
+    'phone': r'\+\d[\d ().-]{5,18}\d|\(?\d{2,5}\)?[ .-]\d[\d .-]{3,14}\d',
+}
+# Dates (2026-10-18, 18.10.2026) and IPv4 addresses have the phone pattern's digit groups
+_NOT_PHONE = r'\d{4}[-. ]\d{1,2}[-. ]\d{1,2}|\d{1,2}[-. ]\d{1,2}[-. ]\d{2,4}|\d{1,3}(?:\.\d{1,3}){3}'
+# ISO 3166-1 alpha-2 codes (and XK, Kosovo, used by SWIFT): positions 5-6 of a BIC
+_COUNTRIES = frozenset('''
+    AD AE AF AG AI AL AM AO AQ AR AS AT AU AW AX AZ BA BB BD BE BF BG BH BI BJ BL BM BN BO BQ BR BS BT BV BW
+    BY BZ CA CC CD CF CG CH CI CK CL CM CN CO CR CU CV CW CX CY CZ DE DJ DK DM DO DZ EC EE EG EH ER ES ET FI
+    FJ FK FM FO FR GA GB GD GE GF GG GH GI GL GM GN GP GQ GR GS GT GU GW GY HK HM HN HR HT HU ID IE IL IM IN
+    IO IQ IR IS IT JE JM JO JP KE KG KH KI KM KN KP KR KW KY KZ LA LB LC LI LK LR LS LT LU LV LY MA MC MD ME
+    MF MG MH MK ML MM MN MO MP MQ MR MS MT MU MV MW MX MY MZ NA NC NE NF NG NI NL NO NP NR NU NZ OM PA PE PF
+    PG PH PK PL PM PN PR PS PT PW PY QA RE RO RS RU RW SA SB SC SD SE SG SH SI SJ SK SL SM SN SO SR SS ST SV
+    SX SY SZ TC TD TF TG TH TJ TK TL TM TN TO TR TT TV TW TZ UA UG UM US UY UZ VA VC VE VG VI VN VU WF WS XK
+    YE YT ZA ZM ZW
+'''.split())
+
+
+def _normalized(name):
+    """`AccountNumber`, `account-number` and `Account Number` all become `account_number`."""
+    return _SEPARATORS.sub('_', _CAMEL.sub('_', str(name)).lower()).strip('_')
+
+
+@functools.lru_cache(maxsize=16)
+def keyword_matcher(keywords):
+    """One compiled regex matching any keyword as whole `_`-separated tokens of a normalized name.
+
+    A trailing plural `s` or digits are allowed (`accounts`, `email2`), but
+    `name` no longer matches inside `filename`.
+    """
+    alternatives = '|'.join(re.escape(_normalized(k)) for k in sorted(set(keywords), key=len, reverse=True))
+    return re.compile(rf'(?:^|_)({alternatives})(?:s|\d+)?(?=_|$)')
+
+
+def match_keyword(column, keywords):
+    """The keyword found in `column`'s name, or None."""
+    found = keyword_matcher(tuple(keywords)).search(_normalized(column))
+    return found.group(1) if found else None
+
+
+def _sample(series, size, seed):
+    if len(series) > size:
+        positions = np.random.default_rng(seed).choice(len(series), size, replace=False)
+        series = series.iloc[np.sort(positions)]
+    return series.dropna()
+
+
+def _luhn_valid(digits):
+    """Vectorized Luhn check of a Series of digit strings (13-19 digits long)."""
+    if len(digits) == 0:
+        return np.zeros(0, dtype=bool)
+    matrix = np.frombuffer(''.join(digits.str.zfill(19)).encode('ascii'), dtype=np.uint8)
+    matrix = matrix.reshape(-1, 19).astype(np.int16) - 48
+    # Double every second digit from the right (the check digit is the last column)
+    doubled = matrix[:, -2::-2] * 2
+    matrix[:, -2::-2] = np.where(doubled > 9, doubled - 9, doubled)
+    return matrix.sum(axis=1) % 10 == 0
+
+
+def _iban_valid(code):
+    rearranged = code[4:] + code[:4]
+    return int(''.join(str(int(c, 36)) for c in rearranged)) % 97 == 1
+
+
+def _swift_valid(codes):
+    """BIC shapes whose country code exists; most 8-letter words (TRANSFER, APPROVED) have none."""
+    return codes.str[4:6].isin(_COUNTRIES)
+
+
+def _card_share(text):
+    digits = text.str.replace(r'[ -]', '', regex=True)
+    candidates = digits[digits.str.fullmatch(r'\d{13,19}')]
+    # Runs of one digit (000..., 444...) pass Luhn but are placeholders, not cards
+    varied = np.fromiter((len(set(d)) > 1 for d in candidates), dtype=bool, count=len(candidates))
+    return (_luhn_valid(candidates) & varied).sum() / len(text)
+
+
+def detect_values(series, sample_size=SAMPLE_SIZE, seed=0):
+    """Best matching sensitive-value kind for a column and the share of sampled values that match.
+
+    Only a random sample of at most `sample_size` non-null values is read,
+    with vectorized string operations, so the cost does not grow with the
+    number of rows. Integer columns, and float columns holding only whole
+    numbers (integers with blanks), are only checked for card numbers;
+    other floats, booleans and dates are skipped. Returns (kind or None, share).
+    """
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or pd.api.types.is_datetime64_any_dtype(dtype) \
+            or pd.api.types.is_timedelta64_dtype(dtype):
+        return None, 0.0
+    values = _sample(series, sample_size, seed)
+    if values.empty:
+        return None, 0.0
+    if pd.api.types.is_float_dtype(dtype):
+        # One blank makes a column of card numbers float64; whole-number floats are read as integers
+        if not (values == values.round()).all() or values.abs().max() >= 1e19:
+            return None, 0.0
+        values = values.astype('uint64' if values.min() >= 0 else 'int64')
+        dtype = values.dtype
+    text = values.astype(str).str.strip()
+    shares = {'card_number': _card_share(text)}
+    if not pd.api.types.is_integer_dtype(dtype):
+        upper = text.str.upper().str.replace(' ', '', regex=False)
+        for kind, pattern in _PATTERNS.items():
+            matched = (upper if kind in ('iban', 'swift', 'ifsc') else text).str.fullmatch(pattern)
+            if kind == 'iban' and matched.any():
+                matched[matched] = [_iban_valid(code) for code in upper[matched]]
+            elif kind == 'swift':
+                matched &= _swift_valid(upper)
+            elif kind == 'phone':
+                matched &= ~text.str.fullmatch(_NOT_PHONE)
+            shares[kind] = matched.sum() / len(text)
+    kind = max(shares, key=shares.get)
+    share = float(shares[kind])
+    return (kind, share) if share >= VALUE_THRESHOLD else (None, share)
+
+
+def classify_column(series, keywords, sample_size=SAMPLE_SIZE):
+    """Keyword, detected kind, match share and confidence for one column.
+
+    Name and value evidence are combined as independent signals
+    (1 - (1 - name) * (1 - values)), so either alone can flag a column and
+    both together give a higher confidence.
+    """
+    keyword = match_keyword(series.name, keywords)
+    detected, share = detect_values(series, sample_size)
+    name_score = NAME_SCORE if keyword else 0.0
+    value_score = share if detected else 0.0
+    confidence = 1 - (1 - name_score) * (1 - value_score)
+    return {'keyword': keyword, 'detected': detected, 'match_share': share,
+            'confidence': confidence, 'critical': confidence >= CRITICAL_CONFIDENCE}
+
+
+def classify_columns(df, keywords, columns=None, sample_size=SAMPLE_SIZE):
+    """`classify_column` for each column of `df`, as a DataFrame indexed by column name."""
+    columns = df.columns if columns is None else columns
+    records = {col: classify_column(df[col], keywords, sample_size) for col in columns}
+    return pd.DataFrame.from_dict(records, orient='index', columns=CLASSIFICATION_COLUMNS)
+
+
+def dataset_classification(dataset, keywords):
+    """Classification of a VersionedDataset, cached per version; edits only reclassify edited columns."""
+    keywords = tuple(keywords)
+
+    def update(df, previous, changed):
+        stale = [c for c in df.columns if c in changed or c not in previous.index]
+        if not stale:
+            return previous.reindex(df.columns)
+        kept = previous.reindex([c for c in df.columns if c not in stale])
+        return pd.concat([kept, classify_columns(df, keywords, stale)]).reindex(df.columns)
+
+    return dataset.cached(('critical', keywords), lambda df: classify_columns(df, keywords), update)
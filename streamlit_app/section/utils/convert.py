@@ -0,0 +1,246 @@
+import numpy as np
+import pandas as pd
+
+from section.utils.optimize import downcast_numeric, is_low_cardinality, is_text_dtype
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; without it money columns become float64
+    pa = None
+
+# Values inspected per column when proposing a type
+SAMPLE_SIZE = 2000
+# Share of sampled non-null values that must parse before a type is proposed
+PARSE_THRESHOLD = 0.95
+# Digits after the point kept by Decimal money columns, at most
+MAX_SCALE = 6
+
+TARGETS = ['keep', 'integer', 'float', 'money', 'datetime', 'boolean', 'category', 'text']
+PROPOSAL_COLUMNS = ['current', 'target', 'format', 'parsed_share', 'example']
+REPORT_COLUMNS = ['column', 'from', 'to', 'format', 'converted', 'coerced_to_null']
+
+# Day-first formats come before their month-first twins, so 03/04/2026 reads as 3 April
+DATE_FORMATS = [
+    '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%Y-%m-%dT%H:%M:%S', '%Y-%m-%d %H:%M', '%Y/%m/%d',
+    '%d/%m/%Y', '%m/%d/%Y', '%d/%m/%Y %H:%M:%S', '%m/%d/%Y %H:%M:%S', '%d/%m/%Y %H:%M', '%m/%d/%Y %H:%M',
+    '%d-%m-%Y', '%m-%d-%Y', '%d.%m.%Y', '%d/%m/%y', '%m/%d/%y',
+    '%d %b %Y', '%d-%b-%Y', '%b %d, %Y', '%d %B %Y', '%B %d, %Y',
+]
+BOOLEAN_VALUES = {'true': True, 'false': False, 'yes': True, 'no': False, 'y': True, 'n': False,
+                  't': True, 'f': False, '1': True, '0': False}
+
+_CURRENCY = r'[$€£¥₹]|^[A-Z]{3}\s?[-+(]?\d|\d\)?\s?[A-Z]{3}$'
+# Currency symbols and codes, spaces and parentheses; signs are read separately
+_NOISE = r'[$€£¥₹()\s]|^[A-Z]{3}|[A-Z]{3}$'
+_US_NUMBER = r'[-+]?\d{1,3}(,\d{3})+(\.\d+)?[-+]?|[-+]?\d+\.\d+[-+]?'
+_EU_NUMBER = r'[-+]?\d{1,3}(\.\d{3})+(,\d+)?[-+]?|[-+]?\d+,\d+[-+]?'
+# Digit strings kept as text: zero-padded codes and numbers too long for float64 (cards, IBAN digits)
+_IDENTIFIER = r'0\d+|\d{16,}'
+
+
+def _sample(series, size, seed=0):
+    if len(series) > size:
+        positions = np.random.default_rng(seed).choice(len(series), size, replace=False)
+        series = series.iloc[np.sort(positions)]
+    return series.dropna()
+
+
+def _text(series):
+    return series.astype(str).str.strip()
+
+
+def _decimal_mark(text):
+    """',' when the values are written 1.234,50 rather than 1,234.50."""
+    stripped = text.str.replace(_NOISE, '', regex=True)
+    european = stripped.str.fullmatch(_EU_NUMBER).sum()
+    return ',' if european > stripped.str.fullmatch(_US_NUMBER).sum() else '.'
+
+
+def parse_numbers(text, decimal='.'):
+    """Numbers read from bank-style strings, vectorized: "$1,234.50", "(120.00)", "USD 12", "45.10-".
+
+    Currency symbols and codes, spaces and thousands separators are dropped;
+    parentheses and leading or trailing minus signs make a value negative.
+    Returns (float64 Series with NaN where nothing parsed, cleaned digit strings).
+    """
+    negative = text.str.startswith('(') & text.str.endswith(')')
+    cleaned = text.str.replace(_NOISE, '', regex=True)
+    negative |= cleaned.str.startswith('-') | cleaned.str.endswith('-')
+    cleaned = cleaned.str.replace(r'^[-+]|[-+]$', '', regex=True)
+    cleaned = cleaned.str.replace(',' if decimal == '.' else '.', '', regex=False)
+    if decimal == ',':
+        cleaned = cleaned.str.replace(',', '.', regex=False)
+    cleaned = cleaned.where(cleaned.str.fullmatch(r'\d+(\.\d*)?|\.\d+').fillna(False).astype(bool))
+    if pa is not None:
+        # Every remaining string is a plain decimal, so Arrow's cast cannot fail (and is ~20x faster)
+        numbers = pd.Series(pa.array(cleaned, type=pa.string(), from_pandas=True).cast(pa.float64())
+                            .to_numpy(zero_copy_only=False), index=cleaned.index)
+    else:
+        numbers = pd.to_numeric(cleaned, errors='coerce').astype('float64')
+    return numbers.where(~negative.fillna(False).astype(bool), -numbers), cleaned
+
+
+def detect_date_format(text):
+    """The explicit format that parses the most values (and its share), or (None, 0.0)."""
+    best, best_share = None, 0.0
+    for fmt in DATE_FORMATS:
+        share = pd.to_datetime(text, format=fmt, errors='coerce').notna().mean()
+        if share > best_share:
+            best, best_share = fmt, float(share)
+    return best, best_share
+
+
+def infer_column(series, sample_size=SAMPLE_SIZE):
+    """Proposed target type for one column, read from a sample of its values.
+
+    Only text and categorical columns get proposals; columns that are already
+    numeric, boolean or dates are kept. Returns a dict with `target`,
+    `format` (a date format or the decimal mark) and `parsed_share`, the
+    share of sampled values the target parses.
+    """
+    proposal = {'current': str(series.dtype), 'target': 'keep', 'format': None, 'parsed_share': 1.0, 'example': None}
+    if not (is_text_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype)):
+        return proposal
+    values = _sample(series, sample_size)
+    if values.empty:
+        return proposal
+    text = _text(values)
+    proposal['example'] = text.iloc[0]
+
+    lowered = text.str.lower()
+    is_bool = lowered.isin(BOOLEAN_VALUES.keys())
+    if is_bool.mean() >= PARSE_THRESHOLD and not lowered.isin(['0', '1']).all():
+        proposal.update(target='boolean', parsed_share=float(is_bool.mean()))
+        return proposal
+
+    if not text.str.fullmatch(_IDENTIFIER).any():
+        decimal = _decimal_mark(text)
+        numbers, cleaned = parse_numbers(text, decimal)
+        share = float(numbers.notna().mean())
+        if share >= PARSE_THRESHOLD:
+            money = text.str.contains(_CURRENCY, regex=True).any() or text.str.startswith('(').any()
+            if money and pa is not None:
+                target = 'money'
+            elif cleaned.str.contains('.', regex=False).any():
+                target = 'float'
+            else:
+                target = 'integer'
+            proposal.update(target=target, format=decimal, parsed_share=share)
+            return proposal
+
+    fmt, share = detect_date_format(text)
+    if share >= PARSE_THRESHOLD:
+        proposal.update(target='datetime', format=fmt, parsed_share=share)
+        return proposal
+
+    if is_text_dtype(series.dtype) and is_low_cardinality(values):
+        proposal['target'] = 'category'
+    return proposal
+
+
+def infer_schema(df, columns=None, sample_size=SAMPLE_SIZE):
+    """`infer_column` for each column of `df`, as a DataFrame indexed by column name."""
+    columns = df.columns if columns is None else columns
+    records = {col: infer_column(df[col], sample_size) for col in columns}
+    return pd.DataFrame.from_dict(records, orient='index', columns=PROPOSAL_COLUMNS)
+
+
+def dataset_schema(dataset):
+    """Proposals for a VersionedDataset, cached per version; edits only re-infer edited columns."""
+    def update(df, previous, changed):
+        stale = [c for c in df.columns if c in changed or c not in previous.index]
+        kept = previous.reindex([c for c in df.columns if c not in stale])
+        return pd.concat([kept, infer_schema(df, stale)]).reindex(df.columns) if stale else kept
+
+    return dataset.cached('schema', infer_schema, update)
+
+
+def _money(numbers, cleaned):
+    """Exact Decimal values (Arrow decimal128) built from the cleaned digit strings."""
+    point = cleaned.str.find('.')
+    decimals = (cleaned.str.len() - point - 1).where(point >= 0)
+    scale = int(min(max(decimals.max() if decimals.notna().any() else 0, 2), MAX_SCALE))
+    digits = cleaned.where(numbers.notna())
+    signed = digits.where(numbers.isna() | (numbers >= 0), '-' + digits)
+    decimal_type = pa.decimal128(38, scale)
+    try:
+        array = pa.array(signed.to_numpy(dtype=object), type=pa.string(), from_pandas=True).cast(decimal_type)
+    except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+        # More digits after the point than MAX_SCALE: round through float64
+        array = pa.array(numbers.round(scale).to_numpy(), from_pandas=True).cast(decimal_type, safe=False)
+    return pd.Series(array, dtype=pd.ArrowDtype(decimal_type), index=numbers.index)
+
+
+def _to_number(numbers, target):
+    """float64 `numbers` as a float column, or as the smallest integer column that holds them."""
+    if target == 'float':
+        return numbers
+    # Fractions do not fit an integer column; they count as coerced
+    numbers = numbers.where(numbers == numbers.round())
+    return downcast_numeric(numbers.astype('int64')) if numbers.notna().all() else numbers.astype('Int64')
+
+
+def _convert_values(values, target, fmt):
+    """`values` (text, no categories) converted to `target`; unparseable values become null."""
+    if target == 'datetime':
+        return pd.to_datetime(values, format=fmt, errors='coerce') if fmt else pd.to_datetime(values, errors='coerce')
+    if target == 'boolean':
+        return _text(values).str.lower().map(BOOLEAN_VALUES).astype('boolean')
+    if target in ('integer', 'float', 'money'):
+        numbers, cleaned = parse_numbers(_text(values), fmt or '.')
+        if target == 'money' and pa is not None:
+            return _money(numbers, cleaned)
+        return _to_number(numbers, target)
+    if target == 'category':
+        return values.astype('category')
+    if target == 'text':
+        return values.astype('string')
+    raise ValueError(f"Unknown target type: {target}")
+
+
+def convert_column(series, target, fmt=None):
+    """`series` converted to `target` (see TARGETS) and the number of values coerced to null.
+
+    Conversions are vectorized. Text and categorical columns are parsed
+    through their distinct values (the categories, or `pd.factorize`), so
+    repeated values are parsed once; numeric columns given a numeric target
+    are cast directly.
+    """
+    if target == 'keep':
+        return series, 0
+    if target in ('integer', 'float') and pd.api.types.is_numeric_dtype(series.dtype) \
+            and not pd.api.types.is_bool_dtype(series.dtype):
+        converted = _to_number(series.astype('float64'), target)
+    elif target in ('category', 'text') or not (
+            is_text_dtype(series.dtype) or isinstance(series.dtype, pd.CategoricalDtype)):
+        converted = _convert_values(series, target, fmt)
+    else:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes, distinct = series.cat.codes.to_numpy(), series.cat.categories.astype(str)
+        else:
+            codes, distinct = pd.factorize(series)
+        values = _convert_values(pd.Series(distinct), target, fmt)
+        # -1 (null) codes are not in the index, so they come back as null; a
+        # numpy integer result would turn float64, so it is made nullable first
+        if (codes == -1).any() and pd.api.types.is_integer_dtype(values.dtype) \
+                and not pd.api.types.is_extension_array_dtype(values.dtype):
+            values = values.astype('Int64')
+        converted = values.reindex(codes)
+        converted.index = series.index
+    converted.name = series.name
+    coerced = int((series.notna().to_numpy() & converted.isna().to_numpy()).sum())
+    return converted, coerced
+
+
+def convert_columns(df, plan):
+    """Apply {column: (target, format)} to `df`; returns ({column: converted}, report DataFrame)."""
+    converted, records = {}, []
+    for column, (target, fmt) in plan.items():
+        if target == 'keep':
+            continue
+        series = df[column]
+        result, coerced = convert_column(series, target, fmt)
+        converted[column] = result
+        records.append({'column': column, 'from': str(series.dtype), 'to': str(result.dtype), 'format': fmt,
+                        'converted': int(result.notna().sum()), 'coerced_to_null': coerced})
+    return converted, pd.DataFrame(records, columns=REPORT_COLUMNS)
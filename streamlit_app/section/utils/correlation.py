@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+from section.utils.charts import numeric_columns
+
+METHODS = ['pearson', 'spearman']
+PRECISIONS = ['float64', 'float32']
+# Rows multiplied at a time, so wide or long frames never need more than one block in memory
+ROW_BLOCK = 262_144
+# Above this many columns the heatmap is replaced by the strongest pairs
+WIDE_COLUMNS = 30
+# Cell labels are only drawn on heatmaps up to this size
+LABEL_COLUMNS = 15
+TOP_K = 25
+
+
+def _prepared(df, columns, method):
+    """Columns as float64 with NaN for missing values, ranked for Spearman."""
+    frame = df[columns]
+    if method == 'spearman':
+        frame = frame.rank(method='average')
+    values = np.empty((len(frame), len(columns)), dtype='float64')
+    for j, column in enumerate(columns):
+        values[:, j] = frame[column].to_numpy(dtype='float64', na_value=np.nan)
+    values[~np.isfinite(values)] = np.nan
+    return values
+
+
+def _pairwise(left, right, dtype):
+    """Pairwise-complete correlations between the columns of `left` and of `right`.
+
+    Each column is shifted by its own mean before any products are summed,
+    so the one-pass sums below stay accurate even for large offsets (account
+    numbers, balances) and in float32. Sums run over row blocks and are
+    accumulated in float64. Without missing values a single product of the
+    centred blocks is enough.
+    """
+    if not np.isnan(left).any() and not np.isnan(right).any():
+        return _complete(left, right, dtype)
+    shift_l = np.nan_to_num(np.nanmean(left, axis=0)) if len(left) else 0.0
+    shift_r = np.nan_to_num(np.nanmean(right, axis=0)) if len(right) else 0.0
+    shape = (left.shape[1], right.shape[1])
+    n, sx, sy, sxx, syy, sxy = (np.zeros(shape) for _ in range(6))
+    for start in range(0, len(left), ROW_BLOCK):
+        a = (left[start:start + ROW_BLOCK] - shift_l).astype(dtype)
+        b = (right[start:start + ROW_BLOCK] - shift_r).astype(dtype)
+        ma, mb = ~np.isnan(a), ~np.isnan(b)
+        a[~ma] = 0
+        b[~mb] = 0
+        ma, mb = ma.astype(dtype), mb.astype(dtype)
+        n += ma.T @ mb
+        sx += a.T @ mb
+        sy += ma.T @ b
+        sxx += (a * a).T @ mb
+        syy += ma.T @ (b * b)
+        sxy += a.T @ b
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = sxy - sx * sy / n
+        var_x = sxx - sx * sx / n
+        var_y = syy - sy * sy / n
+        corr = cov / np.sqrt(var_x * var_y)
+    corr[(n < 2) | (var_x <= 0) | (var_y <= 0)] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def _complete(left, right, dtype):
+    """`_pairwise` for columns without missing values (two-pass: exact means, then products)."""
+    if len(left) < 2:
+        return np.full((left.shape[1], right.shape[1]), np.nan)
+    mean_l, mean_r = left.mean(axis=0), right.mean(axis=0)
+    sxy = np.zeros((left.shape[1], right.shape[1]))
+    sxx, syy = np.zeros(left.shape[1]), np.zeros(right.shape[1])
+    for start in range(0, len(left), ROW_BLOCK):
+        a = (left[start:start + ROW_BLOCK] - mean_l).astype(dtype)
+        b = (right[start:start + ROW_BLOCK] - mean_r).astype(dtype)
+        sxy += a.T @ b
+        sxx += np.einsum('ij,ij->j', a, a)
+        syy += np.einsum('ij,ij->j', b, b)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        corr = sxy / np.sqrt(np.outer(sxx, syy))
+    corr[(sxx <= 0)[:, None] | (syy <= 0)[None, :]] = np.nan
+    return np.clip(corr, -1.0, 1.0)
+
+
+def correlation_matrix(df, method='pearson', dtype='float64', columns=None):
+    """Correlation matrix of every numeric column (any int/float width).
+
+    Missing values are dropped pair by pair, like `DataFrame.corr` (Spearman
+    ranks each column once, over all of its values). `dtype` picks the
+    precision of the products: float32 halves the memory and is faster on
+    wide tables at the cost of a few decimal places.
+    """
+    columns = numeric_columns(df) if columns is None else list(columns)
+    values = _prepared(df, columns, method)
+    corr = _pairwise(values, values, dtype)
+    np.fill_diagonal(corr, 1.0)
+    corr = (corr + corr.T) / 2
+    return pd.DataFrame(corr, index=columns, columns=columns)
+
+
+def update_correlation(df, previous, changed, method='pearson', dtype='float64'):
+    """Refresh `previous` after edits to the `changed` columns only.
+
+    Rows and columns of the matrix for untouched columns are reused; the
+    changed (and newly numeric) columns are correlated against all the
+    others. Falls back to a full recompute when most columns changed.
+    """
+    columns = numeric_columns(df)
+    stale = [c for c in columns if c in changed or c not in previous.index]
+    if len(stale) * 2 > len(columns):
+        return correlation_matrix(df, method, dtype, columns)
+    matrix = previous.reindex(index=columns, columns=columns)
+    if stale:
+        values = _prepared(df, columns, method)
+        positions = [columns.index(c) for c in stale]
+        block = _pairwise(values[:, positions], values, dtype)
+        for row, j in enumerate(positions):
+            block[row, j] = 1.0
+        matrix.loc[stale, :] = block
+        matrix.loc[:, stale] = block.T
+    return matrix
+
+
+def dataset_correlation(dataset, method='pearson', dtype='float64'):
+    """Correlation matrix of a VersionedDataset, cached per version and updated incrementally."""
+    return dataset.cached(
+        ('correlation', method, dtype),
+        lambda df: correlation_matrix(df, method, dtype),
+        lambda df, previous, changed: update_correlation(df, previous, changed, method, dtype),
+    )
+
+
+def strongest_pairs(matrix, k=TOP_K):
+    """The `k` column pairs with the largest absolute correlation, strongest first."""
+    values = matrix.to_numpy()
+    upper = np.triu_indices(len(values), k=1)
+    pairs = pd.DataFrame({
+        'column_a': matrix.index[upper[0]],
+        'column_b': matrix.columns[upper[1]],
+        'correlation': values[upper],
+    }).dropna(subset=['correlation'])
+    order = np.argsort(-np.abs(pairs['correlation'].to_numpy()), kind='stable')[:k]
+    return pairs.iloc[order].reset_index(drop=True)
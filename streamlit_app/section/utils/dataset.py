@@ -0,0 +1,573 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from section.utils.diff import compute_change_masks
+
+_versions = itertools.count(1)
+# Versions remembered by `changes_since`; older results are recomputed in full
+CHANGE_LOG_SIZE = 256
+CHANGE_SET_COLUMNS = ['row', 'column', 'old_value', 'new_value', 'change']
+
+
+class _CellDelta:
+    """New values for some cells of one column (old values kept for undo)."""
+
+    def __init__(self, column, rows, old, new):
+        self.column = column
+        self.rows = rows
+        self.old = old
+        self.new = new
+
+    def apply(self, dataset):
+        dataset._write_cells(self.column, self.rows, self.new)
+
+    def revert(self, dataset):
+        dataset._write_cells(self.column, self.rows, self.old)
+
+    def nbytes(self):
+        return self.rows.nbytes + _nbytes(self.old) + _nbytes(self.new)
+
+
+class _ColumnDelta:
+    """A whole column replaced, added (`old` is None) or dropped (`new` is None)."""
+
+    def __init__(self, column, old, new, position):
+        self.column = column
+        self.old = old
+        self.new = new
+        self.position = position
+
+    def _put(self, dataset, series):
+        frame = dataset._writable()
+        if series is None:
+            frame.drop(columns=[self.column], inplace=True)
+        elif self.column in frame.columns:
+            frame[self.column] = series
+        else:
+            frame.insert(min(self.position, len(frame.columns)), self.column, series)
+        dataset._copied.discard(self.column)
+
+    def apply(self, dataset):
+        self._put(dataset, self.new)
+
+    def revert(self, dataset):
+        self._put(dataset, self.old)
+
+    def nbytes(self):
+        return sum(s.memory_usage(index=False) for s in (self.old, self.new) if s is not None)
+
+
+class _RowDelta:
+    """Rows inserted (`rows` holds them) or deleted (`rows` holds what was removed)."""
+
+    def __init__(self, rows, deleted, positions=None):
+        self.rows = rows
+        self.deleted = deleted
+        self.positions = positions
+
+    def _insert(self, dataset):
+        frame = dataset._writable()
+        rows = self.rows.copy(deep=False)
+        for column in frame.columns:
+            if column in rows.columns and isinstance(frame[column].dtype, pd.CategoricalDtype):
+                # Keep categorical columns categorical instead of widening to object
+                categories = frame[column].cat.categories.union(pd.Index(rows[column].dropna().unique()))
+                dtype = pd.CategoricalDtype(categories)
+                frame[column] = frame[column].astype(dtype)
+                rows[column] = rows[column].astype(dtype)
+        combined = pd.concat([frame, rows])
+        if self.positions is not None:
+            # Put deleted rows back where they were
+            order = np.concatenate([_positions_around(len(frame), self.positions), np.asarray(self.positions, dtype=float)])
+            combined = combined.iloc[np.argsort(order, kind='stable')]
+        dataset._replace(combined)
+
+    def _remove(self, dataset):
+        dataset._replace(dataset._writable().drop(index=self.rows.index))
+
+    def apply(self, dataset):
+        self._remove(dataset) if self.deleted else self._insert(dataset)
+
+    def revert(self, dataset):
+        self._insert(dataset) if self.deleted else self._remove(dataset)
+
+    def nbytes(self):
+        return int(self.rows.memory_usage(index=True).sum())
+
+
+class _BatchDelta:
+    """Several cell and column deltas recorded as one journal entry (one undo step)."""
+
+    def __init__(self, deltas):
+        self.deltas = deltas
+
+    def apply(self, dataset):
+        for delta in self.deltas:
+            delta.apply(dataset)
+
+    def revert(self, dataset):
+        for delta in reversed(self.deltas):
+            delta.revert(dataset)
+
+    def nbytes(self):
+        return sum(delta.nbytes() for delta in self.deltas)
+
+
+def _flattened(journal):
+    """Journal entries with batches expanded into the deltas they hold."""
+    for delta in journal:
+        if isinstance(delta, _BatchDelta):
+            yield from delta.deltas
+        else:
+            yield delta
+
+
+def _touched(delta):
+    """Columns and row labels a delta changed, for the change log (None where unknown)."""
+    if isinstance(delta, _CellDelta):
+        return {delta.column}, np.asarray(delta.rows)
+    if isinstance(delta, _ColumnDelta):
+        return {delta.column}, None
+    if isinstance(delta, _BatchDelta):
+        parts = [_touched(part) for part in delta.deltas]
+        columns = set().union(*(part_columns for part_columns, _ in parts))
+        if any(part_rows is None for _, part_rows in parts):
+            return columns, None
+        return columns, np.concatenate([part_rows for _, part_rows in parts])
+    return None, np.asarray(delta.rows.index)
+
+
+def _positions_around(kept, removed_positions):
+    """Original positions of the rows that survived a deletion."""
+    removed = np.sort(np.asarray(removed_positions))
+    survivors = np.arange(kept + len(removed))
+    return np.setdiff1d(survivors, removed).astype(float)
+
+
+def _dtype_changed(old, new):
+    """Whether a column needs a whole-column delta (categories alone can grow in place)."""
+    if isinstance(old, pd.CategoricalDtype) and isinstance(new, pd.CategoricalDtype):
+        return False
+    return old != new
+
+
+def _nbytes(values):
+    values = np.asarray(values)
+    return values.nbytes if values.dtype != object else values.size * 8
+
+
+class VersionedDataset:
+    """An uploaded dataset as an immutable base frame plus a journal of edits.
+
+    Edits are recorded as cell, column and row deltas that keep both the old
+    and the new values, so undo and redo replay a single delta instead of
+    restoring a full copy. The current frame shares every untouched column
+    with the base (a column is copied the first time it is written), so
+    "original" and "current" together cost little more than one dataset.
+    """
+
+    def __init__(self, base, token=None):
+        if not base.index.is_unique:
+            base = base.reset_index(drop=True)
+        self._base = base
+        self._current = None
+        self._copied = set()
+        self._journal = []
+        self._redo = []
+        self.token = token
+        self.version = next(_versions)
+        # Unique per dataset (versions come from one process-wide counter)
+        self.uid = self.version
+        self._memo = {}
+        self._changes = []
+
+    # --- Reading -----------------------------------------------------------
+
+    @property
+    def base(self):
+        """The frame as it was loaded (or last compacted). Do not modify."""
+        return self._base
+
+    @property
+    def current(self):
+        """The frame with every journal entry applied. Do not modify in place."""
+        return self._base if self._current is None else self._current
+
+    @property
+    def can_undo(self):
+        return bool(self._journal)
+
+    @property
+    def can_redo(self):
+        return bool(self._redo)
+
+    @property
+    def journal_length(self):
+        return len(self._journal)
+
+    def changed_columns(self):
+        """Columns touched by any journal entry since the base."""
+        columns = set()
+        for delta in _flattened(self._journal):
+            if isinstance(delta, (_CellDelta, _ColumnDelta)):
+                columns.add(delta.column)
+            else:
+                columns.update(delta.rows.columns)
+        return columns
+
+    def change_masks(self):
+        """Edited and null masks of `current` against `base`.
+
+        Only the columns named in the journal are compared; every other
+        column is reported as unedited without looking at its values.
+        """
+        current = self.current
+        touched = [c for c in current.columns if c in self.changed_columns()]
+        edited = pd.DataFrame(False, index=current.index, columns=current.columns)
+        if touched:
+            touched_edited, _ = compute_change_masks(current[touched], self._base)
+            edited[touched] = touched_edited
+        return edited, current.isna()
+
+    def _journal_changes(self):
+        """Candidate rows per column, plus added and removed row labels, read from the journal.
+
+        A column maps to None when it was replaced as a whole (every row is a
+        candidate). Candidates may include cells later set back to their
+        original value; `change_set` compares them before reporting.
+        """
+        candidates, added, removed = {}, set(), set()
+        for delta in _flattened(self._journal):
+            if isinstance(delta, _CellDelta):
+                if candidates.get(delta.column, ()) is not None:
+                    candidates.setdefault(delta.column, set()).update(delta.rows.tolist())
+            elif isinstance(delta, _ColumnDelta):
+                candidates[delta.column] = None
+            elif delta.deleted:
+                for label in delta.rows.index:
+                    if label in added:
+                        added.discard(label)
+                    else:
+                        removed.add(label)
+            else:
+                added.update(delta.rows.index)
+        return candidates, added, removed
+
+    def change_set(self):
+        """Every changed cell since the base, one row each, built from the journal.
+
+        Columns are `row`, `column`, `old_value`, `new_value` and `change`
+        ("edited", "added" or "removed", like `diff.changed_cells`). Only the
+        cells named by the journal are compared, so the cost follows the
+        number of edits rather than the size of the table. Cached per version.
+        """
+        return self.cached('change_set', self._build_change_set)
+
+    def _build_change_set(self, current):
+        candidates, added, removed = self._journal_changes()
+        base = self._base
+        records = []
+        for column, rows in candidates.items():
+            if column not in current.columns:
+                continue
+            if rows is None:
+                labels = current.index.difference(pd.Index(list(added)))
+            else:
+                labels = pd.Index(list(rows)).difference(pd.Index(list(added))).intersection(current.index)
+            if column not in base.columns or len(labels) == 0:
+                continue
+            new, old = current.loc[labels, [column]], base.loc[labels, [column]]
+            mask = compute_change_masks(new, old)[0][column].to_numpy()
+            if mask.any():
+                records.append(pd.DataFrame({
+                    'row': labels[mask], 'column': column,
+                    'old_value': old[column].to_numpy(dtype=object)[mask],
+                    'new_value': new[column].to_numpy(dtype=object)[mask], 'change': 'edited'}))
+        new_columns = [c for c in current.columns if c not in base.columns]
+        for column in new_columns:
+            values = current[column]
+            labels = values.index[values.notna().to_numpy()]
+            records.append(pd.DataFrame({'row': labels, 'column': column, 'old_value': None,
+                                         'new_value': values.loc[labels].to_numpy(dtype=object), 'change': 'added'}))
+        if added:
+            rows = current.loc[current.index.intersection(pd.Index(list(added)))]
+            stacked = rows.astype(object).stack()
+            records.append(pd.DataFrame({'row': stacked.index.get_level_values(0),
+                                         'column': stacked.index.get_level_values(1), 'old_value': None,
+                                         'new_value': stacked.to_numpy(), 'change': 'added'}))
+        if removed:
+            records.append(pd.DataFrame({'row': list(removed), 'column': None, 'old_value': None,
+                                         'new_value': None, 'change': 'removed'}))
+        dropped = [c for c in base.columns if c not in current.columns]
+        if dropped:
+            records.append(pd.DataFrame({'row': None, 'column': dropped, 'old_value': None,
+                                         'new_value': None, 'change': 'removed'}))
+        records = [r for r in records if len(r)]
+        if not records:
+            return pd.DataFrame(columns=CHANGE_SET_COLUMNS)
+        return pd.concat(records, ignore_index=True)
+
+    def _log_since(self, version):
+        """Change log entries after `version`, or None if `version` is older than the log."""
+        if version == self.version:
+            return []
+        if not self._changes or version < self._changes[0][0]:
+            return None
+        return [entry for entry in self._changes if entry[0] > version]
+
+    def changes_since(self, version):
+        """Columns whose values changed after `version`, or None if that is unknown.
+
+        None means rows were inserted or deleted, or `version` is older than
+        the change log, so anything derived from it has to be recomputed.
+        """
+        entries = self._log_since(version)
+        if entries is None:
+            return None
+        columns = set()
+        for _, changed, _ in entries:
+            if changed is None:
+                return None
+            columns |= changed
+        return columns
+
+    def rows_changed_since(self, version):
+        """Labels of the rows edited, inserted or deleted after `version`, or None if unknown.
+
+        None also covers whole-column changes, which touch every row.
+        """
+        entries = self._log_since(version)
+        if entries is None:
+            return None
+        labels = []
+        for _, _, rows in entries:
+            if rows is None:
+                return None
+            labels.append(rows)
+        return pd.Index(np.concatenate(labels)).unique() if labels else pd.Index([])
+
+    def cached(self, name, compute, update=None):
+        """Return `compute(current)`, computed at most once per dataset version.
+
+        Derived results (profiles, chart data, ...) are memoized under `name`
+        and recomputed only after the data changes. With `update`, a stale
+        result is refreshed by `update(current, previous, changed_columns)`
+        when only known columns changed since it was computed.
+        """
+        hit = self._memo.get(name)
+        if hit is not None and hit[0] == self.version:
+            return hit[1]
+        changed = self.changes_since(hit[0]) if hit is not None and update is not None else None
+        if changed is not None:
+            value = update(self.current, hit[1], changed)
+        else:
+            value = compute(self.current)
+        self._memo[name] = (self.version, value)
+        return value
+
+    def memory_usage(self):
+        """Approximate bytes held by the base, the copied columns and the journal."""
+        base = int(self._base.memory_usage(index=True).sum())
+        overlay = 0
+        if self._current is not None:
+            overlay = int(sum(self._current[c].memory_usage(index=False) for c in self._copied if c in self._current))
+            if self._current.index is not self._base.index:
+                overlay += int(self._current.index.memory_usage())
+        journal = int(sum(delta.nbytes() for delta in self._journal + self._redo))
+        return {'base': base, 'overlay': overlay, 'journal': journal, 'total': base + overlay + journal}
+
+    # --- Writing -----------------------------------------------------------
+
+    def _writable(self):
+        if self._current is None:
+            self._current = self._base.copy(deep=False)
+        return self._current
+
+    def _replace(self, frame):
+        # Row inserts and deletes rebuild every column, so nothing is shared any more
+        self._current = frame
+        self._copied = set(frame.columns)
+
+    def _write_cells(self, column, rows, values):
+        frame = self._writable()
+        if column not in self._copied:
+            frame[column] = frame[column].copy()
+            self._copied.add(column)
+        positions = frame.index.get_indexer(rows)
+        j = frame.columns.get_loc(column)
+        series = frame[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            missing = pd.Index(pd.Series(values).dropna().unique()).difference(series.cat.categories)
+            if len(missing):
+                frame[column] = series.cat.add_categories(missing)
+        try:
+            frame.iloc[positions, j] = values
+        except (TypeError, ValueError):
+            # The new values don't fit the current dtype (e.g. NaN in an int column)
+            frame[column] = series.astype(object)
+            frame.iloc[positions, j] = values
+            frame[column] = frame[column].infer_objects()
+
+    def _restore_dtypes(self, dtypes):
+        """Cast columns back to the dtypes they had before an undone delta widened them."""
+        frame = self._writable()
+        for column, dtype in dtypes.items():
+            if column in frame.columns and frame[column].dtype != dtype:
+                try:
+                    frame[column] = frame[column].astype(dtype)
+                except (TypeError, ValueError):
+                    pass
+
+    def _bump(self, delta=None):
+        """Move to a new version, logging which columns `delta` touched."""
+        previous = self.version
+        self.version = next(_versions)
+        changed, rows = (set(), np.asarray([])) if delta is None else _touched(delta)
+        if not self._changes:
+            self._changes.append((previous, set(), np.asarray([])))
+        self._changes.append((self.version, changed, rows))
+        del self._changes[:-CHANGE_LOG_SIZE]
+
+    def _record(self, delta):
+        delta.dtypes = self.current.dtypes
+        delta.apply(self)
+        self._journal.append(delta)
+        self._redo.clear()
+        self._bump(delta)
+
+    def set_cells(self, column, rows, values):
+        """Set `column` at the row labels `rows` to `values`."""
+        rows = np.asarray(rows)
+        old = self.current.loc[rows, column].to_numpy(copy=True)
+        self._record(_CellDelta(column, rows, old, np.asarray(values)))
+
+    def set_column(self, column, series):
+        """Replace (or add) a whole column, e.g. after a dtype conversion."""
+        current = self.current
+        old = current[column] if column in current.columns else None
+        position = current.columns.get_loc(column) if old is not None else len(current.columns)
+        self._record(_ColumnDelta(column, old, series.reindex(current.index), position))
+
+    def _column_update(self, column, series):
+        """The delta turning `column` into `series`, or None if no value changes."""
+        current = self.current
+        old = current[column]
+        series = series.reindex(old.index)
+        if _dtype_changed(old.dtype, series.dtype):
+            return _ColumnDelta(column, old, series, current.columns.get_loc(column))
+        edited, _ = compute_change_masks(series.to_frame(), old.to_frame())
+        mask = edited[column].to_numpy()
+        if not mask.any():
+            return None
+        rows = old.index[mask].to_numpy()
+        return _CellDelta(column, rows, old.to_numpy(copy=True)[mask], series.to_numpy()[mask])
+
+    def update_column(self, column, series):
+        """Record a new version of `column`, storing only the cells that changed.
+
+        Falls back to a whole-column delta when the dtype changes.
+        """
+        delta = self._column_update(column, series)
+        if delta is not None:
+            self._record(delta)
+
+    def update_columns(self, columns):
+        """Record new versions of several columns ({name: series}) as one journal entry.
+
+        Like `update_column` per column, but undone and redone as a single
+        step. Returns the number of columns that changed.
+        """
+        deltas = [delta for delta in (self._column_update(c, s) for c, s in columns.items()) if delta is not None]
+        if len(deltas) == 1:
+            self._record(deltas[0])
+        elif deltas:
+            self._record(_BatchDelta(deltas))
+        return len(deltas)
+
+    def drop_columns(self, columns):
+        for column in columns:
+            current = self.current
+            self._record(_ColumnDelta(column, current[column], None, current.columns.get_loc(column)))
+
+    def insert_rows(self, rows):
+        self._record(_RowDelta(rows, deleted=False))
+
+    def delete_rows(self, labels):
+        current = self.current
+        positions = current.index.get_indexer(labels)
+        self._record(_RowDelta(current.loc[labels], deleted=True, positions=positions))
+
+    def apply_frame(self, edited, labels=None):
+        """Journal the differences between `edited` and `current`.
+
+        Used with `st.data_editor`, which returns a full edited frame. With
+        `labels`, `edited` is an edited window (a page or filtered slice) of
+        those rows only: rows outside it are left alone, and added rows whose
+        label already exists elsewhere get fresh labels. Returns the number
+        of deltas recorded (0 when nothing changed).
+        """
+        current = self.current
+        recorded = len(self._journal)
+        shown = current.index if labels is None else current.index.intersection(labels)
+
+        removed = shown.difference(edited.index)
+        if len(removed):
+            self.delete_rows(removed)
+        added = edited.index.difference(shown)
+        if len(added):
+            rows = edited.loc[added, [c for c in edited.columns if c in current.columns]]
+            if labels is not None and (rows.index.isin(current.index).any() or rows.index.hasnans):
+                rows.index = self._fresh_labels(len(rows))
+            self.insert_rows(rows)
+
+        current = self.current
+        kept = shown[~shown.isin(removed)]
+        columns = [c for c in current.columns if c in edited.columns]
+        common = edited.loc[kept, columns]
+        edited_mask, _ = compute_change_masks(common, current.loc[kept, columns] if labels is not None else current)
+        for column in edited_mask.columns[edited_mask.to_numpy().any(axis=0)]:
+            if _dtype_changed(current[column].dtype, common[column].dtype) and labels is None:
+                self.set_column(column, common[column])
+            else:
+                mask = edited_mask[column].to_numpy()
+                self.set_cells(column, common.index[mask], common[column].to_numpy()[mask])
+        return len(self._journal) - recorded
+
+    def _fresh_labels(self, count):
+        index = self.current.index
+        if len(index) and not pd.api.types.is_integer_dtype(index.dtype):
+            return pd.Index([f"new_{self.version}_{i}" for i in range(count)])
+        start = int(index.max()) + 1 if len(index) else 0
+        return pd.RangeIndex(start, start + count)
+
+    # --- History -----------------------------------------------------------
+
+    def undo(self):
+        if not self._journal:
+            return False
+        delta = self._journal.pop()
+        delta.revert(self)
+        self._restore_dtypes(delta.dtypes)
+        self._redo.append(delta)
+        self._bump(delta)
+        return True
+
+    def redo(self):
+        if not self._redo:
+            return False
+        delta = self._redo.pop()
+        delta.apply(self)
+        self._journal.append(delta)
+        self._bump(delta)
+        return True
+
+    def compact(self):
+        """Fold the journal into a new base snapshot, dropping undo history."""
+        self._base = self.current
+        self._current = None
+        self._copied = set()
+        self._journal.clear()
+        self._redo.clear()
+        self._bump()
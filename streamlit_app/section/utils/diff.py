@@ -0,0 +1,158 @@
+import numpy as np
+import pandas as pd
+
+EDITED_STYLE = 'background-color: #90ee90; color: black;'  # light green
+NULL_STYLE = 'background-color: yellow;'
+CRITICAL_STYLE = 'background-color: #ffd8a8; color: black;'  # light orange
+
+
+def _as_array(series):
+    """Column values as a NumPy array that `!=` can compare element-wise."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return np.asarray(series)
+    if pd.api.types.is_extension_array_dtype(series.dtype) and pd.api.types.is_numeric_dtype(series.dtype):
+        return series.to_numpy(dtype='float64', na_value=np.nan)
+    return series.to_numpy()
+
+
+def _values_differ(new, old):
+    """Element-wise inequality of two non-null value arrays, dtype aware.
+
+    Numeric columns compare by value (so an int8 and an int64 holding the same
+    number are equal), matching dtypes compare natively, and anything else
+    falls back to comparing the string forms like the original cell loop did.
+    """
+    if new.dtype.kind in 'biuf' and old.dtype.kind in 'biuf':
+        return new != old
+    if new.dtype == old.dtype:
+        try:
+            return np.asarray(new != old, dtype=bool)
+        except (TypeError, ValueError):
+            pass
+    return new.astype(str) != old.astype(str)
+
+
+def _row_indexer(df, original_df):
+    """Position of every row of `df` inside `original_df` (-1 for added rows)."""
+    if df.index.is_unique and original_df.index.is_unique:
+        return original_df.index.get_indexer(df.index)
+    # Duplicate labels cannot be aligned by label; fall back to position.
+    indexer = np.arange(len(df))
+    indexer[indexer >= len(original_df)] = -1
+    return indexer
+
+
+def compute_change_masks(df, original_df):
+    """Compute the edited and null masks of `df` against `original_df`.
+
+    Rows are matched by index label and columns by name. A cell is edited when
+    its value differs from the original one; two nulls count as equal. Cells in
+    rows or columns that do not exist in `original_df` are edited when they hold
+    a value. Returns two boolean DataFrames shaped like `df`.
+    """
+    indexer = _row_indexer(df, original_df)
+    present = indexer >= 0
+    take = np.where(present, indexer, 0)
+
+    edited = np.zeros(df.shape, dtype=bool)
+    nulls = np.zeros(df.shape, dtype=bool)
+
+    for j, col in enumerate(df.columns):
+        new_series = df.iloc[:, j]
+        new_null = new_series.isna().to_numpy()
+        nulls[:, j] = new_null
+
+        if col not in original_df.columns or len(original_df) == 0:
+            edited[:, j] = ~new_null
+            continue
+
+        old_series = original_df[col]
+        if isinstance(old_series, pd.DataFrame):  # duplicate column names
+            old_series = old_series.iloc[:, 0]
+        old_null = old_series.isna().to_numpy()[take] | ~present
+
+        both = ~new_null & ~old_null
+        column_edited = new_null != old_null
+        if both.any():
+            new_values = _as_array(new_series)[both]
+            old_values = _as_array(old_series)[take][both]
+            column_edited[both] = _values_differ(new_values, old_values)
+        edited[:, j] = column_edited
+
+    return (
+        pd.DataFrame(edited, index=df.index, columns=df.columns),
+        pd.DataFrame(nulls, index=df.index, columns=df.columns),
+    )
+
+
+def changed_cells(df, original_df):
+    """Sparse list of differences between `df` and `original_df`.
+
+    Returns a DataFrame with one row per changed cell (`row`, `column`,
+    `old_value`, `new_value`, `change`), where `change` is "edited", "added"
+    (the row or column is new) or "removed" (the row or column was dropped).
+    """
+    edited, _ = compute_change_masks(df, original_df)
+    indexer = _row_indexer(df, original_df)
+    present = indexer >= 0
+    records = []
+
+    for j, col in enumerate(df.columns):
+        rows = np.flatnonzero(edited.iloc[:, j].to_numpy())
+        if len(rows) == 0:
+            continue
+        new_values = df.iloc[rows, j].tolist()
+        if col in original_df.columns:
+            old_column = original_df[col]
+            if isinstance(old_column, pd.DataFrame):
+                old_column = old_column.iloc[:, 0]
+            old_values = old_column.iloc[np.where(present[rows], indexer[rows], 0)].to_numpy(dtype=object)
+            old_values[~present[rows]] = None
+            kinds = np.where(present[rows], 'edited', 'added')
+        else:
+            old_values = [None] * len(rows)
+            kinds = np.full(len(rows), 'added')
+        records.append(pd.DataFrame({
+            'row': df.index[rows],
+            'column': col,
+            'old_value': old_values,
+            'new_value': new_values,
+            'change': kinds,
+        }))
+
+    removed_rows = original_df.index.difference(df.index) if original_df.index.is_unique and df.index.is_unique else []
+    if len(removed_rows):
+        records.append(pd.DataFrame({
+            'row': removed_rows,
+            'column': None,
+            'old_value': None,
+            'new_value': None,
+            'change': 'removed',
+        }))
+    removed_cols = [c for c in original_df.columns if c not in df.columns]
+    if removed_cols:
+        records.append(pd.DataFrame({
+            'row': None,
+            'column': removed_cols,
+            'old_value': None,
+            'new_value': None,
+            'change': 'removed',
+        }))
+
+    if not records:
+        return pd.DataFrame(columns=['row', 'column', 'old_value', 'new_value', 'change'])
+    return pd.concat(records, ignore_index=True)
+
+
+def style_frame(df, edited, nulls, critical_columns):
+    """Build the CSS frame for `Styler.apply(axis=None)` from precomputed masks."""
+    critical = set(critical_columns)
+    styles = np.empty(df.shape, dtype=object)
+    for j, col in enumerate(df.columns):
+        fallback = CRITICAL_STYLE if col in critical else ''
+        styles[:, j] = np.where(
+            edited.iloc[:, j].to_numpy(),
+            EDITED_STYLE,
+            np.where(nulls.iloc[:, j].to_numpy(), NULL_STYLE, fallback),
+        )
+    return pd.DataFrame(styles, index=df.index, columns=df.columns)
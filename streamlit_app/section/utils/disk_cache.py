@@ -0,0 +1,198 @@
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+except ImportError:  # pyarrow is optional; without it nothing is cached on disk
+    pa = None
+
+CACHE_DIR = os.environ.get('BANKING_DATASET_CACHE') or os.path.join(tempfile.gettempdir(), 'banking_datasets')
+# Total size of the cached Arrow files; least recently opened datasets are removed first
+CACHE_BYTES = int(os.environ.get('BANKING_DATASET_CACHE_BYTES', 10 * 1024**3))
+
+_lock = threading.Lock()
+
+
+def enabled():
+    return pa is not None and CACHE_BYTES > 0
+
+
+def _paths(token):
+    return os.path.join(CACHE_DIR, f'{token}.arrow'), os.path.join(CACHE_DIR, f'{token}.json')
+
+
+def _read_meta(path):
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def _temporary(path):
+    """A new, uniquely named file next to `path` (sessions are threads of one process)."""
+    fd, temporary = tempfile.mkstemp(prefix=os.path.basename(path) + '.', suffix='.tmp', dir=CACHE_DIR)
+    os.close(fd)
+    return temporary
+
+
+def _replace(temporary, path):
+    try:
+        os.replace(temporary, path)
+    except OSError:
+        _remove(temporary)
+        raise
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _write_meta(path, meta):
+    temporary = _temporary(path)
+    with open(temporary, 'w') as f:
+        json.dump(meta, f)
+    _replace(temporary, path)
+
+
+def load_meta(token):
+    """Metadata of a cached dataset (without reading its data), or None if it is not cached."""
+    if not enabled():
+        return None
+    data_path, meta_path = _paths(token)
+    return _read_meta(meta_path) if os.path.exists(data_path) else None
+
+
+def add_owner(token, owner):
+    """Record that `owner` uploaded the cached dataset `token` too."""
+    meta = load_meta(token)
+    if meta is None or not owner or owner in meta.get('owners', []):
+        return
+    meta['owners'] = meta.get('owners', []) + [owner]
+    try:
+        _write_meta(_paths(token)[1], meta)
+    except OSError:
+        pass
+
+
+def disown(token, owner):
+    """Drop `owner` from a cached dataset, removing the dataset once nobody else uploaded it."""
+    meta = load_meta(token)
+    if meta is None:
+        return
+    owners = [o for o in meta.get('owners', []) if o != owner]
+    if not owners:
+        remove_dataset(token)
+        return
+    meta['owners'] = owners
+    try:
+        _write_meta(_paths(token)[1], meta)
+    except OSError:
+        pass
+
+
+def store_dataset(token, frame, name, report=None, original_dtypes=None, owner=None):
+    """Save a parsed, optimized frame as an uncompressed Arrow IPC file keyed by content hash.
+
+    Uncompressed IPC can be memory-mapped on reload. The file is written
+    under a unique temporary name and renamed, so readers never see half a
+    file and sessions storing the same upload at once do not collide.
+    `owner` (the uploading user) is recorded so `list_datasets` only shows
+    users their own files. The cache is best-effort: returns False, without raising, when it is disabled or
+    the write fails.
+    """
+    if not enabled():
+        return False
+    data_path, meta_path = _paths(token)
+    temporary = None
+    try:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temporary = _temporary(data_path)
+        table = pa.Table.from_pandas(frame, preserve_index=False)
+        with pa.OSFile(temporary, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+        _replace(temporary, data_path)
+        now = time.time()
+        _write_meta(meta_path, {
+            'token': token, 'name': name, 'owners': [owner] if owner else [], 'rows': len(frame), 'columns': len(frame.columns),
+            'bytes': os.path.getsize(data_path), 'stored': now, 'last_access': now,
+            'report': report.to_json(orient='split') if report is not None else None,
+            'original_dtypes': {str(k): str(v) for k, v in (original_dtypes or {}).items()},
+        })
+    except (OSError, pa.ArrowException, TypeError, ValueError):
+        if temporary is not None:
+            _remove(temporary)
+        return False
+    evict(CACHE_BYTES, keep=token)
+    return True
+
+
+def load_dataset(token):
+    """Reopen a cached dataset, or None if it is not cached.
+
+    The Arrow file is memory-mapped: numeric columns without nulls become
+    pandas columns without being copied (they are read-only, which the
+    copy-on-write VersionedDataset never minds), and pages are read from
+    disk only when touched. Returns (frame, meta) with meta['report'] as a
+    DataFrame.
+    """
+    if not enabled():
+        return None
+    data_path, meta_path = _paths(token)
+    meta = _read_meta(meta_path)
+    if meta is None or not os.path.exists(data_path):
+        return None
+    try:
+        with pa.memory_map(data_path) as source:
+            table = pa.ipc.open_file(source).read_all()
+        frame = table.to_pandas(split_blocks=True, self_destruct=True)
+    except (OSError, pa.ArrowInvalid):
+        remove_dataset(token)
+        return None
+    meta['last_access'] = time.time()
+    try:
+        _write_meta(meta_path, meta)
+    except OSError:
+        pass  # only the eviction order is affected
+    meta['report'] = pd.read_json(io.StringIO(meta['report']), orient='split') if meta.get('report') else None
+    return frame, meta
+
+
+def list_datasets(owner=None):
+    """Cached datasets, most recently opened first; with `owner`, only the ones that user uploaded."""
+    columns = ['token', 'name', 'owners', 'rows', 'columns', 'bytes', 'last_access']
+    if not enabled() or not os.path.isdir(CACHE_DIR):
+        return pd.DataFrame(columns=columns)
+    metas = [_read_meta(os.path.join(CACHE_DIR, f)) for f in os.listdir(CACHE_DIR) if f.endswith('.json')]
+    metas = [m for m in metas if m is not None and (owner is None or owner in m.get('owners', []))]
+    frame = pd.DataFrame(metas, columns=columns)
+    frame['last_access'] = pd.to_datetime(frame['last_access'], unit='s')
+    return frame.sort_values('last_access', ascending=False, ignore_index=True)
+
+
+def remove_dataset(token):
+    with _lock:
+        for path in _paths(token):
+            _remove(path)
+
+
+def evict(budget=CACHE_BYTES, keep=None):
+    """Remove least recently opened datasets until the cache fits in `budget` bytes."""
+    cached = list_datasets()
+    total = int(cached['bytes'].sum())
+    for row in cached.iloc[::-1].itertuples():
+        if total <= budget:
+            break
+        if row.token == keep:
+            continue
+        remove_dataset(row.token)
+        total -= row.bytes
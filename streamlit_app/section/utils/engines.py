@@ -0,0 +1,202 @@
+import json
+import os
+import threading
+import time
+
+from sqlalchemy import create_engine
+from sqlalchemy.engine import URL, make_url
+from sqlalchemy.pool import QueuePool
+
+# --- MySQL Configuration for Aiven Cloud (overridable, see load_settings) ---
+DB_USER = os.environ.get('DB_USER', 'avnadmin')
+# No default: the password comes from the environment or the config file, never the source
+DB_PASS = os.environ.get('DB_PASS')
+DB_HOST = os.environ.get('DB_HOST', 'mysql-1310-mahaka12.j.aivencloud.com')
+DB_PORT = int(os.environ.get('DB_PORT', 21873))
+
+DATA_DB = 'database_1'
+USERS_DB = 'database_2'
+
+# JSON file with a "defaults" object and/or one object per database name
+CONFIG_ENV = 'BANKING_DB_CONFIG'
+
+DEFAULT_SETTINGS = {
+    'pool_size': 5,
+    'max_overflow': 10,
+    'pool_recycle': 1800,  # below MySQL's wait_timeout, so idle connections never go stale
+    'pool_timeout': 30,
+    'pool_pre_ping': True,
+    'connect_timeout': 10,
+    'read_timeout': 60,
+    'write_timeout': 60,
+    'local_infile': False,
+}
+
+# Environment variables that override a setting for every database
+_ENV_SETTINGS = {
+    'DB_POOL_SIZE': ('pool_size', int),
+    'DB_MAX_OVERFLOW': ('max_overflow', int),
+    'DB_POOL_RECYCLE': ('pool_recycle', int),
+    'DB_POOL_TIMEOUT': ('pool_timeout', float),
+    'DB_PRE_PING': ('pool_pre_ping', lambda v: v.lower() in ('1', 'true', 'yes')),
+    'DB_CONNECT_TIMEOUT': ('connect_timeout', int),
+    'DB_READ_TIMEOUT': ('read_timeout', int),
+    'DB_WRITE_TIMEOUT': ('write_timeout', int),
+    'DB_LOCAL_INFILE': ('local_infile', lambda v: v.lower() in ('1', 'true', 'yes')),
+}
+
+_engines = {}
+_overrides = {}
+_engine_lock = threading.Lock()
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool that records how long checkouts wait for a connection."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkouts = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seconds = 0.0
+        self._stats_lock = threading.Lock()
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            waited = time.perf_counter() - start
+            with self._stats_lock:
+                self.checkouts += 1
+                self.wait_seconds += waited
+                self.max_wait_seconds = max(self.max_wait_seconds, waited)
+
+
+def _default_url(name, password):
+    if not password:
+        raise RuntimeError(
+            f"No database password for '{name}': set DB_PASS, {name.upper()}_URL, or a \"password\" "
+            f"or \"url\" entry in the {CONFIG_ENV} file."
+        )
+    return URL.create('mysql+pymysql', DB_USER, password, DB_HOST, DB_PORT, name)
+
+
+def _read_config_file():
+    path = os.environ.get(CONFIG_ENV)
+    if not path or not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def load_settings(name):
+    """Settings for one database: defaults < config file < environment < configure().
+
+    The URL comes from `<NAME>_URL` (e.g. `DATABASE_1_URL`), the config
+    file's "url" entry, or the Aiven MySQL defaults above with the password
+    from DB_PASS or the config file's "password" entry. RuntimeError if
+    none of them gives a password.
+    """
+    config = _read_config_file()
+    settings = dict(DEFAULT_SETTINGS)
+    settings.update(config.get('defaults', {}))
+    settings.update(config.get(name, {}))
+    for env_name, (key, parse) in _ENV_SETTINGS.items():
+        if env_name in os.environ:
+            settings[key] = parse(os.environ[env_name])
+    url = os.environ.get(f'{name.upper()}_URL')
+    if url:
+        settings['url'] = url
+    settings.update(_overrides.get(name, {}))
+    if 'url' not in settings:
+        settings['url'] = _default_url(name, settings.get('password', DB_PASS))
+    settings.pop('password', None)
+    return settings
+
+
+def _build_engine(settings):
+    url = make_url(settings['url'])
+    if url.get_backend_name() == 'sqlite':
+        connect_args = {'timeout': settings['connect_timeout'], 'check_same_thread': False}
+        if url.database in (None, '', ':memory:'):
+            # One shared in-memory database; a QueuePool would hand out empty ones
+            return create_engine(url, connect_args=connect_args)
+    else:
+        connect_args = {
+            'connect_timeout': settings['connect_timeout'],
+            'read_timeout': settings['read_timeout'],
+            'write_timeout': settings['write_timeout'],
+        }
+        if settings['local_infile']:
+            connect_args['local_infile'] = True
+    return create_engine(
+        url,
+        poolclass=TimedQueuePool,
+        pool_size=settings['pool_size'],
+        max_overflow=settings['max_overflow'],
+        pool_recycle=settings['pool_recycle'],
+        pool_timeout=settings['pool_timeout'],
+        pool_pre_ping=settings['pool_pre_ping'],
+        connect_args=connect_args,
+    )
+
+
+def get_engine(name):
+    """The shared engine for a database, created on first use."""
+    engine = _engines.get(name)
+    if engine is None:
+        with _engine_lock:
+            engine = _engines.get(name)
+            if engine is None:
+                engine = _build_engine(load_settings(name))
+                _engines[name] = engine
+    return engine
+
+
+def engine_setting(name, key):
+    return load_settings(name)[key]
+
+
+def configure(name, **settings):
+    """Override settings (e.g. `url='sqlite:///bench.db'`) and rebuild the engine on next use.
+
+    Used by benchmarks and tests to point the app at a local stand-in.
+    """
+    with _engine_lock:
+        _overrides.setdefault(name, {}).update(settings)
+        engine = _engines.pop(name, None)
+    if engine is not None:
+        engine.dispose()
+
+
+def reset_engines():
+    """Dispose every engine and drop all configure() overrides."""
+    with _engine_lock:
+        engines = list(_engines.values())
+        _engines.clear()
+        _overrides.clear()
+    for engine in engines:
+        engine.dispose()
+
+
+def pool_stats():
+    """Connection pool usage for every engine created so far."""
+    rows = []
+    for name, engine in sorted(_engines.items()):
+        pool = engine.pool
+        row = {
+            'engine': name,
+            'url': engine.url.render_as_string(hide_password=True),
+            'pool': type(pool).__name__,
+            'size': pool.size() if hasattr(pool, 'size') else None,
+            'checked_out': pool.checkedout() if hasattr(pool, 'checkedout') else None,
+            'overflow': max(pool.overflow(), 0) if hasattr(pool, 'overflow') else None,
+            'checkouts': getattr(pool, 'checkouts', None),
+            'avg_wait_ms': None,
+            'max_wait_ms': None,
+        }
+        if getattr(pool, 'checkouts', 0):
+            row['avg_wait_ms'] = 1000 * pool.wait_seconds / pool.checkouts
+            row['max_wait_ms'] = 1000 * pool.max_wait_seconds
+        rows.append(row)
+    return rows
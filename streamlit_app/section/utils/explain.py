@@ -0,0 +1,127 @@
+import re
+
+import pandas as pd
+
+from section.utils.query import STATEMENT_TIMEOUT, QueryHandle, is_select, normalize_sql
+from section.utils.schema import table_info, table_names
+
+# Query history entries kept per session
+HISTORY_SIZE = 200
+
+_SQLITE_SCAN = re.compile(r'^SCAN (?:TABLE )?(\w+)(?! .*(?:USING (?:COVERING )?INDEX))', re.IGNORECASE)
+_TREE_SCAN = re.compile(r'(?:Table scan on|Seq Scan on) `?(\w+)`?', re.IGNORECASE)
+_WORD = re.compile(r'[A-Za-z_][A-Za-z0-9_$]*')
+
+
+def supports_analyze(engine):
+    """EXPLAIN ANALYZE exists on MySQL 8.0.18+ and PostgreSQL, not on SQLite."""
+    if engine.dialect.name == 'postgresql':
+        return True
+    if engine.dialect.name == 'mysql':
+        version = engine.dialect.server_version_info or ()
+        return not getattr(engine.dialect, 'is_mariadb', False) and tuple(version[:3]) >= (8, 0, 18)
+    return False
+
+
+def _plan_sql(engine, sql, analyze):
+    sql = sql.strip().rstrip(';')
+    if engine.dialect.name == 'sqlite':
+        return f"EXPLAIN QUERY PLAN {sql}"
+    return f"EXPLAIN ANALYZE {sql}" if analyze else f"EXPLAIN {sql}"
+
+
+def _scanned_tables(engine, plan):
+    """Tables the plan reads with a full scan, and whether an index was even possible."""
+    scans = {}
+    if engine.dialect.name == 'sqlite' and 'detail' in plan.columns:
+        for detail in plan['detail']:
+            match = _SQLITE_SCAN.match(str(detail))
+            if match:
+                scans[match.group(1)] = None
+    elif {'type', 'table'} <= set(plan.columns):
+        # Tabular MySQL EXPLAIN: type ALL is a full scan
+        for row in plan.itertuples(index=False):
+            if str(row.type).upper() == 'ALL' and row.table:
+                possible_keys = getattr(row, 'possible_keys', None)
+                scans[str(row.table)] = possible_keys if pd.notna(possible_keys) else None
+    else:
+        # Tree output (EXPLAIN ANALYZE, PostgreSQL)
+        for line in plan.iloc[:, 0].astype(str):
+            for name in _TREE_SCAN.findall(line):
+                scans[name] = None
+    return scans
+
+
+def _index_suggestions(engine, sql, table):
+    """Columns of `table` named in the query that no index starts with."""
+    info = table_info(engine, table)
+    indexed = {index['columns'][0] for index in info['indexes'] if index['columns']}
+    if info['primary_key']:
+        indexed.add(info['primary_key'])
+    words = {w.lower() for w in _WORD.findall(normalize_sql(sql))}
+    return [c['name'] for c in info['columns'] if c['name'].lower() in words and c['name'] not in indexed]
+
+
+def explain_query(engine, sql, analyze=False, timeout=STATEMENT_TIMEOUT):
+    """Run EXPLAIN (or EXPLAIN ANALYZE) for a SELECT and flag full scans.
+
+    The EXPLAIN runs as a QueryHandle, so EXPLAIN ANALYZE (which executes
+    the query) gets the same statement timeout as the search box. Returns
+    the plan as a DataFrame (tree-style plans become one row per line), a
+    list of warnings about full table scans on the app's tables with
+    suggested index columns, and the seconds the EXPLAIN took.
+    """
+    if not is_select(sql):
+        raise ValueError("Only SELECT/WITH queries can be explained.")
+    analyze = analyze and supports_analyze(engine)
+    handle = QueryHandle(engine, _plan_sql(engine, sql, analyze), timeout=timeout).start().wait()
+    if handle.error is not None:
+        raise handle.error if isinstance(handle.error, Exception) else RuntimeError(handle.error)
+    plan, seconds = handle.frame, handle.stats['seconds']
+
+    if len(plan.columns) == 1:
+        # One text cell holding the whole tree: show it line by line
+        lines = [line for cell in plan.iloc[:, 0].astype(str) for line in cell.splitlines()]
+        plan = pd.DataFrame({'plan': lines})
+
+    warnings = []
+    managed = set(table_names(engine))
+    for table, possible_keys in _scanned_tables(engine, plan).items():
+        if table not in managed:
+            continue
+        message = f"Full table scan on `{table}`"
+        if possible_keys:
+            message += f" (possible keys {possible_keys} not used)"
+        suggestions = _index_suggestions(engine, sql, table)
+        if suggestions:
+            message += f"; consider an index on {', '.join(f'`{c}`' for c in suggestions)}"
+        warnings.append(message + ".")
+    return plan, warnings, seconds
+
+
+def record_query(history, sql, stats, mode='run'):
+    """Append one finished query to a session's history list (newest last)."""
+    history.append({
+        'time': pd.Timestamp.now().floor('s'),
+        'query': normalize_sql(sql),
+        'mode': mode,
+        'seconds': round(stats.get('seconds', 0.0), 4),
+        'rows': stats.get('rows'),
+        'cached': stats.get('cached', False),
+    })
+    del history[:-HISTORY_SIZE]
+
+
+def history_summary(history):
+    """Per-query run count, median and worst duration, to spot regressions."""
+    frame = pd.DataFrame(history)
+    if frame.empty:
+        return frame
+    runs = frame[(frame['mode'] == 'run') & ~frame['cached']]
+    if runs.empty:
+        return pd.DataFrame()
+    summary = runs.groupby('query').agg(
+        runs=('seconds', 'size'), median_s=('seconds', 'median'), max_s=('seconds', 'max'),
+        last_s=('seconds', 'last'), rows=('rows', 'last'),
+    )
+    return summary.sort_values('max_s', ascending=False)
@@ -0,0 +1,171 @@
+import gzip
+import io
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # pyarrow is optional; Parquet, Feather and zstd need it
+    pa = None
+
+try:
+    import openpyxl
+except ImportError:
+    openpyxl = None
+
+# Rows converted and written at a time, so an export never holds a second full copy of the data
+CHUNK_ROWS = 100_000
+# Total size of the generated files kept for repeated downloads
+EXPORT_CACHE_BYTES = 512 * 1024 * 1024
+EXPORT_DIR = os.environ.get('BANKING_EXPORT_DIR') or os.path.join(tempfile.gettempdir(), 'banking_exports')
+# Excel worksheets stop at 1,048,576 rows, one of which is the header
+XLSX_MAX_ROWS = 1_048_575
+
+# Label -> (file extension, MIME type)
+FORMATS = {
+    'CSV': ('csv', 'text/csv'),
+    'CSV (gzip)': ('csv.gz', 'application/gzip'),
+    'CSV (zstd)': ('csv.zst', 'application/zstd'),
+    'Parquet': ('parquet', 'application/vnd.apache.parquet'),
+    'Feather (Arrow IPC)': ('feather', 'application/vnd.apache.arrow.file'),
+    'Excel (XLSX)': ('xlsx', 'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet'),
+}
+_NEEDS_ARROW = {'CSV (zstd)', 'Parquet', 'Feather (Arrow IPC)'}
+
+_lock = threading.Lock()
+# (key, format) -> (path, size), least recently used first
+_files = OrderedDict()
+
+
+def available_formats():
+    """Formats whose optional libraries are installed."""
+    return [label for label in FORMATS
+            if not (label in _NEEDS_ARROW and pa is None) and not (label == 'Excel (XLSX)' and openpyxl is None)]
+
+
+def _chunks(frame, rows=CHUNK_ROWS):
+    for start in range(0, max(len(frame), 1), rows):
+        yield start, frame.iloc[start:start + rows]
+
+
+def _write_csv(frame, binary):
+    with io.TextIOWrapper(binary, encoding='utf-8', newline='') as text:
+        for start, chunk in _chunks(frame):
+            chunk.to_csv(text, index=False, header=start == 0)
+
+
+def _arrow_schema(frame):
+    """Arrow schema for the whole frame, read from its first chunk.
+
+    Columns that are all null in the first chunk take their type from the
+    column's first non-null values instead, so later chunks still fit.
+    """
+    schema = pa.Schema.from_pandas(frame.iloc[:CHUNK_ROWS], preserve_index=False)
+    for i, field in enumerate(schema):
+        if pa.types.is_null(field.type):
+            values = frame[field.name].dropna()
+            if len(values):
+                schema = schema.set(i, field.with_type(pa.array(values.iloc[:1000]).type))
+    return schema
+
+
+def _write_arrow(frame, path, writer_for):
+    schema = _arrow_schema(frame)
+    with writer_for(path, schema) as writer:
+        for _, chunk in _chunks(frame):
+            writer.write_table(pa.Table.from_pandas(chunk, schema=schema, preserve_index=False))
+
+
+def _excel_value(value):
+    if value is None or (pd.api.types.is_scalar(value) and pd.isna(value)):
+        return None
+    if isinstance(value, pd.Timestamp):
+        return value.tz_localize(None).to_pydatetime() if value.tzinfo else value.to_pydatetime()
+    if isinstance(value, np.generic):
+        return value.item()
+    return value
+
+
+def _write_xlsx(frame, path):
+    if len(frame) > XLSX_MAX_ROWS:
+        raise ValueError(f"Excel sheets hold at most {XLSX_MAX_ROWS:,} rows; this table has {len(frame):,}.")
+    workbook = openpyxl.Workbook(write_only=True)
+    sheet = workbook.create_sheet()
+    sheet.append([str(c) for c in frame.columns])
+    for _, chunk in _chunks(frame):
+        for row in chunk.astype(object).itertuples(index=False, name=None):
+            sheet.append([_excel_value(v) for v in row])
+    workbook.save(path)
+
+
+def write_export(frame, label, path):
+    """Write `frame` to `path` in the format `label`, one chunk of rows at a time."""
+    if label == 'CSV':
+        with open(path, 'wb') as f:
+            _write_csv(frame, f)
+    elif label == 'CSV (gzip)':
+        with gzip.open(path, 'wb', compresslevel=6) as f:
+            _write_csv(frame, f)
+    elif label == 'CSV (zstd)':
+        with pa.output_stream(path, compression='zstd') as f:
+            _write_csv(frame, f)
+    elif label == 'Parquet':
+        _write_arrow(frame, path, pq.ParquetWriter)
+    elif label == 'Feather (Arrow IPC)':
+        _write_arrow(frame, path, lambda p, schema: pa.ipc.new_file(
+            p, schema, options=pa.ipc.IpcWriteOptions(compression='lz4')))
+    elif label == 'Excel (XLSX)':
+        _write_xlsx(frame, path)
+    else:
+        raise ValueError(f"Unknown export format: {label}")
+
+
+def _evict(budget):
+    # The newest file is never removed, so an export larger than the budget can still be downloaded
+    while len(_files) > 1 and sum(size for _, size in _files.values()) > budget:
+        _, (path, _) = _files.popitem(last=False)
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+
+def cached_export(key, label):
+    """Path of an already generated export for `key`, or None."""
+    with _lock:
+        entry = _files.get((key, label))
+        if entry is None or not os.path.exists(entry[0]):
+            return None
+        _files.move_to_end((key, label))
+        return entry[0]
+
+
+def export_file(frame, label, key):
+    """Generate (or reuse) the export of `frame` and return its path.
+
+    `key` identifies the data, e.g. a dataset and its version, so unchanged
+    data is written once and served from disk afterwards. Files are removed
+    least recently used first once they exceed EXPORT_CACHE_BYTES.
+    """
+    path = cached_export(key, label)
+    if path is not None:
+        return path
+    os.makedirs(EXPORT_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix='.' + FORMATS[label][0], dir=EXPORT_DIR)
+    os.close(fd)
+    try:
+        write_export(frame, label, path)
+    except Exception:
+        os.remove(path)
+        raise
+    with _lock:
+        _files[(key, label)] = (path, os.path.getsize(path))
+        _evict(EXPORT_CACHE_BYTES)
+    return path
+
@@ -1,52 +1,117 @@
 import pandas as pd
-from sqlalchemy import create_engine, text
+from sqlalchemy import text
 from typing import Optional
-
-# --- MySQL Configuration for Aiven Cloud ---
-DB_USER = 'avnadmin'
-DB_PASS = 'AVNS_SaCO6Meh-b2gvU0y1Us'
-DB_HOST = 'mysql-1310-mahaka12.j.aivencloud.com'  
-DB_PORT = 21873
-DB_NAME1 = 'database_1'
-DB_NAME2 = 'database_2'
-
-# --- SQLAlchemy Engines ---
-engine1 = create_engine(
-    f'mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME1}'
-)
-
-engine2 = create_engine(
-    f'mysql+pymysql://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME2}'
-)
-
-def save_dataframe_to_db(df: pd.DataFrame, table_name: str):
-    try:
-        # Convert table name to lowercase, safe format
-        safe_table_name = table_name.lower().replace(" ", "_")
-        df.to_sql(safe_table_name, con=engine1, if_exists='replace', index=False)
-        return True, f"Data saved to `{safe_table_name}` successfully."
-    except Exception as e:
-        return False, str(e)
+from section.utils.engines import DATA_DB, USERS_DB, engine_setting, get_engine
+from section.utils.classify import match_keyword
+from section.utils.diff import compute_change_masks, style_frame
+from section.utils.auth import authenticate, invalidate_credentials
+from section.utils.perf import frame_bytes, span, timed
+from section.utils.persistence import forget_table, sync_dataframe
+from section.utils.explain import explain_query
+from section.utils.query import ROW_CAP, QueryHandle
+from section.utils.query_cache import bump_table, cache_key, get_result, put_result
+from section.utils.schema import invalidate
+
+# --- SQLAlchemy Engines (created lazily by the registry) ---
+def data_engine():
+    """Engine for uploaded datasets (`database_1`)."""
+    return get_engine(DATA_DB)
+
+def users_engine():
+    """Engine for user and admin accounts (`database_2`)."""
+    return get_engine(USERS_DB)
+
+def __getattr__(name):
+    # Old `engine1` / `engine2` names resolve through the registry on first access
+    if name == 'engine1':
+        return data_engine()
+    if name == 'engine2':
+        return users_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+def save_dataframe_to_db(df: pd.DataFrame, table_name: str, incremental: bool = True, tag=None, rows_since=None):
+    with span('db.save_dataframe_to_db', kind='db') as timing:
+        try:
+            # Convert table name to lowercase, safe format
+            safe_table_name = table_name.lower().replace(" ", "_")
+            engine = data_engine()
+            if not incremental:
+                forget_table(engine, safe_table_name)
+            result = sync_dataframe(df, safe_table_name, engine, local_infile=engine_setting(DATA_DB, 'local_infile'),
+                                    tag=tag, rows_since=rows_since)
+            invalidate(engine, safe_table_name)
+            bump_table(engine, safe_table_name)
+            if result['mode'] == 'delta':
+                timing.bytes = frame_bytes(df) * (result['inserted'] + result['updated']) // max(len(df), 1)
+                return True, (f"Data synced to `{safe_table_name}`: {result['inserted']} inserted, "
+                              f"{result['updated']} updated, {result['deleted']} deleted.")
+            timing.bytes = frame_bytes(df)
+            return True, (f"Data saved to `{safe_table_name}` successfully "
+                          f"({result['rows']} rows, {result['rows_per_second']:,.0f} rows/s).")
+        except Exception as e:
+            return False, str(e)
+
+
+def save_dataset(dataset, table_name: str):
+    """Save a VersionedDataset; rows its journal says are unchanged since the last save are not re-hashed."""
+    return save_dataframe_to_db(dataset.current, table_name, tag=(dataset.uid, dataset.version),
+                                rows_since=dataset.rows_changed_since)
 
     
+def _cache_result(key):
+    def store(handle):
+        if handle.error is None and handle.frame is not None and handle.stats['stopped_by'] not in ('cancelled', 'timeout'):
+            put_result(key, handle.frame, handle.stats)
+    return store
+
+def start_search(query: str, page: int = 0, **limits):
+    """Start a search-box query in the background and return its QueryHandle.
+
+    SELECT/WITH results are served from the shared result cache while the
+    tables they read are unchanged; anything else always runs (and marks the
+    database as changed, since it may have written to it).
+    """
+    engine = data_engine()
+    row_cap = limits.get('row_cap', ROW_CAP)
+    key = cache_key(engine, query, page, row_cap)
+    if key is None:
+        # It may have written to any table: drop cached results and the remembered state of saved
+        # tables (before and after it runs), so the next save compares against the database again
+        bump_table(engine)
+        forget_table(engine)
+        return QueryHandle(engine, query, page, on_done=lambda handle: forget_table(engine), **limits).start()
+    hit = get_result(key)
+    if hit is not None:
+        return QueryHandle.finished(engine, query, *hit, page=page, row_cap=row_cap, cache_key=key)
+    return QueryHandle(engine, query, page, on_done=_cache_result(key), cache_key=key, **limits).start()
+
+def search_is_current(handle):
+    """Whether a search's result still matches the data, i.e. no table it reads changed since it ran."""
+    if handle.cache_key is None:
+        return True
+    return cache_key(handle.engine, handle.sql, handle.page, handle.row_cap) == handle.cache_key
+
+@timed('db.explain_search')
+def explain_search(query: str, analyze: bool = False):
+    """EXPLAIN a search-box query on the dataset database (see `explain_query`)."""
+    return explain_query(data_engine(), query, analyze)
+
+@timed('db.search_database', bytes_of=frame_bytes)
 def search_database(query: str) -> Optional[pd.DataFrame]:
-    try:
-        with engine1.connect() as conn:
-            result = conn.execute(text(query))
-            if result.returns_rows:
-                return pd.DataFrame(result.fetchall(), columns=result.keys())
-            else:
-                return None
-    except Exception as e:
-        raise e  # Re-raise the exception to be handled by the caller
- 
+    """Run a search-box query with the row, byte and time limits, and wait for it."""
+    handle = start_search(query).wait()
+    if handle.error is not None:
+        raise handle.error if isinstance(handle.error, Exception) else RuntimeError(handle.error)
+    return handle.frame
+
 
+@timed('db.insert_user')
 def insert_user(user_id, username, password, email, timestamp, role):
     query = text("""
         INSERT INTO user_information (userID, username, password, email, signup_time, role)
         VALUES (:userID, :username, :password, :email, :signup_time, :role)
     """)
-    with engine2.connect() as conn:
+    with users_engine().connect() as conn:
         conn.execute(query, {
             "userID": user_id,
             "username": username,
@@ -56,13 +121,16 @@ def insert_user(user_id, username, password, email, timestamp, role):
             "role": role
         })
         conn.commit()
+    invalidate_credentials(username)
+    bump_table(users_engine(), 'user_information')
 
+@timed('db.insert_admin')
 def insert_admin(user_id, username, password, email, timestamp, role):
     query = text("""
         INSERT INTO admin_information (userID, username, password, email, signup_time, role)
         VALUES (:userID, :username, :password, :email, :signup_time, :role)
     """)
-    with engine2.connect() as conn:
+    with users_engine().connect() as conn:
         conn.execute(query, {
             "userID": user_id,
             "username": username,
@@ -72,24 +140,15 @@ def insert_admin(user_id, username, password, email, timestamp, role):
             "role": role
         })
         conn.commit()
+    invalidate_credentials(username)
+    bump_table(users_engine(), 'admin_information')
 
 
-def get_user_by_username(username):
-    query = text("SELECT * FROM user_information WHERE username = :username")
-    with engine2.connect() as conn:
-        result = conn.execute(query, {"username": username}).fetchone()
-        if result:
-            return result._mapping
-        return None
-
-def get_admin_by_username(username):
-    query = text("SELECT * FROM admin_information WHERE username = :username")
-    with engine2.connect() as conn:
-        result = conn.execute(query, {"username": username}).fetchone()
-        if result:
-            return result._mapping
-        return None
-    
+@timed('db.authenticate_account')
+def authenticate_account(username, password_hash):
+    """Resolve a login to 'user' or 'admin' (None if it doesn't match) in one cached lookup."""
+    return authenticate(users_engine(), username, password_hash)
+
 CRITICAL_KEYWORDS = [
     # Account/Customer Basics
     "account", "account_number", "account_id", "customer", "customer_id", "client", "user_id",
@@ -122,49 +181,13 @@ CRITICAL_KEYWORDS = [
 
 
 def identify_critical_columns(df_columns, keywords=CRITICAL_KEYWORDS):
-    """Identifies potential critical columns based on keywords."""
-    critical_cols = set()
-    for col in df_columns:
-        lower_col = col.lower()
-        for keyword in keywords:
-            if keyword in lower_col:
-                critical_cols.add(col)
-                break  # Move to the next column once a keyword is found
-    return list(critical_cols)
+    """Identifies potential critical columns from their names alone (see classify.py for value checks)."""
+    return [col for col in df_columns if match_keyword(col, keywords)]
 
 def highlight_critical_and_edited(df, original_df, critical_columns):
     """Highlight edited (green), null (yellow), and critical (orange) cells, in priority order."""
-
-    styles = pd.DataFrame("", index=df.index, columns=df.columns)
-
-    for col in df.columns:
-        for i in df.index:
-            val_df = df.at[i, col]
-            val_orig = original_df.at[i, col] if col in original_df.columns and i in original_df.index else None
-
-            # Start with no style
-            style = ""
-
-            # Check if edited
-            edited = False
-            if val_orig is not None:
-                if pd.isnull(val_orig) and pd.isnull(val_df):
-                    edited = False
-                elif str(val_df) != str(val_orig):
-                    edited = True
-            elif pd.notnull(val_df):
-                edited = True  # New non-null value where there was None
-
-            if edited:
-                style = 'background-color: #90ee90; color: black;'  # light green
-            elif pd.isnull(val_df):
-                style = 'background-color: yellow;'
-            elif col in critical_columns:
-                style = 'background-color: #ffd8a8; color: black;'  # light orange
-
-            styles.at[i, col] = style
-
-    return styles
+    edited, nulls = compute_change_masks(df, original_df)
+    return style_frame(df, edited, nulls, critical_columns)
 
 DANGEROUS_COMMANDS = ["DROP", "DELETE"]
 
@@ -0,0 +1,169 @@
+import numpy as np
+import pandas as pd
+
+# Strategy -> needs a numeric column
+STRATEGIES = {
+    'skip': False,
+    'mean': True,
+    'median': True,
+    'mode': False,
+    'forward fill': False,
+    'back fill': False,
+    'constant': False,
+    'group mean': True,
+    'group median': True,
+    'group mode': False,
+}
+GROUP_STRATEGIES = {'group mean': 'mean', 'group median': 'median', 'group mode': 'mode'}
+
+PREVIEW_COLUMNS = ['column', 'strategy', 'nulls_before', 'nulls_after', 'filled', 'problem']
+
+
+def _numeric(series):
+    return pd.api.types.is_numeric_dtype(series.dtype) and not pd.api.types.is_bool_dtype(series.dtype)
+
+
+def parse_constant(series, text):
+    """`text` converted to a value that fits `series`'s dtype; raises ValueError if it does not."""
+    dtype = series.dtype
+    text = str(text).strip()
+    if text == '':
+        raise ValueError("enter a value")
+    if pd.api.types.is_bool_dtype(dtype):
+        lowered = text.lower()
+        if lowered in ('true', 'yes', '1'):
+            return True
+        if lowered in ('false', 'no', '0'):
+            return False
+        raise ValueError(f"'{text}' is not true or false")
+    if pd.api.types.is_integer_dtype(dtype):
+        value = float(text)
+        if not value.is_integer():
+            raise ValueError(f"'{text}' is not a whole number")
+        # Nullable Int columns expose their bounds through the numpy dtype they wrap
+        bounds = np.iinfo(getattr(dtype, 'numpy_dtype', dtype))
+        if not bounds.min <= value <= bounds.max:
+            raise ValueError(f"'{text}' does not fit a {dtype} column ({bounds.min} to {bounds.max})")
+        return int(value)
+    if _numeric(series):
+        return float(text)
+    if pd.api.types.is_datetime64_any_dtype(dtype):
+        value = pd.Timestamp(text)
+        tz = getattr(dtype, 'tz', None)
+        return value.tz_localize(tz) if tz is not None and value.tzinfo is None else value
+    return text
+
+
+def check_step(df, column, strategy, value=None, group_by=None):
+    """Why a plan step cannot run, or None if it can."""
+    if column not in df.columns:
+        return "column not found"
+    if strategy not in STRATEGIES:
+        return f"unknown strategy '{strategy}'"
+    if STRATEGIES[strategy] and not _numeric(df[column]):
+        return f"{strategy} needs a numeric column"
+    if strategy == 'constant':
+        try:
+            parse_constant(df[column], value)
+        except (ValueError, TypeError) as e:
+            return str(e)
+    if strategy in GROUP_STRATEGIES:
+        if not group_by or group_by not in df.columns:
+            return "choose a column to group by"
+        if group_by == column:
+            return "group by another column"
+    return None
+
+
+def _group_modes(df, column, key):
+    """Most frequent non-null value of `column` within each `key` group, for every row."""
+    counts = df.groupby([key, column], observed=True, sort=False).size()
+    if counts.empty:
+        return pd.Series(np.nan, index=df.index)
+    # Highest count first; ties go to the value seen first
+    counts = counts.iloc[np.argsort(-counts.to_numpy(), kind='stable')]
+    modes = counts.reset_index().drop_duplicates(key).set_index(key)[column]
+    return df[key].map(modes)
+
+
+def _fitted(series, values):
+    """Fill values rounded to whole numbers for integer columns."""
+    if pd.api.types.is_integer_dtype(series.dtype):
+        return values.round() if isinstance(values, pd.Series) else round(values)
+    return values
+
+
+def _with_categories(series, values):
+    if not isinstance(series.dtype, pd.CategoricalDtype):
+        return series
+    candidates = values.dropna().unique() if isinstance(values, pd.Series) else [values]
+    missing = pd.Index(candidates).difference(series.cat.categories)
+    return series.cat.add_categories(missing) if len(missing) else series
+
+
+def run_plan(df, plan):
+    """Fill nulls in every column of `plan`, computing each statistic once for all the columns sharing it.
+
+    `plan` is a sequence of (column, strategy, value, group_by) steps;
+    `value` is the constant's text and `group_by` the key column of group
+    strategies. Means, medians and modes are computed in one call over all
+    the columns using them; fills run over all their columns at once; group
+    statistics use one groupby per key. Statistics are taken from the data
+    before any step runs. Steps that cannot run are left out. Returns
+    {column: filled series} for the columns that were planned.
+    """
+    steps = [(c, s, v, g) for c, s, v, g in plan if s != 'skip' and check_step(df, c, s, v, g) is None]
+    by_strategy = {}
+    for column, strategy, value, group_by in steps:
+        by_strategy.setdefault((strategy, group_by if strategy in GROUP_STRATEGIES else None), []).append(
+            (column, value))
+
+    fills = {}
+    for (strategy, group_by), entries in by_strategy.items():
+        columns = [column for column, _ in entries]
+        if strategy in ('mean', 'median'):
+            stats = getattr(df[columns], strategy)()
+            fills.update({c: stats[c] for c in columns})
+        elif strategy == 'mode':
+            modes = df[columns].mode(dropna=True)
+            fills.update({c: modes[c].iloc[0] if len(modes) else np.nan for c in columns})
+        elif strategy in ('forward fill', 'back fill'):
+            filled = df[columns].ffill() if strategy == 'forward fill' else df[columns].bfill()
+            fills.update({c: filled[c] for c in columns})
+        elif strategy == 'constant':
+            fills.update({c: parse_constant(df[c], value) for c, value in entries})
+        elif GROUP_STRATEGIES[strategy] == 'mode':
+            fills.update({c: _group_modes(df, c, group_by) for c in columns})
+        else:
+            stats = df.groupby(group_by, observed=True, sort=False)[columns].transform(GROUP_STRATEGIES[strategy])
+            fills.update({c: stats[c] for c in columns})
+
+    result = {}
+    for column, values in fills.items():
+        series = df[column]
+        if not isinstance(values, pd.Series) and pd.isna(values):
+            result[column] = series
+            continue
+        values = _fitted(series, values)
+        result[column] = _with_categories(series, values).fillna(values)
+    return result
+
+
+def plan_preview(df, plan, filled):
+    """Null counts per planned column before and after `run_plan`, with the reason a step was skipped."""
+    records = []
+    for column, strategy, value, group_by in plan:
+        if strategy == 'skip':
+            continue
+        problem = check_step(df, column, strategy, value, group_by)
+        before = int(df[column].isna().sum()) if column in df.columns else 0
+        after = int(filled[column].isna().sum()) if column in filled else before
+        records.append({'column': column, 'strategy': strategy, 'nulls_before': before, 'nulls_after': after,
+                        'filled': before - after, 'problem': problem})
+    return pd.DataFrame(records, columns=PREVIEW_COLUMNS)
+
+
+def dataset_preview(dataset, plan):
+    """`plan_preview` of a VersionedDataset, cached per version and plan (the filled columns are not kept)."""
+    plan = tuple(tuple(step) for step in plan)
+    return dataset.cached(('impute', plan), lambda df: plan_preview(df, plan, run_plan(df, plan)))
@@ -0,0 +1,222 @@
+import codecs
+import csv
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+from section.utils.optimize import REPORT_COLUMNS, downcast_numeric, is_low_cardinality, is_text_dtype
+
+try:
+    import pyarrow as pa
+    import pyarrow.csv as pa_csv
+except ImportError:  # pyarrow is optional; fall back to the pandas parser
+    pa_csv = None
+
+SAMPLE_BYTES = 64 * 1024
+CHUNK_ROWS = 200_000
+ARROW_BLOCK_BYTES = 16 * 1024 * 1024
+
+
+def sniff_encoding(sample):
+    """Guess the text encoding from the first bytes of a file."""
+    for bom, encoding in ((codecs.BOM_UTF8, 'utf-8-sig'),
+                          (codecs.BOM_UTF16_LE, 'utf-16'),
+                          (codecs.BOM_UTF16_BE, 'utf-16')):
+        if sample.startswith(bom):
+            return encoding
+    try:
+        sample.decode('utf-8')
+        return 'utf-8'
+    except UnicodeDecodeError as e:
+        # A multi-byte character cut off by the end of the sample is still UTF-8
+        if e.start >= len(sample) - 3 and e.reason == 'unexpected end of data':
+            return 'utf-8'
+        return 'latin1'
+
+
+def sniff_delimiter(text, default=','):
+    """Guess the field delimiter from a few lines of text."""
+    lines = text.splitlines()[:50]
+    if len(lines) > 1:
+        lines = lines[:-1]  # the last line of a sample is usually truncated
+    try:
+        return csv.Sniffer().sniff('\n'.join(lines), delimiters=',\t;|').delimiter
+    except csv.Error:
+        return default
+
+
+def _read_sample(file):
+    file.seek(0)
+    sample = file.read(SAMPLE_BYTES)
+    file.seek(0)
+    return sample
+
+
+def _file_size(file):
+    size = getattr(file, 'size', None)
+    if size is None:
+        position = file.tell()
+        size = file.seek(0, 2)
+        file.seek(position)
+    return size
+
+
+class _ChunkOptimizer:
+    """Applies the same dtype decisions to every chunk of one file.
+
+    Which text columns become categories is decided on the first chunk, so all
+    chunks agree and can be concatenated without widening back to object.
+    The parsed dtypes and sizes are tallied on the way, so `report` can tell
+    what the file would have cost unoptimized.
+    """
+
+    def __init__(self):
+        self.category_columns = None
+        self.parsed = {}
+
+    def __call__(self, chunk):
+        if self.category_columns is None:
+            self.category_columns = {
+                col for col in chunk.columns
+                if is_text_dtype(chunk[col].dtype) and is_low_cardinality(chunk[col])
+            }
+        for col in chunk.columns:
+            dtypes, size = self.parsed.get(col, ((), 0))
+            if chunk[col].dtype not in dtypes:
+                dtypes += (chunk[col].dtype,)
+            self.parsed[col] = (dtypes, size + chunk[col].memory_usage(deep=True, index=False))
+            if col in self.category_columns and is_text_dtype(chunk[col].dtype):
+                chunk[col] = chunk[col].astype('category')
+            else:
+                chunk[col] = downcast_numeric(chunk[col])
+        return chunk
+
+    def report(self, frame):
+        """Per-column report (see optimize_dtypes) from the parsed chunks to the combined `frame`."""
+        rows = []
+        for col in frame.columns:
+            dtypes, before_bytes = self.parsed.get(col, ((frame[col].dtype,), 0))
+            # The dtype pandas would have given the whole column (e.g. int64 and float64 chunks: float64)
+            before = pd.concat([pd.Series(dtype=dtype) for dtype in dtypes]).dtype if len(dtypes) > 1 else dtypes[0]
+            after = frame[col].dtype
+            if after == before:
+                action = 'unchanged'
+            elif isinstance(after, pd.CategoricalDtype):
+                action = 'category'
+            else:
+                action = 'downcast'
+            rows.append({
+                'Column': col,
+                'Before': str(before),
+                'After': str(after),
+                'Action': action,
+                'Before (MB)': before_bytes / 1024**2,
+                'After (MB)': frame[col].memory_usage(deep=True, index=False) / 1024**2,
+            })
+        return pd.DataFrame(rows, columns=REPORT_COLUMNS)
+
+
+def _combine(chunks):
+    """Concatenate optimized chunks, merging per-chunk categories."""
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    for col in chunks[0].columns:
+        if all(isinstance(chunk[col].dtype, pd.CategoricalDtype) for chunk in chunks):
+            merged = union_categoricals([chunk[col] for chunk in chunks])
+            offset = 0
+            for chunk in chunks:
+                chunk[col] = pd.Categorical.from_codes(
+                    merged.codes[offset:offset + len(chunk)], dtype=merged.dtype
+                )
+                offset += len(chunk)
+    return pd.concat(chunks, ignore_index=True)
+
+
+def _stream_chunks(reader, file, size, optimizer, progress):
+    chunks = []
+    for chunk in reader:
+        chunks.append(optimizer(chunk))
+        if progress is not None and size:
+            progress(min(file.tell() / size, 1.0))
+    frame = _combine(chunks)
+    return frame, optimizer.report(frame)
+
+
+def _text_batches(reader, encoding):
+    """Record batches as DataFrames, refusing columns Arrow could only read as raw bytes."""
+    for batch in reader:
+        for field in batch.schema:
+            if pa.types.is_binary(field.type) or pa.types.is_large_binary(field.type):
+                # Arrow keeps text that is not valid `encoding` as bytes instead of failing
+                raise UnicodeDecodeError(encoding, b'', 0, 1, f"column {field.name!r} is not valid {encoding}")
+        yield batch.to_pandas()
+
+
+def _read_delimited_arrow(file, encoding, delimiter, size, progress):
+    optimizer = _ChunkOptimizer()
+    reader = pa_csv.open_csv(
+        file,
+        read_options=pa_csv.ReadOptions(encoding=encoding, block_size=ARROW_BLOCK_BYTES),
+        parse_options=pa_csv.ParseOptions(delimiter=delimiter),
+    )
+    return _stream_chunks(_text_batches(reader, encoding), file, size, optimizer, progress)
+
+
+def _read_delimited(file, encoding, delimiter, size, progress, use_arrow, chunk_rows):
+    if use_arrow and pa_csv is not None:
+        try:
+            return _read_delimited_arrow(file, encoding, delimiter, size, progress)
+        except UnicodeDecodeError:
+            raise
+        except Exception:
+            # Arrow infers types from the first block and rejects later blocks
+            # that disagree; the pandas parser is more forgiving.
+            file.seek(0)
+
+    reader = pd.read_csv(file, sep=delimiter, encoding=encoding, chunksize=chunk_rows, low_memory=False)
+    return _stream_chunks(reader, file, size, _ChunkOptimizer(), progress)
+
+
+def read_delimited(file, default_delimiter=',', progress=None, use_arrow=True, chunk_rows=CHUNK_ROWS):
+    """Stream a CSV/TSV file into an optimized DataFrame; returns (frame, optimization report).
+
+    The encoding and delimiter are detected from a small sample before
+    parsing. Rows are parsed in chunks (with the pyarrow streaming reader when
+    it is installed) and every chunk is downcast and categorized before the
+    next one is read, so the widened frame is never held in memory. The
+    report (columns as in optimize_dtypes) compares the parsed dtypes and
+    sizes with the optimized ones. `progress` is called with the fraction of the file consumed. A file
+    sniffed as UTF-8 that turns out not to be (past the sample) is read
+    again as latin1, which decodes any byte.
+    """
+    sample = _read_sample(file)
+    encoding = sniff_encoding(sample)
+    delimiter = sniff_delimiter(sample.decode(encoding, errors='replace'), default_delimiter)
+    size = _file_size(file)
+
+    try:
+        return _read_delimited(file, encoding, delimiter, size, progress, use_arrow, chunk_rows)
+    except UnicodeDecodeError:
+        if encoding == 'latin1':
+            raise
+        file.seek(0)
+        return _read_delimited(file, 'latin1', delimiter, size, progress, use_arrow, chunk_rows)
+
+
+def read_json_lines(file, progress=None, chunk_rows=CHUNK_ROWS):
+    """Stream a JSON-lines file into an optimized DataFrame; returns (frame, optimization report)."""
+    size = _file_size(file)
+    file.seek(0)
+    reader = pd.read_json(file, lines=True, chunksize=chunk_rows)
+    return _stream_chunks(reader, file, size, _ChunkOptimizer(), progress)
+
+
+def read_excel(file, progress=None):
+    """Read an Excel workbook (not streamable) and optimize it in one step; returns (frame, report)."""
+    optimizer = _ChunkOptimizer()
+    df = optimizer(pd.read_excel(file))
+    if progress is not None:
+        progress(1.0)
+    return df, optimizer.report(df)
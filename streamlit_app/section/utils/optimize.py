@@ -0,0 +1,114 @@
+import hashlib
+
+import numpy as np
+import pandas as pd
+
+# Object columns with fewer distinct values than this share of rows become categories
+CATEGORY_RATIO = 0.5
+# Values inspected when estimating a column's cardinality
+SAMPLE_SIZE = 10_000
+# Per-column optimization report, as returned by optimize_dtypes and the ingest readers
+REPORT_COLUMNS = ['Column', 'Before', 'After', 'Action', 'Before (MB)', 'After (MB)']
+
+
+def downcast_numeric(series):
+    """Return `series` in the smallest numeric dtype that holds it losslessly.
+
+    Integers shrink to int8/16/32, integral floats without nulls
+    become integers, and other floats only drop to float32 when every value
+    survives the round trip unchanged.
+    """
+    dtype = series.dtype
+    if pd.api.types.is_bool_dtype(dtype) or not pd.api.types.is_numeric_dtype(dtype):
+        return series
+    if pd.api.types.is_extension_array_dtype(dtype):
+        return series
+
+    values = series.to_numpy()
+    if dtype.kind in 'iu':
+        return pd.to_numeric(series, downcast='unsigned' if dtype.kind == 'u' else 'integer')
+
+    if dtype.kind == 'f':
+        finite = np.isfinite(values)
+        if finite.all() and len(values) and np.array_equal(values, np.round(values)):
+            as_int = pd.to_numeric(series.astype('int64'), downcast='integer')
+            if np.array_equal(as_int.to_numpy(), values):
+                return as_int
+        if dtype.itemsize > 4:
+            narrowed = values.astype('float32')
+            if np.array_equal(narrowed.astype(dtype), values, equal_nan=True):
+                return pd.Series(narrowed, index=series.index, name=series.name)
+    return series
+
+
+def is_low_cardinality(series, ratio=CATEGORY_RATIO):
+    """Whether a text column repeats enough for a categorical to save memory."""
+    if len(series) == 0:
+        return False
+    return series.nunique(dropna=True) < ratio * len(series)
+
+
+def is_text_dtype(dtype):
+    return pd.api.types.is_object_dtype(dtype) or (
+        pd.api.types.is_string_dtype(dtype) and not isinstance(dtype, pd.CategoricalDtype)
+    )
+
+
+def content_hash(file):
+    """Hash the raw bytes of an uploaded file without copying them."""
+    digest = hashlib.blake2b(digest_size=16)
+    if hasattr(file, 'getbuffer'):
+        digest.update(file.getbuffer())
+    else:
+        position = file.tell()
+        file.seek(0)
+        for block in iter(lambda: file.read(1024 * 1024), b''):
+            digest.update(block)
+        file.seek(position)
+    return digest.hexdigest()
+
+
+def _sample(series, size, seed=0):
+    if len(series) <= size:
+        return series
+    return series.sample(n=size, random_state=seed)
+
+
+def optimize_dtypes(df, sample_size=SAMPLE_SIZE, ratio=CATEGORY_RATIO):
+    """Shrink every column of `df` to a compact dtype.
+
+    Numeric columns are downcast losslessly (integers and floats alike). Text
+    columns become categories when a random sample of `sample_size` values is
+    mostly repeats, which avoids an exact `nunique()` over every row. Returns
+    the optimized frame and a per-column report of what changed.
+    """
+    optimized = df.copy(deep=False)
+    rows = []
+    for col in df.columns:
+        series = df[col]
+        before_bytes = series.memory_usage(deep=True, index=False)
+        action = 'unchanged'
+
+        if is_text_dtype(series.dtype):
+            if is_low_cardinality(_sample(series, sample_size), ratio):
+                try:
+                    optimized[col] = series.astype('category')
+                    action = 'category'
+                except (TypeError, ValueError):
+                    pass
+        else:
+            downcast = downcast_numeric(series)
+            if downcast.dtype != series.dtype:
+                optimized[col] = downcast
+                action = 'downcast'
+
+        after_bytes = optimized[col].memory_usage(deep=True, index=False)
+        rows.append({
+            'Column': col,
+            'Before': str(series.dtype),
+            'After': str(optimized[col].dtype),
+            'Action': action,
+            'Before (MB)': before_bytes / 1024**2,
+            'After (MB)': after_bytes / 1024**2,
+        })
+    return optimized, pd.DataFrame(rows, columns=REPORT_COLUMNS)
@@ -0,0 +1,195 @@
+import contextvars
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import numpy as np
+import pandas as pd
+
+# Set BANKING_PERF=1 to record from startup; admins can also toggle it at runtime
+_enabled = os.environ.get('BANKING_PERF', '').lower() in ('1', 'true', 'yes')
+# Optional file that every span is appended to as one JSON line
+LOG_PATH = os.environ.get('BANKING_PERF_LOG')
+
+# Durations kept per span name for percentiles, and recent events kept for export
+SAMPLES_PER_SPAN = 1000
+RECENT_EVENTS = 10_000
+
+_lock = threading.Lock()
+_events = deque(maxlen=RECENT_EVENTS)
+_session = contextvars.ContextVar('perf_session', default=None)
+
+
+class Aggregates:
+    """Call counts, durations and bytes per span name."""
+
+    def __init__(self):
+        self.spans = {}
+        self._lock = threading.Lock()
+
+    def add(self, name, kind, seconds, nbytes):
+        with self._lock:
+            entry = self.spans.get(name)
+            if entry is None:
+                entry = self.spans[name] = {'kind': kind, 'calls': 0, 'total': 0.0, 'bytes': 0,
+                                            'samples': deque(maxlen=SAMPLES_PER_SPAN)}
+            entry['calls'] += 1
+            entry['total'] += seconds
+            entry['bytes'] += nbytes or 0
+            entry['samples'].append(seconds)
+
+    def summary(self, kind=None):
+        """One row per span: calls, total, p50, p95, max (seconds) and bytes, slowest p95 first."""
+        with self._lock:
+            rows = []
+            for name, entry in self.spans.items():
+                if kind is not None and entry['kind'] != kind:
+                    continue
+                samples = np.fromiter(entry['samples'], dtype='float64')
+                p50, p95 = np.percentile(samples, [50, 95]) if len(samples) else (np.nan, np.nan)
+                rows.append({'span': name, 'kind': entry['kind'], 'calls': entry['calls'],
+                             'total_s': entry['total'], 'p50_s': p50, 'p95_s': p95,
+                             'max_s': samples.max() if len(samples) else np.nan, 'bytes': entry['bytes']})
+        frame = pd.DataFrame(rows, columns=['span', 'kind', 'calls', 'total_s', 'p50_s', 'p95_s', 'max_s', 'bytes'])
+        return frame.sort_values('p95_s', ascending=False, ignore_index=True)
+
+    def clear(self):
+        with self._lock:
+            self.spans.clear()
+
+
+process = Aggregates()
+
+
+def enabled():
+    return _enabled
+
+
+def set_enabled(value):
+    global _enabled
+    _enabled = bool(value)
+
+
+def bind_session(aggregates, session_id=None):
+    """Also record this thread's spans into a session's own Aggregates."""
+    _session.set((aggregates, session_id))
+
+
+def record(name, seconds, kind='section', nbytes=None, attributes=None):
+    """Record one finished span (no-op while disabled).
+
+    `attributes` (a JSON-serializable dict, e.g. a query fingerprint) are
+    kept on the span's event; spans are aggregated by name only, so names
+    must stay few and fixed.
+    """
+    if not _enabled:
+        return
+    process.add(name, kind, seconds, nbytes)
+    bound = _session.get()
+    if bound is not None:
+        bound[0].add(name, kind, seconds, nbytes)
+    event = {'ts': time.time(), 'name': name, 'kind': kind, 'seconds': seconds, 'bytes': nbytes,
+             'session': bound[1] if bound is not None else None, 'attributes': attributes}
+    with _lock:
+        _events.append(event)
+        if LOG_PATH:
+            with open(LOG_PATH, 'a') as f:
+                f.write(json.dumps(event) + '\n')
+
+
+class _Span:
+    __slots__ = ('name', 'kind', 'bytes', '_start')
+
+    def __init__(self, name, kind):
+        self.name = name
+        self.kind = kind
+        self.bytes = None
+
+    def __enter__(self):
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self._start, self.kind, self.bytes)
+        return False
+
+
+class _NoSpan:
+    """Shared stand-in returned while disabled; setting `bytes` on it is harmless."""
+    bytes = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def lap(self, name, nbytes=None):
+        pass
+
+
+_NO_SPAN = _NoSpan()
+
+
+def span(name, kind='section'):
+    """Time a block: `with span('dashboard.charts') as s: ...; s.bytes = n`."""
+    return _Span(name, kind) if _enabled else _NO_SPAN
+
+
+def timed(name, kind='db', bytes_of=None):
+    """Decorator version of `span`; `bytes_of(result)` reports how much data moved."""
+    def decorate(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            if not _enabled:
+                return fn(*args, **kwargs)
+            start = time.perf_counter()
+            result = fn(*args, **kwargs)
+            nbytes = None
+            if bytes_of is not None:
+                try:
+                    nbytes = bytes_of(result)
+                except Exception:
+                    pass
+            record(name, time.perf_counter() - start, kind, nbytes)
+            return result
+        return wrapper
+    return decorate
+
+
+class _Laps:
+    """Times consecutive sections of a script: each `lap(name)` ends the previous one."""
+
+    def __init__(self, prefix):
+        self.prefix = prefix
+        self._last = time.perf_counter()
+
+    def lap(self, name, nbytes=None):
+        now = time.perf_counter()
+        record(f"{self.prefix}.{name}", now - self._last, 'section', nbytes)
+        self._last = time.perf_counter()
+
+
+def laps(prefix):
+    """A lap timer for the sections of a page (a shared no-op while disabled)."""
+    return _Laps(prefix) if _enabled else _NO_SPAN
+
+
+def frame_bytes(frame):
+    """Shallow size of a DataFrame, cheap enough to report on every call."""
+    return int(frame.memory_usage(index=True).sum()) if isinstance(frame, pd.DataFrame) else None
+
+
+def export_jsonl():
+    """Recent span events, one JSON object per line."""
+    with _lock:
+        return ''.join(json.dumps(event) + '\n' for event in _events)
+
+
+def clear():
+    process.clear()
+    with _lock:
+        _events.clear()
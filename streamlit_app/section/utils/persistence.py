@@ -0,0 +1,203 @@
+import threading
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from section.utils.bulk import bulk_load, sql_column_types
+
+# Surrogate key written alongside the data when the frame has no usable primary key
+ROW_ID_COLUMN = '_row_id'
+DELETE_BATCH_SIZE = 1000
+INSERT_CHUNK_SIZE = 1000
+
+# (engine url, table) -> what the table looked like after our last save
+_sync_state = {}
+_sync_lock = threading.Lock()
+
+
+class _SyncState:
+    def __init__(self, key, signature, hashes, labels=None, tag=None, rows=None):
+        self.key = key
+        self.signature = signature
+        self.hashes = hashes
+        # Rows the table held after the save; any other count means someone else wrote to it
+        self.rows = rows
+        # Key value of every row label, so rows can be found again after they are deleted
+        self.labels = labels
+        self.tag = tag
+
+
+def _state_key(engine, table_name):
+    return (engine.url.render_as_string(hide_password=True), table_name)
+
+
+def forget_table(engine, table_name=None):
+    """Drop the remembered sync state so the next save does a full replace."""
+    url = engine.url.render_as_string(hide_password=True)
+    with _sync_lock:
+        for key in list(_sync_state):
+            if key[0] == url and (table_name is None or key[1] == table_name):
+                del _sync_state[key]
+
+
+def detect_primary_key(df):
+    """Return an id-like integer column that is unique and non-null, if any."""
+    for col in df.columns:
+        name = str(col).lower()
+        if not name.endswith('id'):
+            continue
+        series = df[col]
+        if pd.api.types.is_integer_dtype(series.dtype) and series.notna().all() and series.is_unique:
+            return col
+    return None
+
+
+def _with_key(df, key):
+    """Return the frame that is actually written, adding the surrogate key if needed."""
+    if key != ROW_ID_COLUMN:
+        return df
+    if df.index.is_unique and pd.api.types.is_integer_dtype(df.index.dtype):
+        row_ids = np.asarray(df.index, dtype='int64')
+    else:
+        row_ids = np.arange(len(df), dtype='int64')
+    return df.assign(**{ROW_ID_COLUMN: row_ids})
+
+
+def _schema_signature(frame):
+    return tuple((str(col), str(dtype)) for col, dtype in frame.dtypes.items())
+
+
+def _row_hashes(frame, key):
+    hashes = pd.util.hash_pandas_object(frame, index=False)
+    hashes.index = pd.Index(frame[key].to_numpy())
+    return hashes
+
+
+def _quote(engine, name):
+    return engine.dialect.identifier_preparer.quote(str(name))
+
+
+def _full_replace(frame, table_name, engine, key, local_infile=False):
+    return bulk_load(frame, table_name, engine, local_infile=local_infile, key_column=key)
+
+
+def _apply_delta(frame, table_name, engine, key, inserted, updated, deleted):
+    """Upsert changed rows and delete removed ones in a single transaction.
+
+    Changed rows are deleted by key and re-inserted in batches, which behaves like an
+    UPSERT on every backend without requiring a unique constraint.
+    """
+    stale = np.concatenate([np.asarray(deleted), np.asarray(updated)])
+    delete = text(
+        f"DELETE FROM {_quote(engine, table_name)} WHERE {_quote(engine, key)} IN :keys"
+    ).bindparams(bindparam('keys', expanding=True))
+    rows = frame[frame[key].isin(np.concatenate([np.asarray(inserted), np.asarray(updated)]))]
+
+    with engine.begin() as conn:
+        for start in range(0, len(stale), DELETE_BATCH_SIZE):
+            batch = [v.item() if hasattr(v, 'item') else v for v in stale[start:start + DELETE_BATCH_SIZE]]
+            conn.execute(delete, {'keys': batch})
+        if len(rows):
+            rows.to_sql(table_name, con=conn, if_exists='append', index=False, chunksize=INSERT_CHUNK_SIZE,
+                        dtype=sql_column_types(rows, engine.dialect.name))
+
+
+def _table_rows(engine, table_name):
+    """Current row count of the table, or None if it cannot be read (e.g. it was dropped)."""
+    try:
+        with engine.connect() as conn:
+            return conn.execute(text(f"SELECT COUNT(*) FROM {_quote(engine, table_name)}")).scalar()
+    except Exception:
+        return None
+
+
+def _hinted_hashes(frame, state, key, labels):
+    """Row hashes of `frame` after re-hashing only the rows at `labels`.
+
+    Returns all the new hashes, those of the re-hashed rows, and the keys of
+    touched rows that no longer exist.
+    """
+    present = labels[labels.isin(frame.index)]
+    fresh = _row_hashes(frame.loc[present], key)
+    old_keys = pd.Index(state.labels[state.labels.index.isin(labels)].to_numpy())
+    gone = old_keys.difference(fresh.index)
+    previous = state.hashes
+    kept = previous[~previous.index.isin(fresh.index.union(gone))]
+    return pd.concat([kept, fresh]), fresh, gone
+
+
+def sync_dataframe(df, table_name, engine, local_infile=False, tag=None, rows_since=None):
+    """Persist `df` to `table_name`, writing only the rows changed since the last save.
+
+    The first save of a table, or any save after a schema change (added,
+    dropped or retyped columns), bulk-loads the whole table. Later saves compare
+    per-row hashes keyed on a detected primary key (or the surrogate
+    `_row_id` column) and apply just the inserted, updated and deleted rows.
+    Returns a dict describing what was written.
+
+    The remembered state of the last save is only trusted while the table
+    still holds as many rows as that save left; a table written to by
+    anything else (the search box, another process) is fully replaced.
+
+    `tag` is a (source, version) pair identifying what is being saved. When
+    the previous save of this table came from the same source,
+    `rows_since(previous_version)` may return the labels of the rows changed
+    since then, and only those rows are hashed instead of the whole frame.
+    """
+    state_key = _state_key(engine, table_name)
+    with _sync_lock:
+        state = _sync_state.get(state_key)
+
+    key = state.key if state is not None else (detect_primary_key(df) or ROW_ID_COLUMN)
+    if key != ROW_ID_COLUMN and (key not in df.columns or not df[key].is_unique or df[key].isna().any()):
+        key = ROW_ID_COLUMN
+    frame = _with_key(df, key)
+    signature = _schema_signature(frame)
+
+    reusable = state is not None and state.key == key and state.signature == signature \
+        and _table_rows(engine, table_name) == state.rows
+    labels = None
+    if reusable and rows_since is not None and tag is not None and state.tag is not None \
+            and state.tag[0] == tag[0] and state.labels is not None and df.index.is_unique \
+            and (key != ROW_ID_COLUMN or pd.api.types.is_integer_dtype(df.index.dtype)):
+        # Surrogate keys follow the row labels here, so a label's key never shifts
+        labels = rows_since(state.tag[1])
+
+    try:
+        if labels is not None:
+            hashes, fresh, gone = _hinted_hashes(frame, state, key, labels)
+        else:
+            hashes = _row_hashes(frame, key)
+    except TypeError:  # unhashable cell values; nothing to compare against
+        hashes = None
+
+    if not reusable or hashes is None:
+        result = _full_replace(frame, table_name, engine, key, local_infile)
+    else:
+        previous = state.hashes
+        if labels is not None:
+            # Only the hinted rows can differ from the previous save
+            inserted = fresh.index.difference(previous.index)
+            deleted = gone
+            common = fresh.index.intersection(previous.index)
+        else:
+            inserted = hashes.index.difference(previous.index)
+            deleted = previous.index.difference(hashes.index)
+            common = hashes.index.intersection(previous.index)
+        updated = common[hashes.loc[common].to_numpy() != previous.loc[common].to_numpy()]
+        result = {'mode': 'delta', 'inserted': len(inserted), 'updated': len(updated), 'deleted': len(deleted)}
+        if len(inserted) or len(updated) or len(deleted):
+            try:
+                _apply_delta(frame, table_name, engine, key, inserted, updated, deleted)
+            except Exception:
+                # The table changed underneath us (e.g. dropped elsewhere); start over.
+                result = _full_replace(frame, table_name, engine, key, local_infile)
+
+    with _sync_lock:
+        if hashes is None:
+            _sync_state.pop(state_key, None)
+        else:
+            row_labels = pd.Series(frame[key].to_numpy(), index=frame.index) if frame.index.is_unique else None
+            _sync_state[state_key] = _SyncState(key, signature, hashes, row_labels, tag, rows=len(frame))
+    return result
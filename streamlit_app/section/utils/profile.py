@@ -0,0 +1,119 @@
+import numpy as np
+import pandas as pd
+
+# Above this many rows, distinct counts and quantiles are estimated
+APPROX_THRESHOLD = 1_000_000
+# HyperLogLog registers = 2 ** HLL_PRECISION (~0.8% standard error at 14)
+HLL_PRECISION = 14
+# Values kept by the sampled quantile sketch
+QUANTILE_SAMPLE = 20_000
+
+PROFILE_COLUMNS = ['dtype', 'nulls', 'distinct', 'approximate', 'min', 'max', 'mean', 'std',
+                   'p25', 'p50', 'p75', 'example']
+
+
+def approx_distinct(series, precision=HLL_PRECISION):
+    """Estimate the number of distinct non-null values with HyperLogLog.
+
+    Values are hashed with pandas' vectorized 64-bit hash; the registers are
+    filled with one `np.maximum.at` call, so the cost is a single pass over
+    the column regardless of its cardinality.
+    """
+    values = series.dropna()
+    if len(values) == 0:
+        return 0
+    # categorize=False hashes values directly; factorizing first would cost as
+    # much as an exact distinct count on high-cardinality columns
+    hashes = pd.util.hash_pandas_object(values, index=False, categorize=False).to_numpy()
+    m = 1 << precision
+    register_index = (hashes >> np.uint64(64 - precision)).astype(np.int64)
+    # Rank = position of the first set bit in the remaining bits, read from the
+    # top 32 of them so the float conversion below is exact.
+    remaining = ((hashes << np.uint64(precision)) >> np.uint64(32)).astype(np.uint32)
+    _, exponent = np.frexp(remaining.astype(np.float64))
+    rank = np.where(remaining == 0, 33, 33 - exponent).astype(np.uint8)
+
+    registers = np.zeros(m, dtype=np.uint8)
+    np.maximum.at(registers, register_index, rank)
+
+    alpha = 0.7213 / (1 + 1.079 / m)
+    estimate = alpha * m * m / np.sum(np.power(2.0, -registers.astype(np.float64)))
+    zeros = int(np.count_nonzero(registers == 0))
+    if estimate <= 2.5 * m and zeros:
+        estimate = m * np.log(m / zeros)  # linear counting for small cardinalities
+    return int(round(estimate))
+
+
+def _quantiles(values, approximate, seed=0):
+    if len(values) == 0:
+        return [np.nan] * 3
+    if approximate and len(values) > QUANTILE_SAMPLE:
+        values = np.random.default_rng(seed).choice(values, QUANTILE_SAMPLE, replace=False)
+    return list(np.quantile(values, [0.25, 0.5, 0.75]))
+
+
+def _numeric_values(series):
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return None
+    if pd.api.types.is_bool_dtype(series.dtype) or not pd.api.types.is_numeric_dtype(series.dtype):
+        return None
+    values = series.to_numpy(dtype='float64', na_value=np.nan)
+    return values[~np.isnan(values)]
+
+
+def profile_dataframe(df, approx_threshold=APPROX_THRESHOLD):
+    """Compute every per-column statistic the dashboard shows, one column at a time.
+
+    Returns a DataFrame indexed by column name with the dtype, null count,
+    distinct count, min/max/mean/std, quartiles and an example value. When
+    the frame has more than `approx_threshold` rows, distinct counts come
+    from HyperLogLog and quartiles from a random sample (`approximate` is
+    True for those rows).
+    """
+    approximate = len(df) > approx_threshold
+    records = {}
+    for col in df.columns:
+        series = df[col]
+        nulls = int(series.isna().sum())
+        non_null = len(series) - nulls
+        record = dict.fromkeys(PROFILE_COLUMNS, np.nan)
+        record['dtype'] = str(series.dtype)
+        record['nulls'] = nulls
+        record['approximate'] = approximate
+
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            # Exact and cheap: count the category codes that actually occur
+            codes = series.cat.codes.to_numpy()
+            record['distinct'] = int(np.count_nonzero(np.bincount(codes[codes >= 0], minlength=1)))
+        elif approximate:
+            record['distinct'] = approx_distinct(series)
+        else:
+            try:
+                record['distinct'] = int(series.nunique(dropna=True))
+            except TypeError:  # unhashable values such as lists
+                record['distinct'] = int(series.astype(str).nunique(dropna=True))
+
+        values = _numeric_values(series)
+        if values is not None and len(values):
+            record['min'] = float(values.min())
+            record['max'] = float(values.max())
+            # Two-pass mean/std in float64 to avoid float32 accumulation error
+            record['mean'] = float(values.mean())
+            record['std'] = float(values.std(ddof=1)) if len(values) > 1 else np.nan
+            record['p25'], record['p50'], record['p75'] = _quantiles(values, approximate)
+        elif pd.api.types.is_datetime64_any_dtype(series.dtype) and non_null:
+            record['min'] = series.min()
+            record['max'] = series.max()
+
+        if non_null:
+            first = series.notna().to_numpy().argmax()
+            record['example'] = series.iloc[first]
+        records[col] = record
+
+    return pd.DataFrame.from_dict(records, orient='index', columns=PROFILE_COLUMNS)
+
+
+def numeric_summary_table(profile):
+    """The `describe()`-style mean/std/min/max table for numeric columns."""
+    numeric = profile[profile['mean'].notna()]
+    return numeric[['mean', 'std', 'min', 'max']].astype('float64')
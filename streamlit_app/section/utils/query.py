@@ -0,0 +1,255 @@
+import itertools
+import re
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import text
+
+from section.utils.perf import record
+from section.utils.schema import invalidate, is_ddl
+
+# Limits for queries typed into the SQL search box
+ROW_CAP = 10_000
+BYTE_BUDGET = 64 * 1024 * 1024
+FETCH_SIZE = 1000
+STATEMENT_TIMEOUT = 30  # seconds
+
+_handle_ids = itertools.count(1)
+
+_QUOTED = re.compile(r"('(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.)*\"|`[^`]*`)")
+_COMMENT = re.compile(r'(--[^\n]*|/\*.*?\*/)', re.DOTALL)
+_SPACE = re.compile(r'\s+')
+_NUMBER = re.compile(r'(?<![\w$.])[-+]?\d+(?:\.\d+)?(?:e[-+]?\d+)?(?![\w$])')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)+\s*\)')
+_PARENS = re.compile(r'\([^()]*\)')
+# One `name [(columns)] AS [NOT] [MATERIALIZED] (query)` of a WITH list, each parenthesized group already `@`
+_CTE = re.compile(r'\s*[\w$?]+\s*@?\s*as\s+(?:not\s+)?(?:materialized\s*)?@\s*(,)?')
+# Clauses that make a SELECT lock rows or write its result somewhere
+_WRITES = re.compile(r'\b(?:into|for\s+(?:no\s+key\s+)?update|for\s+(?:key\s+)?share|lock\s+in\s+share\s+mode)\b')
+
+
+def normalize_sql(sql):
+    """Lower-case keywords and collapse whitespace and comments, leaving quoted text alone."""
+    parts = _QUOTED.split(sql.strip().rstrip(';').strip())
+    for i in range(0, len(parts), 2):
+        parts[i] = _SPACE.sub(' ', _COMMENT.sub(' ', parts[i])).lower()
+    return ''.join(parts).strip()
+
+
+def fingerprint_sql(sql):
+    """`normalize_sql` with literals replaced by `?`, so one query shape is one fingerprint.
+
+    Strings and numbers become `?` and lists of them collapse to `(?)`;
+    backquoted identifiers are kept.
+    """
+    parts = _QUOTED.split(normalize_sql(sql))
+    for i in range(1, len(parts), 2):
+        if not parts[i].startswith('`'):
+            parts[i] = '?'
+    for i in range(0, len(parts), 2):
+        parts[i] = _NUMBER.sub('?', parts[i])
+    return _LIST.sub('(?)', ''.join(parts))
+
+
+def is_select(sql):
+    """Whether a statement is a plain query, safe to run again for another page.
+
+    The main verb, after any WITH list, must be SELECT, and the statement may
+    not lock rows (FOR UPDATE/SHARE) or write them (INTO). Quoted text and
+    comments are ignored.
+    """
+    parts = _QUOTED.split(normalize_sql(sql))
+    skeleton = ''.join('?' if i % 2 else part for i, part in enumerate(parts))
+    if ';' in skeleton or _WRITES.search(skeleton):
+        return False
+    # Collapse parenthesized groups, innermost first, so only the top level is left
+    previous = None
+    while skeleton != previous:
+        previous, skeleton = skeleton, _PARENS.sub('@', skeleton)
+    if skeleton.startswith('with '):
+        position = len('with recursive ') if skeleton.startswith('with recursive ') else len('with ')
+        while True:
+            cte = _CTE.match(skeleton, position)
+            if cte is None:
+                return False
+            position = cte.end()
+            if not cte.group(1):
+                break
+        skeleton = skeleton[position:]
+    return re.match(r'select\b', skeleton) is not None
+
+
+class QueryHandle:
+    """A user query running on a background thread with row, byte and time limits.
+
+    Rows are read through a server-side cursor (`stream_results`) in batches
+    of FETCH_SIZE, and reading stops at `row_cap` rows or `byte_budget`
+    bytes. Plain queries (`is_select`) are paged on the cursor: the rows of
+    earlier pages are read and dropped, so the query runs exactly as typed
+    (comments, duplicate column names from joins) and no more than one page
+    past them is fetched; `page_limits()` gives the arguments for another. `cancel()` and
+    the statement timeout interrupt the query on the server (KILL QUERY on
+    MySQL, a cancel request on PostgreSQL, `interrupt()` on SQLite).
+    """
+
+    def __init__(self, engine, sql, page=0, row_cap=ROW_CAP, byte_budget=BYTE_BUDGET, timeout=STATEMENT_TIMEOUT,
+                 on_done=None, cache_key=None):
+        self.uid = next(_handle_ids)
+        self.engine = engine
+        self.sql = sql
+        self.page = page
+        self.row_cap = row_cap
+        self.byte_budget = byte_budget
+        self.timeout = timeout
+        self.frame = None
+        self.error = None
+        self.stats = {'rows': 0, 'bytes': 0, 'seconds': 0.0, 'page': page,
+                      'has_more': False, 'stopped_by': None, 'cached': False}
+        self.on_done = on_done
+        # Result cache key, with the data versions of the tables read; None if not cacheable
+        self.cache_key = cache_key
+        self._started = None
+        self._cancelled = threading.Event()
+        self._interrupt = None
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    @classmethod
+    def finished(cls, engine, sql, frame, stats, page=0, row_cap=ROW_CAP, cache_key=None):
+        """A handle for a result that is already known (e.g. from the result cache)."""
+        handle = cls(engine, sql, page, row_cap, cache_key=cache_key)
+        handle.frame = frame
+        handle.stats.update(stats, page=page, cached=True)
+        return handle
+
+    # --- Control -----------------------------------------------------------
+
+    def start(self):
+        self._started = time.perf_counter()
+        self._thread.start()
+        return self
+
+    def wait(self, timeout=None):
+        if self._started is not None:
+            self._thread.join(timeout)
+        return self
+
+    @property
+    def running(self):
+        return self._thread.is_alive()
+
+    @property
+    def elapsed(self):
+        if self._started is None:
+            return self.stats['seconds']
+        return self.stats['seconds'] if not self.running else time.perf_counter() - self._started
+
+    def cancel(self, reason='cancelled'):
+        if not self.running or self._cancelled.is_set():
+            return
+        self.stats['stopped_by'] = reason
+        self._cancelled.set()
+        if self._interrupt is not None:
+            try:
+                self._interrupt()
+            except Exception:
+                pass
+
+    def page_limits(self, page):
+        """Arguments for running another page of the same query with the same limits."""
+        return {'page': max(page, 0), 'row_cap': self.row_cap, 'byte_budget': self.byte_budget,
+                'timeout': self.timeout}
+
+    # --- Execution ---------------------------------------------------------
+
+    def _prepare(self, conn):
+        """Set the server-side timeout and remember how to interrupt this connection."""
+        if self.engine.dialect.name == 'mysql':
+            connection_id = conn.execute(text("SELECT CONNECTION_ID()")).scalar()
+            conn.execute(text(f"SET SESSION MAX_EXECUTION_TIME = {int(self.timeout * 1000)}"))
+
+            def kill():
+                with self.engine.connect() as killer:
+                    killer.execute(text(f"KILL QUERY {int(connection_id)}"))
+            self._interrupt = kill
+        elif self.engine.dialect.name == 'postgresql':
+            conn.execute(text(f"SET statement_timeout = {int(self.timeout * 1000)}"))
+            self._interrupt = conn.connection.driver_connection.cancel
+        else:
+            driver = conn.connection.driver_connection
+            if hasattr(driver, 'interrupt'):
+                self._interrupt = driver.interrupt
+
+    def _restore(self, conn):
+        if self.engine.dialect.name == 'mysql':
+            conn.execute(text("SET SESSION MAX_EXECUTION_TIME = 0"))
+        elif self.engine.dialect.name == 'postgresql':
+            conn.execute(text("SET statement_timeout = 0"))
+
+    def _skip(self, result, count):
+        """Read and drop the first `count` rows (the earlier pages)."""
+        while count > 0 and not self._cancelled.is_set():
+            rows = result.fetchmany(min(count, FETCH_SIZE))
+            if not rows:
+                break
+            count -= len(rows)
+
+    def _fetch(self, result):
+        batches = []
+        for batch in result.partitions(FETCH_SIZE):
+            frame = pd.DataFrame(batch, columns=list(result.keys()))
+            batches.append(frame)
+            self.stats['rows'] += len(frame)
+            self.stats['bytes'] += int(frame.memory_usage(deep=True, index=False).sum())
+            if self.stats['rows'] > self.row_cap:
+                self.stats['stopped_by'] = self.stats['stopped_by'] or 'row cap'
+                break
+            if self.stats['bytes'] >= self.byte_budget:
+                self.stats['stopped_by'] = 'byte budget'
+                break
+            if self._cancelled.is_set():
+                break
+        frame = pd.concat(batches, ignore_index=True) if batches else pd.DataFrame(columns=list(result.keys()))
+        if len(frame) > self.row_cap:
+            frame = frame.iloc[:self.row_cap]
+            self.stats['rows'] = self.row_cap
+            self.stats['has_more'] = True
+        elif self.stats['stopped_by'] == 'byte budget':
+            self.stats['has_more'] = True
+        return frame
+
+    def _run(self):
+        timer = threading.Timer(self.timeout, self.cancel, kwargs={'reason': 'timeout'})
+        paged = is_select(self.sql)
+        try:
+            with self.engine.connect().execution_options(stream_results=True) as conn:
+                self._prepare(conn)
+                timer.start()
+                try:
+                    result = conn.execute(text(self.sql))
+                    if result.returns_rows:
+                        if paged:
+                            self._skip(result, self.page * self.row_cap)
+                        self.frame = self._fetch(result)
+                        if self.stats['stopped_by'] == 'row cap' and not paged:
+                            # Other statements are not run again, so there is no next page
+                            self.stats['has_more'] = False
+                        result.close()
+                finally:
+                    timer.cancel()
+                    self._restore(conn)
+            if is_ddl(self.sql):
+                invalidate(self.engine)
+        except Exception as e:
+            if self._cancelled.is_set():
+                stopped = 'timed out' if self.stats['stopped_by'] == 'timeout' else 'cancelled'
+                self.error = f"Query {stopped} after {time.perf_counter() - self._started:.1f}s."
+            else:
+                self.error = e
+        finally:
+            self.stats['seconds'] = time.perf_counter() - self._started
+            record('query.search', self.stats['seconds'], 'query', self.stats['bytes'],
+                   {'fingerprint': fingerprint_sql(self.sql)})
+            if self.on_done is not None:
+                self.on_done(self)
+
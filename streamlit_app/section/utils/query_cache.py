@@ -0,0 +1,93 @@
+import re
+import threading
+from collections import OrderedDict
+
+from section.utils.query import is_select, normalize_sql
+
+# Total size of cached result frames, shared by every session in the process
+CACHE_BYTES = 256 * 1024 * 1024
+
+_WORD = re.compile(r'[A-Za-z0-9_$]+')
+
+# (engine url, table or None) -> data version; None is the whole-database epoch
+_versions = {}
+_results = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'evictions': 0, 'bytes': 0}
+_cache_lock = threading.Lock()
+
+
+def _engine_key(engine):
+    return engine.url.render_as_string(hide_password=True)
+
+
+def bump_table(engine, table_name=None):
+    """Mark a table's data (or, with None, the whole database) as changed."""
+    key = (_engine_key(engine), table_name)
+    with _cache_lock:
+        _versions[key] = _versions.get(key, 0) + 1
+
+
+def _data_versions(engine, normalized):
+    """Versions of the database epoch and of every changed table the query names.
+
+    Tables are matched by name on every engine, not only `engine`: a query
+    can read another database's table by qualified name (e.g.
+    `database_2.user_information`), and changes there must invalidate it too.
+    Tables never changed have no version and are left out.
+    """
+    url = _engine_key(engine)
+    words = {w.lower() for w in _WORD.findall(normalized)}
+    with _cache_lock:
+        tables = sorted((key, version) for key, version in _versions.items()
+                        if key[1] is not None and key[1].lower() in words)
+        return (_versions.get((url, None), 0),) + tuple(tables)
+
+
+def cache_key(engine, sql, page, row_cap):
+    """Key for a SELECT/WITH result, or None for statements that must not be cached."""
+    if not is_select(sql):
+        return None
+    normalized = normalize_sql(sql)
+    return (_engine_key(engine), normalized, page, row_cap, _data_versions(engine, normalized))
+
+
+def get_result(key):
+    """The cached (frame, stats) for `key`, counting a hit or a miss."""
+    with _cache_lock:
+        entry = _results.get(key)
+        if entry is None:
+            _stats['misses'] += 1
+            return None
+        _results.move_to_end(key)
+        _stats['hits'] += 1
+        return entry[0], entry[1]
+
+
+def put_result(key, frame, stats, budget=CACHE_BYTES):
+    """Store a result, evicting least recently used ones to stay within `budget` bytes."""
+    size = int(frame.memory_usage(deep=True, index=True).sum())
+    if size > budget:
+        return
+    with _cache_lock:
+        if key in _results:
+            _stats['bytes'] -= _results.pop(key)[2]
+        while _results and _stats['bytes'] + size > budget:
+            _, (_, _, evicted) = _results.popitem(last=False)
+            _stats['bytes'] -= evicted
+            _stats['evictions'] += 1
+        _results[key] = (frame, dict(stats), size)
+        _stats['bytes'] += size
+
+
+def clear_results():
+    with _cache_lock:
+        _results.clear()
+        _stats['bytes'] = 0
+
+
+def cache_stats():
+    """Hit/miss counters and current size of the result cache."""
+    with _cache_lock:
+        lookups = _stats['hits'] + _stats['misses']
+        return dict(_stats, entries=len(_results), budget=CACHE_BYTES,
+                    hit_rate=_stats['hits'] / lookups if lookups else None)
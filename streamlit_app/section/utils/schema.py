@@ -0,0 +1,114 @@
+import re
+import threading
+import time
+
+import pandas as pd
+from sqlalchemy import func, inspect, select, table, text
+
+# Seconds a cached catalog answer is trusted before it is read again
+SCHEMA_TTL = 300
+
+_DDL_PATTERN = re.compile(r'^\s*(CREATE|ALTER|DROP|RENAME|TRUNCATE)\b', re.IGNORECASE)
+
+# engine url -> {'names': (time, list), 'stats': (time, DataFrame), 'tables': {name: (time, dict)}}
+_schema_cache = {}
+_schema_lock = threading.Lock()
+
+
+def _engine_key(engine):
+    return engine.url.render_as_string(hide_password=True)
+
+
+def _cached(engine, slot, name, load, ttl):
+    key = _engine_key(engine)
+    now = time.monotonic()
+    with _schema_lock:
+        entries = _schema_cache.setdefault(key, {'tables': {}})
+        hit = entries['tables'].get(name) if slot == 'tables' else entries.get(slot)
+    if hit is not None and now - hit[0] < ttl:
+        return hit[1]
+    value = load()
+    with _schema_lock:
+        entries = _schema_cache.setdefault(key, {'tables': {}})
+        if slot == 'tables':
+            entries['tables'][name] = (now, value)
+        else:
+            entries[slot] = (now, value)
+    return value
+
+
+def invalidate(engine, table_name=None):
+    """Forget cached catalog data for one table (or every table) of `engine`.
+
+    Called after anything that creates, drops or rewrites a table. The table
+    list and row counts are always dropped, since either may have changed.
+    """
+    with _schema_lock:
+        entries = _schema_cache.get(_engine_key(engine))
+        if entries is None:
+            return
+        entries.pop('names', None)
+        entries.pop('stats', None)
+        if table_name is None:
+            entries['tables'].clear()
+        else:
+            entries['tables'].pop(table_name, None)
+
+
+def is_ddl(query):
+    """Whether a SQL statement changes the schema."""
+    return bool(_DDL_PATTERN.match(query))
+
+
+def table_names(engine, ttl=SCHEMA_TTL):
+    return _cached(engine, 'names', None, lambda: inspect(engine).get_table_names(), ttl)
+
+
+def _read_stats(engine):
+    if engine.dialect.name == 'mysql':
+        # One catalog query; InnoDB row counts here are estimates
+        query = text("""
+            SELECT TABLE_NAME AS `table`, TABLE_ROWS AS `rows`,
+                   DATA_LENGTH + INDEX_LENGTH AS `bytes`
+            FROM information_schema.TABLES
+            WHERE TABLE_SCHEMA = DATABASE() AND TABLE_TYPE = 'BASE TABLE'
+            ORDER BY TABLE_NAME
+        """)
+        with engine.connect() as conn:
+            return pd.DataFrame(conn.execute(query).fetchall(), columns=['table', 'rows', 'bytes'])
+
+    rows = []
+    with engine.connect() as conn:
+        for name in table_names(engine):
+            count = conn.execute(select(func.count()).select_from(table(name))).scalar()
+            rows.append({'table': name, 'rows': count, 'bytes': None})
+    return pd.DataFrame(rows, columns=['table', 'rows', 'bytes'])
+
+
+def table_stats(engine, ttl=SCHEMA_TTL):
+    """Row counts and on-disk sizes for every table, without reading any rows.
+
+    On MySQL these come from `information_schema.TABLES`; other databases
+    fall back to one `COUNT(*)` per table and report no size.
+    """
+    return _cached(engine, 'stats', None, lambda: _read_stats(engine), ttl)
+
+
+def _read_table(engine, table_name):
+    inspector = inspect(engine)
+    key = inspector.get_pk_constraint(table_name).get('constrained_columns') or []
+    indexes = [{'name': i['name'], 'columns': i['column_names'], 'unique': bool(i.get('unique'))}
+               for i in inspector.get_indexes(table_name)]
+    if not key:
+        # Saved datasets are keyed by a unique index (see bulk_load), not a PRIMARY KEY
+        key = next((i['columns'] for i in indexes if i['unique'] and len(i['columns']) == 1), [])
+    return {
+        'columns': [{'name': c['name'], 'type': str(c['type'])} for c in inspector.get_columns(table_name)],
+        'primary_key': key[0] if len(key) == 1 else None,
+        'indexes': indexes,
+    }
+
+
+def table_info(engine, table_name, ttl=SCHEMA_TTL):
+    """Columns (name and type), single-column key (primary or unique) and indexes of a table."""
+    return _cached(engine, 'tables', table_name, lambda: _read_table(engine, table_name), ttl)
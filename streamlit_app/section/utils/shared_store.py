@@ -0,0 +1,144 @@
+import os
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+import pandas as pd
+
+from section.utils import disk_cache
+from section.utils.dataset import VersionedDataset
+
+# Bytes of shared base frames kept in memory across every session in the process;
+# datasets no session holds are spilled to the disk cache (least recently used first) beyond it
+MEMORY_BUDGET = int(os.environ.get('BANKING_SHARED_MEMORY_BYTES', 2 * 1024**3))
+
+STORE_COLUMNS = ['token', 'name', 'rows', 'columns', 'bytes', 'holders', 'sessions', 'on_disk', 'last_access']
+
+# token -> entry dict (frame, meta, bytes, holders, last_access), least recently used first
+_entries = OrderedDict()
+_stats = {'hits': 0, 'misses': 0, 'reloads': 0, 'spills': 0}
+_lock = threading.Lock()
+
+
+def _frame_bytes(frame):
+    return int(frame.memory_usage(deep=True, index=True).sum())
+
+
+def lookup(token, session=None):
+    """A new dataset over the shared frame for a content hash, with its meta, or None if it is neither
+    in memory nor on disk.
+
+    A dataset spilled earlier is memory-mapped back from the disk cache.
+    The dataset is held for `session` as in `share`.
+    """
+    with _lock:
+        entry = _entries.get(token)
+        if entry is not None:
+            _entries.move_to_end(token)
+            entry['last_access'] = time.time()
+            _stats['hits'] += 1
+            return _hold(token, entry, session), entry['meta']
+        _stats['misses'] += 1
+    loaded = disk_cache.load_dataset(token)
+    if loaded is None:
+        return None
+    frame, meta = loaded
+    with _lock:
+        _stats['reloads'] += 1
+    return share(token, frame, meta['name'], meta['report'], meta['original_dtypes'], session)
+
+
+def share(token, frame, name, report=None, original_dtypes=None, session=None):
+    """Keep `frame` as the one in-memory copy of the dataset `token`; returns (dataset, meta).
+
+    If another session shared the same content first, its frame is used
+    instead and `frame` can be dropped. The shared frame is never modified:
+    `dataset` is a new VersionedDataset over it, whose edits copy the
+    columns they touch. It holds the shared frame for `session` from the
+    moment it is created, under the store's lock, so the memory budget
+    enforced here never spills a dataset before its session got it. The
+    hold is dropped when the dataset is garbage collected, e.g. when its
+    session ends or loads another file.
+    """
+    with _lock:
+        entry = _entries.get(token)
+        if entry is None:
+            meta = {'name': name, 'report': report, 'original_dtypes': original_dtypes}
+            entry = _entries[token] = {'frame': frame, 'meta': meta, 'bytes': _frame_bytes(frame),
+                                       'holders': {}, 'last_access': time.time()}
+        else:
+            _stats['hits'] += 1
+        _entries.move_to_end(token)
+        entry['last_access'] = time.time()
+        shared = _hold(token, entry, session), entry['meta']
+    trim()
+    return shared
+
+
+def _hold(token, entry, session):
+    """A VersionedDataset over `entry`'s frame, counted as one of its holders; the caller holds `_lock`."""
+    dataset = VersionedDataset(entry['frame'], token=token)
+    holder = id(dataset)
+    entry['holders'][holder] = session
+    weakref.finalize(dataset, _detach, token, holder)
+    return dataset
+
+
+def _detach(token, holder):
+    with _lock:
+        entry = _entries.get(token)
+        if entry is not None:
+            entry['holders'].pop(holder, None)
+
+
+def holders(token):
+    """Number of datasets (across all sessions) built on the shared frame `token`."""
+    with _lock:
+        entry = _entries.get(token)
+        return len(entry['holders']) if entry is not None else 0
+
+
+def trim(budget=None):
+    """Spill idle datasets, least recently used first, until the shared frames fit in `budget` bytes.
+
+    Only datasets no session holds are dropped; they are written to the disk
+    cache first (if it is enabled and they are not there yet), so `lookup`
+    can map them back.
+    Returns the number of datasets spilled.
+    """
+    budget = MEMORY_BUDGET if budget is None else budget
+    with _lock:
+        total = sum(e['bytes'] for e in _entries.values())
+        idle = [(token, e) for token, e in _entries.items() if not e['holders']]
+        victims = []
+        for token, entry in idle:
+            if total <= budget:
+                break
+            victims.append((token, entry))
+            total -= entry['bytes']
+            del _entries[token]
+        _stats['spills'] += len(victims)
+    for token, entry in victims:
+        if disk_cache.load_meta(token) is None:
+            meta = entry['meta']
+            disk_cache.store_dataset(token, entry['frame'], meta['name'], meta['report'], meta['original_dtypes'])
+    return len(victims)
+
+
+def usage():
+    """Shared datasets with their size, holders and sessions, most recently used first, plus store totals."""
+    with _lock:
+        records = [{
+            'token': token, 'name': e['meta']['name'], 'rows': len(e['frame']), 'columns': len(e['frame'].columns),
+            'bytes': e['bytes'], 'holders': len(e['holders']),
+            'sessions': ', '.join(sorted({str(s) for s in e['holders'].values() if s is not None})),
+            'last_access': e['last_access'],
+        } for token, e in reversed(_entries.items())]
+        stats = dict(_stats)
+    frame = pd.DataFrame(records, columns=[c for c in STORE_COLUMNS if c != 'on_disk'])
+    frame.insert(STORE_COLUMNS.index('on_disk'), 'on_disk',
+                 [disk_cache.load_meta(token) is not None for token in frame['token']])
+    frame['last_access'] = pd.to_datetime(frame['last_access'], unit='s')
+    stats.update({'datasets': len(frame), 'bytes': int(frame['bytes'].sum()), 'budget': MEMORY_BUDGET})
+    return frame, stats
@@ -0,0 +1,74 @@
+import numpy as np
+import pandas as pd
+
+EDITOR_PAGE_SIZE = 100
+EDITOR_PAGE_SIZES = [25, 50, 100, 250, 500, 1000]
+# Rows of the change review shown per page
+REVIEW_PAGE_SIZE = 50
+# Largest table (rows x columns) rendered through the pandas Styler
+STYLE_CELL_BUDGET = 200_000
+
+
+def _matches(series, text):
+    """Case-insensitive substring filter; categorical columns only test their categories."""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        categories = series.cat.categories.astype(str)
+        hits = np.flatnonzero(categories.str.contains(text, case=False, regex=False))
+        return np.isin(series.cat.codes.to_numpy(), hits)
+    return series.astype('string').str.contains(text, case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+
+
+def window_order(df, filter_column=None, filter_text=None, sort_column=None, descending=False):
+    """Row positions of `df` that pass the filter, in sort order."""
+    positions = np.arange(len(df))
+    if filter_column is not None and filter_text:
+        positions = positions[_matches(df[filter_column], filter_text)]
+    if sort_column is not None:
+        values = df[sort_column].iloc[positions].reset_index(drop=True)
+        order = values.sort_values(ascending=not descending, kind='stable', na_position='last').index.to_numpy()
+        positions = positions[order]
+    return positions
+
+
+def dataset_window_order(dataset, filter_column=None, filter_text=None, sort_column=None, descending=False):
+    """`window_order` of a VersionedDataset, cached per version.
+
+    Edits to columns other than the filter and sort columns keep the cached
+    order, so typing into the editor does not re-sort the table.
+    """
+    def compute(df):
+        return window_order(df, filter_column, filter_text, sort_column, descending)
+
+    def update(df, previous, changed):
+        return compute(df) if changed & {filter_column, sort_column} else previous
+
+    return dataset.cached(('window', filter_column, filter_text, sort_column, descending), compute, update)
+
+
+def page_of(frame, positions, page, page_size):
+    """Rows `page * page_size` to the end of that page, taken from `positions`."""
+    return frame.iloc[positions[page * page_size:(page + 1) * page_size]]
+
+
+def dataset_null_counts(dataset):
+    """Nulls per column of a VersionedDataset, cached per version; edits recount edited columns only."""
+    def update(df, previous, changed):
+        counts = previous.reindex(df.columns)
+        stale = [c for c in df.columns if c in changed or pd.isna(counts[c])]
+        if stale:
+            counts[stale] = df[stale].isna().sum()
+        return counts.astype('int64')
+
+    return dataset.cached('nulls', lambda df: df.isna().sum(), update)
+
+
+def change_summary(change_set, nulls):
+    """Changed cells and nulls per column, from a change set and per-column null counts."""
+    edited = change_set[change_set['change'] != 'removed']
+    counts = edited.groupby('column', sort=False).size()
+    summary = pd.DataFrame({
+        'changed': counts.reindex(nulls.index, fill_value=0),
+        'nulls': nulls,
+    })
+    summary.index.name = 'column'
+    return summary.reset_index()
@@ -1,9 +1,8 @@
 import streamlit as st
 import hashlib
-import time 
 from section import dashboardver2_1
 from datetime import datetime
-from section.utils.helper import insert_user, insert_admin, get_admin_by_username, get_user_by_username
+from section.utils.helper import insert_user, insert_admin, authenticate_account
 
 st.set_page_config(page_title='Dashboard', layout='wide')
 
@@ -43,13 +42,12 @@ def login(username, password):
     
     hashed_pw = hash_password(password)
 
-    user = get_user_by_username(username)
-    if user and user.get('password') == hashed_pw:
+    role = authenticate_account(username, hashed_pw)
+    if role == "user":
         st.session_state.user_role = "user" 
         return True, f"Welcome, {username} (User)!"
 
-    admin = get_admin_by_username(username)
-    if admin and admin.get('password') == hashed_pw:
+    if role == "admin":
         st.session_state.user_role = "admin"  
         return True, f"Welcome, {username} (Admin)!"
 
@@ -123,7 +121,6 @@ def main():
                     st.success("Login successful! Redirecting to dashboard...")
                     st.session_state.login_success = True
                     st.session_state.username = username
-                    time.sleep(1.5)
                     st.rerun()
                 else:
                     st.error(message)
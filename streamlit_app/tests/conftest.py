@@ -0,0 +1,16 @@
+import os
+import sys
+
+import pytest
+from sqlalchemy import create_engine
+
+# The app imports its modules as `section.utils...` from the streamlit_app directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+@pytest.fixture
+def sqlite_engine(tmp_path):
+    """A file-backed SQLite engine, so separate connections see the same data."""
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}")
+    yield engine
+    engine.dispose()
@@ -0,0 +1,44 @@
+import pytest
+from sqlalchemy import text
+
+from section.utils.auth import authenticate, invalidate_credentials, lookup_credentials
+
+
+@pytest.fixture
+def accounts(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        for table in ('user_information', 'admin_information'):
+            conn.execute(text(f"CREATE TABLE {table} (username TEXT, password TEXT)"))
+        conn.execute(text("INSERT INTO user_information VALUES ('alice', 'h1'), ('both', 'user-hash')"))
+        conn.execute(text("INSERT INTO admin_information VALUES ('root', 'h2'), ('both', 'admin-hash')"))
+    yield sqlite_engine
+    invalidate_credentials()
+
+
+def test_authenticate_finds_users_and_admins(accounts):
+    assert authenticate(accounts, 'alice', 'h1') == 'user'
+    assert authenticate(accounts, 'root', 'h2') == 'admin'
+    assert authenticate(accounts, 'alice', 'wrong') is None
+    assert authenticate(accounts, 'nobody', 'h1') is None
+
+
+def test_a_name_in_both_tables_matches_either_hash(accounts):
+    assert authenticate(accounts, 'both', 'user-hash') == 'user'
+    assert authenticate(accounts, 'both', 'admin-hash') == 'admin'
+
+
+def test_lookups_are_cached_until_invalidated(accounts):
+    assert lookup_credentials(accounts, 'alice') == (('user', 'h1'),)
+    with accounts.begin() as conn:
+        conn.execute(text("UPDATE user_information SET password = 'h3' WHERE username = 'alice'"))
+    assert authenticate(accounts, 'alice', 'h3') is None
+
+    invalidate_credentials('alice')
+    assert authenticate(accounts, 'alice', 'h3') == 'user'
+
+
+def test_expired_entries_are_read_again(accounts):
+    assert lookup_credentials(accounts, 'carol', ttl=0) == ()
+    with accounts.begin() as conn:
+        conn.execute(text("INSERT INTO user_information VALUES ('carol', 'h4')"))
+    assert lookup_credentials(accounts, 'carol') == (('user', 'h4'),)
@@ -0,0 +1,39 @@
+import pytest
+from sqlalchemy import text
+
+from section.utils.browse import count_rows, fetch_page
+
+
+@pytest.fixture
+def ledger(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE ledger (id INTEGER, memo TEXT)"))
+        conn.execute(text("INSERT INTO ledger VALUES " + ', '.join(f"({i}, 'payment {i}')" for i in range(1, 51))))
+        conn.execute(text("INSERT INTO ledger VALUES (51, '100% refund'), (52, 'fee_waived'), (53, 'a/b')"))
+    return sqlite_engine
+
+
+def test_pages_by_offset(ledger):
+    page = fetch_page(ledger, 'ledger', ['id', 'memo'], 1, page_size=10, sort_column='id')
+    assert page['id'].tolist() == list(range(11, 21))
+
+
+def test_pages_by_key(ledger):
+    page = fetch_page(ledger, 'ledger', ['id'], 5, page_size=3, sort_column='id', descending=True, after=50)
+    assert page['id'].tolist() == [49, 48, 47]
+
+
+def test_filter_counts_and_pages_agree(ledger):
+    assert count_rows(ledger, 'ledger', 'memo', 'payment 1') == 11
+    page = fetch_page(ledger, 'ledger', ['id'], 0, page_size=100, filter_column='memo', filter_text='payment 1')
+    assert len(page) == 11
+
+
+@pytest.mark.parametrize('text_, ids', [('%', [51]), ('_', [52]), ('/', [53])])
+def test_like_wildcards_in_the_filter_are_literal(ledger, text_, ids):
+    page = fetch_page(ledger, 'ledger', ['id'], 0, filter_column='memo', filter_text=text_)
+    assert page['id'].tolist() == ids
+
+
+def test_numbers_can_be_filtered_as_text(ledger):
+    assert count_rows(ledger, 'ledger', 'id', '5') == 9  # 5, 15, 25, 35, 45 and 50-53
@@ -0,0 +1,52 @@
+import decimal
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import BigInteger, Float, Numeric, SmallInteger, String, Text, text
+from sqlalchemy.dialects import mysql
+
+from section.utils.bulk import MAX_VARCHAR, bulk_load, sql_column_types
+from section.utils.schema import table_info
+
+
+def test_integer_widths_are_kept():
+    frame = pd.DataFrame({'a': np.array([1], dtype='int8'), 'b': np.array([1], dtype='uint32'),
+                          'c': pd.array([1], dtype='Int64')})
+    types = sql_column_types(frame, 'mysql')
+    assert isinstance(types['a'], mysql.TINYINT) and not types['a'].unsigned
+    assert isinstance(types['b'], mysql.INTEGER) and types['b'].unsigned
+    assert isinstance(types['c'], mysql.BIGINT)
+
+    types = sql_column_types(frame, 'sqlite')
+    assert isinstance(types['a'], SmallInteger)
+    assert isinstance(types['b'], BigInteger)
+
+
+def test_floats_and_decimals():
+    frame = pd.DataFrame({'single': np.array([1.5, 2.0], dtype='float32'), 'double': [1.5, 0.1],
+                          'exact': [decimal.Decimal('12.345'), decimal.Decimal('1.5')]})
+    types = sql_column_types(frame, 'sqlite')
+    assert isinstance(types['single'], Float) and types['single'].precision == 24
+    assert types['double'].precision == 53
+    assert isinstance(types['exact'], Numeric) and (types['exact'].precision, types['exact'].scale) == (5, 3)
+
+
+def test_strings_and_categories_are_never_sized_to_the_current_values():
+    frame = pd.DataFrame({'short': ['ab', 'c'], 'branch': pd.Categorical(['north', 'south']),
+                          'long': ['x' * (MAX_VARCHAR + 1), 'y']})
+    types = sql_column_types(frame, 'mysql')
+    assert isinstance(types['short'], String) and types['short'].length == MAX_VARCHAR
+    assert isinstance(types['branch'], String) and types['branch'].length == MAX_VARCHAR
+    assert isinstance(types['long'], Text)
+
+
+def test_bulk_load_creates_the_table_and_a_unique_key(sqlite_engine):
+    frame = pd.DataFrame({'accountID': np.arange(1, 101, dtype='int16'), 'branch': ['north', 'south'] * 50})
+    result = bulk_load(frame, 'accounts', sqlite_engine, index_columns=['branch'], key_column='accountID')
+
+    assert result['rows'] == 100 and result['method'] == 'batched-insert'
+    with sqlite_engine.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM accounts")).scalar() == 100
+    info = table_info(sqlite_engine, 'accounts', ttl=0)
+    assert info['primary_key'] == 'accountID'
+    assert {tuple(i['columns']) for i in info['indexes']} == {('accountID',), ('branch',)}
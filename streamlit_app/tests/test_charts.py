@@ -0,0 +1,56 @@
+import numpy as np
+import pandas as pd
+
+from section.utils.charts import downsample, histogram_bins, numeric_columns, top_n
+
+
+def test_numeric_columns_skip_booleans_and_text():
+    df = pd.DataFrame({'a': np.array([1], dtype='int8'), 'b': pd.array([1.5], dtype='Float32'), 'c': [True],
+                       'd': ['x']})
+    assert numeric_columns(df) == ['a', 'b']
+
+
+def test_small_integer_ranges_get_one_bin_per_value():
+    bins = histogram_bins(pd.Series([1, 2, 2, 3, 3, 3], dtype='int16'))
+    assert bins['count'].tolist() == [1, 2, 3]
+    assert bins['left'].tolist() == [0.5, 1.5, 2.5]
+
+
+def test_histogram_counts_every_finite_value():
+    values = pd.Series(np.random.default_rng(0).normal(size=10_000))
+    values[:10] = np.nan
+    bins = histogram_bins(values, bins=50)
+    assert len(bins) == 50
+    assert bins['count'].sum() == 9_990
+    assert bins.attrs['dropped'] == 10
+
+
+def test_histogram_bins_are_capped():
+    assert len(histogram_bins(pd.Series(np.arange(100_000, dtype='float64')), bins=10_000, max_bins=100)) == 100
+
+
+def test_log_scale_drops_non_positive_values():
+    bins = histogram_bins(pd.Series([-1.0, 0.0, 1.0, 10.0, 100.0]), bins=2, log_scale=True)
+    assert bins.attrs['dropped'] == 2
+    assert bins['count'].sum() == 3
+    assert np.isclose(bins['right'].iloc[0], 10.0)
+
+
+def test_top_n_sums_the_rest():
+    values = pd.Series({'a': 5, 'b': 1, 'c': 3, 'd': 2})
+    assert top_n(values, 2).to_dict() == {'a': 5, 'c': 3}
+    assert top_n(values, 2, other_label='other').to_dict() == {'a': 5, 'c': 3, 'other (2)': 3}
+
+
+def test_downsample_keeps_peaks():
+    y = np.zeros(100_000)
+    y[12_345] = 50.0
+    y[67_890] = -50.0
+    reduced = downsample(np.arange(len(y)), y, max_points=1000)
+    assert len(reduced) <= 1000
+    assert reduced['y'].max() == 50.0 and reduced['y'].min() == -50.0
+    assert 12_345 in reduced['x'].to_numpy()
+
+
+def test_short_series_are_not_downsampled():
+    assert len(downsample([1, 2, 3], [1.0, 2.0, 3.0])) == 3
@@ -0,0 +1,67 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from section.utils.classify import classify_columns, detect_values, match_keyword
+from section.utils.dataset import VersionedDataset
+from section.utils.classify import dataset_classification
+
+KEYWORDS = ['account', 'name', 'email', 'card']
+
+
+@pytest.mark.parametrize('column, keyword', [
+    ('AccountNumber', 'account'), ('account-number', 'account'), ('accounts', 'account'), ('email2', 'email'),
+    ('filename', None), ('accountant_notes', None),
+])
+def test_match_keyword(column, keyword):
+    assert match_keyword(column, KEYWORDS) == keyword
+
+
+@pytest.mark.parametrize('values, kind', [
+    (['DEUTDEFF', 'BNPAFRPP', 'CHASUS33', 'HSBCGB2LXXX'], 'swift'),
+    (['GB82WEST12345698765432', 'DE89370400440532013000'], 'iban'),
+    (['+44 20 7946 0958', '(212) 555-0100', '020 7946 0958'], 'phone'),
+    (['jane.doe@example.com', 'j.smith@bank.co.uk'], 'email'),
+    (['4111 1111 1111 1111', '5500-0000-0000-0004'], 'card_number'),
+])
+def test_detect_values(values, kind):
+    assert detect_values(pd.Series(values * 5))[0] == kind
+
+
+@pytest.mark.parametrize('values', [
+    ['APPROVED', 'REJECTED', 'TRANSFER', 'WITHDRAW'],  # 8 letters, but no country code
+    ['2026-10-18', '18.10.2026', '01-02-2024'],  # dates look like phone numbers
+    ['192.168.1.10', '10.0.0.1', '8.8.8.8'],  # so do IP addresses
+    ['0000000000000000', '4444444444444444'],  # pass Luhn, but are placeholders
+])
+def test_look_alikes_are_not_detected(values):
+    assert detect_values(pd.Series(values * 5))[0] is None
+
+
+def test_integer_card_numbers():
+    assert detect_values(pd.Series([4111111111111111, 5500000000000004] * 5, dtype='uint64'))[0] == 'card_number'
+
+
+def test_card_numbers_read_as_float_with_blanks():
+    values = pd.Series([4111111111111111.0, 5500000000000004.0, 340000000000009.0, np.nan] * 5)
+    assert detect_values(values)[0] == 'card_number'
+
+
+def test_amounts_are_not_cards():
+    assert detect_values(pd.Series([12.5, 99.99, 1500.0, np.nan] * 5))[0] is None
+
+
+def test_name_and_values_both_count():
+    df = pd.DataFrame({'card': ['4111 1111 1111 1111'] * 4, 'account_name': ['a', 'b', 'c', 'd'],
+                       'notes': ['x', 'y', 'z', 'w'], 'contact': ['a@b.com'] * 4})
+    result = classify_columns(df, KEYWORDS)
+    assert result.loc['card', 'confidence'] > result.loc['account_name', 'confidence'] > 0
+    assert result.loc['contact', 'detected'] == 'email' and result.loc['contact', 'critical']
+    assert not result.loc['notes', 'critical']
+
+
+def test_dataset_classification_reclassifies_edited_columns():
+    dataset = VersionedDataset(pd.DataFrame({'contact': ['a@b.com'] * 4, 'other': ['x'] * 4}))
+    assert dataset_classification(dataset, KEYWORDS).loc['contact', 'detected'] == 'email'
+    dataset.set_cells('other', [0, 1, 2, 3], ['c@d.com'] * 4)
+    assert dataset_classification(dataset, KEYWORDS).loc['other', 'detected'] == 'email'
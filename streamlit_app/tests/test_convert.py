@@ -0,0 +1,106 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from section.utils.convert import (convert_column, convert_columns, detect_date_format, infer_column,
+                                   parse_numbers)
+
+
+def test_parse_numbers_reads_bank_style_amounts():
+    text = pd.Series(['$1,234.50', '(120.00)', 'USD 12', '45.10-', 'n/a'])
+    numbers, _ = parse_numbers(text)
+    assert numbers.iloc[:4].tolist() == [1234.5, -120.0, 12.0, -45.1]
+    assert np.isnan(numbers.iloc[4])
+
+
+def test_parse_numbers_with_a_decimal_comma():
+    numbers, _ = parse_numbers(pd.Series(['1.234,50', '7,25']), decimal=',')
+    assert numbers.tolist() == [1234.5, 7.25]
+
+
+def test_detect_date_format_prefers_day_first():
+    assert detect_date_format(pd.Series(['03/04/2026', '25/12/2025']))[0] == '%d/%m/%Y'
+
+
+@pytest.mark.parametrize('values, target', [
+    (['1', '2', '3'], 'integer'),
+    (['1.5', '2.25'], 'float'),
+    (['yes', 'no', 'yes'], 'boolean'),
+    (['2026-01-31', '2025-12-01'], 'datetime'),
+])
+def test_infer_column(values, target):
+    assert infer_column(pd.Series(values * 10))['target'] == target
+
+
+def test_zero_padded_codes_stay_text():
+    codes = pd.Series([f'{i:06d}' for i in range(200)])
+    assert infer_column(codes)['target'] == 'keep'
+
+
+def test_numeric_columns_are_kept():
+    assert infer_column(pd.Series([1, 2, 3]))['target'] == 'keep'
+
+
+def test_integer_text_is_downcast():
+    converted, coerced = convert_column(pd.Series(['1', '2', '3']), 'integer')
+    assert converted.dtype == 'int8'
+    assert coerced == 0
+
+
+@pytest.mark.parametrize('dtype', [None, 'category'])
+def test_integer_text_with_nulls_stays_integer(dtype):
+    converted, coerced = convert_column(pd.Series(['1', '2', None, '3'], dtype=dtype), 'integer')
+    assert converted.dtype == 'Int64'
+    assert converted.tolist() == [1, 2, pd.NA, 3]
+    assert coerced == 0
+
+
+def test_fractions_are_coerced_to_null_in_integer_columns():
+    converted, coerced = convert_column(pd.Series(['1', '2.5', 'x']), 'integer')
+    assert converted.dtype == 'Int64'
+    assert converted.isna().tolist() == [False, True, True]
+    assert coerced == 2
+
+
+def test_numeric_columns_convert_directly():
+    converted, _ = convert_column(pd.Series([1.0, 2.0, np.nan]), 'integer')
+    assert converted.dtype == 'Int64'
+    converted, _ = convert_column(pd.Series([1, 2], dtype='int64'), 'float')
+    assert converted.dtype == 'float64'
+
+
+def test_categorical_columns_convert_through_their_categories():
+    series = pd.Series(pd.Categorical(['10', '20', '10', None]))
+    converted, coerced = convert_column(series, 'float')
+    assert converted.tolist()[:3] == [10.0, 20.0, 10.0]
+    assert np.isnan(converted.iloc[3])
+    assert coerced == 0
+
+
+def test_boolean_and_datetime_targets_keep_nulls():
+    converted, _ = convert_column(pd.Series(['yes', None, 'n']), 'boolean')
+    assert converted.dtype == 'boolean'
+    assert converted.tolist() == [True, pd.NA, False]
+
+    converted, coerced = convert_column(pd.Series(['31/01/2026', None, 'soon']), 'datetime', '%d/%m/%Y')
+    assert converted.iloc[0] == pd.Timestamp('2026-01-31')
+    assert converted.isna().tolist() == [False, True, True]
+    assert coerced == 1
+
+
+def test_money_is_exact_decimal():
+    pytest.importorskip('pyarrow')
+    converted, _ = convert_column(pd.Series(['$0.10', '$0.20', None]), 'money')
+    assert isinstance(converted.dtype, pd.ArrowDtype)
+    assert str(converted.iloc[0] + converted.iloc[1]) == '0.30'
+
+
+def test_convert_columns_reports_each_conversion():
+    df = pd.DataFrame({'amount': ['1', None, '3'], 'flag': ['yes', 'no', 'maybe'], 'other': ['a', 'b', 'c']})
+    converted, report = convert_columns(df, {'amount': ('integer', None), 'flag': ('boolean', None),
+                                             'other': ('keep', None)})
+    assert set(converted) == {'amount', 'flag'}
+    report = report.set_index('column')
+    assert report.loc['amount', 'to'] == 'Int64'
+    assert report.loc['amount', 'converted'] == 2
+    assert report.loc['flag', 'coerced_to_null'] == 1
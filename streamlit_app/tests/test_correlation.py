@@ -0,0 +1,61 @@
+import numpy as np
+import pandas as pd
+
+from section.utils.correlation import correlation_matrix, dataset_correlation, strongest_pairs, update_correlation
+from section.utils.dataset import VersionedDataset
+
+
+def _frame(n=500):
+    rng = np.random.default_rng(0)
+    x = rng.normal(size=n)
+    df = pd.DataFrame({'x': x, 'y': 2 * x + rng.normal(scale=0.5, size=n), 'z': rng.normal(size=n),
+                       'balance': 1e9 + rng.normal(size=n), 'label': ['a'] * n})
+    df.loc[::7, 'y'] = np.nan
+    df['small'] = (df['z'] * 10).round().astype('int16')
+    return df
+
+
+def test_matches_pandas_with_missing_values():
+    df = _frame()
+    pd.testing.assert_frame_equal(correlation_matrix(df), df.drop(columns='label').corr(), atol=1e-9)
+
+
+def test_spearman_matches_pandas_on_complete_columns():
+    # With missing values pandas re-ranks every pair; here each column is ranked once
+    df = _frame().drop(columns='y')
+    pd.testing.assert_frame_equal(correlation_matrix(df, 'spearman'),
+                                  df.drop(columns='label').corr(method='spearman'), atol=1e-9)
+
+
+def test_float32_is_close_even_for_large_offsets():
+    df = _frame()
+    expected = df.drop(columns='label').corr()
+    assert np.allclose(correlation_matrix(df, dtype='float32'), expected, atol=1e-4)
+
+
+def test_update_recomputes_only_the_changed_columns():
+    df = _frame()
+    previous = correlation_matrix(df)
+    df['z'] = -df['z']
+    updated = update_correlation(df, previous, {'z'})
+    pd.testing.assert_frame_equal(updated, correlation_matrix(df), atol=1e-9)
+
+
+def test_dataset_correlation_follows_edits():
+    dataset = VersionedDataset(_frame())
+    before = dataset_correlation(dataset)
+    dataset.set_column('z', -dataset.current['z'])
+    after = dataset_correlation(dataset)
+    assert np.isclose(after.loc['x', 'z'], -before.loc['x', 'z'])
+
+
+def test_strongest_pairs():
+    pairs = strongest_pairs(correlation_matrix(_frame()), k=2)
+    assert len(pairs) == 2
+    assert set(pairs.loc[0, ['column_a', 'column_b']]) == {'z', 'small'}
+    assert set(pairs.loc[1, ['column_a', 'column_b']]) == {'x', 'y'}
+
+
+def test_constant_columns_have_no_correlation():
+    df = pd.DataFrame({'a': [1.0, 2.0, 3.0], 'b': [5.0, 5.0, 5.0]})
+    assert np.isnan(correlation_matrix(df).loc['a', 'b'])
@@ -0,0 +1,155 @@
+import numpy as np
+import pandas as pd
+
+from section.utils.dataset import VersionedDataset
+
+
+def _frame():
+    return pd.DataFrame({'accountID': np.arange(1, 6, dtype='int16'), 'balance': [10.0, 20.0, 30.0, 40.0, 50.0],
+                         'branch': pd.Categorical(['north', 'south', 'north', 'east', 'south'])})
+
+
+def test_set_cells_leaves_the_base_alone():
+    base = _frame()
+    dataset = VersionedDataset(base.copy())
+    dataset.set_cells('balance', [1, 3], [99.0, 77.0])
+
+    assert dataset.current['balance'].tolist() == [10.0, 99.0, 30.0, 77.0, 50.0]
+    pd.testing.assert_frame_equal(dataset.base, base)
+    assert dataset.changed_columns() == {'balance'}
+
+
+def test_undo_and_redo_replay_each_edit():
+    dataset = VersionedDataset(_frame())
+    dataset.set_cells('balance', [0], [1.0])
+    dataset.drop_columns(['branch'])
+
+    assert dataset.undo()
+    assert 'branch' in dataset.current.columns
+    assert dataset.undo()
+    pd.testing.assert_frame_equal(dataset.current, _frame())
+    assert not dataset.can_undo and not dataset.undo()
+
+    assert dataset.redo() and dataset.redo()
+    assert dataset.current['balance'].iloc[0] == 1.0
+    assert 'branch' not in dataset.current.columns
+    assert not dataset.can_redo and not dataset.redo()
+
+
+def test_a_new_edit_clears_redo():
+    dataset = VersionedDataset(_frame())
+    dataset.set_cells('balance', [0], [1.0])
+    dataset.undo()
+    dataset.set_cells('balance', [1], [2.0])
+    assert not dataset.can_redo
+
+
+def test_undo_restores_a_dtype_widened_by_nulls():
+    dataset = VersionedDataset(_frame())
+    dataset.set_cells('accountID', [2], [np.nan])
+    assert dataset.current['accountID'].isna().sum() == 1
+
+    dataset.undo()
+    assert dataset.current['accountID'].dtype == 'int16'
+    assert dataset.current['accountID'].tolist() == [1, 2, 3, 4, 5]
+
+
+def test_categorical_cells_take_new_categories():
+    dataset = VersionedDataset(_frame())
+    dataset.set_cells('branch', [0], ['west'])
+    assert isinstance(dataset.current['branch'].dtype, pd.CategoricalDtype)
+    assert dataset.current['branch'].iloc[0] == 'west'
+
+    dataset.undo()
+    assert dataset.current['branch'].iloc[0] == 'north'
+
+
+def test_row_inserts_and_deletes_undo():
+    dataset = VersionedDataset(_frame())
+    dataset.delete_rows([1, 2])
+    dataset.insert_rows(pd.DataFrame({'accountID': [9], 'balance': [9.0], 'branch': ['north']}, index=[9]))
+    assert dataset.current.index.tolist() == [0, 3, 4, 9]
+
+    dataset.undo()
+    dataset.undo()
+    pd.testing.assert_frame_equal(dataset.current, _frame())
+
+
+def test_update_columns_is_one_journal_entry():
+    dataset = VersionedDataset(_frame())
+    changed = dataset.update_columns({'balance': dataset.current['balance'] * 2,
+                                      'accountID': dataset.current['accountID']})
+    assert changed == 1
+    dataset.update_columns({'balance': dataset.current['balance'] + 1,
+                            'branch': dataset.current['branch'].astype(str)})
+    assert dataset.journal_length == 2
+
+    dataset.undo()
+    assert dataset.current['balance'].tolist() == [20.0, 40.0, 60.0, 80.0, 100.0]
+    assert isinstance(dataset.current['branch'].dtype, pd.CategoricalDtype)
+
+
+def test_apply_frame_records_the_editor_changes():
+    dataset = VersionedDataset(_frame())
+    edited = dataset.current.copy()
+    edited.loc[4, 'balance'] = 0.0
+    edited = edited.drop(index=0)
+
+    assert dataset.apply_frame(edited) == 2
+    assert dataset.current.index.tolist() == [1, 2, 3, 4]
+    assert dataset.current.loc[4, 'balance'] == 0.0
+
+
+def test_apply_frame_on_a_window_leaves_other_rows_alone():
+    dataset = VersionedDataset(_frame())
+    window = dataset.current.loc[[3, 4]].copy()
+    window.loc[3, 'balance'] = -1.0
+
+    dataset.apply_frame(window, labels=[3, 4])
+
+    assert dataset.current['balance'].tolist() == [10.0, 20.0, 30.0, -1.0, 50.0]
+
+
+def test_change_set_lists_edited_added_and_removed_cells():
+    dataset = VersionedDataset(_frame())
+    dataset.set_cells('balance', [1], [21.0])
+    dataset.delete_rows([4])
+    changes = dataset.change_set()
+
+    edited = changes[changes['change'] == 'edited']
+    assert edited[['row', 'column', 'old_value', 'new_value']].values.tolist() == [[1, 'balance', 20.0, 21.0]]
+    assert changes.loc[changes['change'] == 'removed', 'row'].tolist() == [4]
+
+
+def test_cached_recomputes_only_after_a_change():
+    dataset = VersionedDataset(_frame())
+    calls = []
+
+    def total(df):
+        calls.append(1)
+        return df['balance'].sum()
+
+    assert dataset.cached('total', total) == 150.0
+    assert dataset.cached('total', total) == 150.0
+    assert len(calls) == 1
+    dataset.set_cells('balance', [0], [0.0])
+    assert dataset.cached('total', total) == 140.0
+    assert len(calls) == 2
+
+
+def test_changes_since_and_rows_changed_since():
+    dataset = VersionedDataset(_frame())
+    start = dataset.version
+    dataset.set_cells('balance', [2], [0.0])
+    assert dataset.changes_since(start) == {'balance'}
+    assert dataset.rows_changed_since(start).tolist() == [2]
+    dataset.delete_rows([0])
+    assert dataset.changes_since(start) is None
+
+
+def test_compact_keeps_the_data_and_drops_the_history():
+    dataset = VersionedDataset(_frame())
+    dataset.set_cells('balance', [0], [5.0])
+    dataset.compact()
+    assert dataset.base['balance'].iloc[0] == 5.0
+    assert not dataset.can_undo and not dataset.can_redo
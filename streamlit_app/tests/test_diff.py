@@ -0,0 +1,59 @@
+import numpy as np
+import pandas as pd
+
+from section.utils.diff import CRITICAL_STYLE, EDITED_STYLE, NULL_STYLE, changed_cells, compute_change_masks, \
+    style_frame
+
+
+def _original():
+    return pd.DataFrame({'id': np.array([1, 2, 3], dtype='int8'), 'amount': [1.5, np.nan, 3.0],
+                         'branch': pd.Categorical(['north', 'south', 'north'])})
+
+
+def test_unchanged_frames_have_no_edits_even_across_dtypes():
+    original = _original()
+    widened = original.astype({'id': 'int64', 'branch': 'object'})
+    edited, nulls = compute_change_masks(widened, original)
+    assert not edited.to_numpy().any()
+    assert nulls['amount'].tolist() == [False, True, False]
+
+
+def test_edits_and_nulls_are_found_per_cell():
+    df = _original()
+    df.loc[0, 'amount'] = np.nan
+    df.loc[1, 'amount'] = 2.0
+    df.loc[2, 'branch'] = 'south'
+    edited, _ = compute_change_masks(df, _original())
+    assert edited.to_numpy().tolist() == [[False, True, False], [False, True, False], [False, False, True]]
+
+
+def test_added_rows_and_columns_count_as_edited_where_they_hold_values():
+    df = pd.concat([_original(), pd.DataFrame({'id': [4], 'amount': [np.nan], 'branch': ['east']}, index=[3])])
+    df['note'] = ['x', None, None, None]
+    edited, _ = compute_change_masks(df, _original())
+    assert edited.loc[3].tolist() == [True, False, True, False]
+    assert edited['note'].tolist() == [True, False, False, False]
+
+
+def test_changed_cells():
+    df = _original().drop(index=2).drop(columns='branch')
+    df.loc[0, 'amount'] = 9.0
+    changes = changed_cells(df, _original())
+    assert changes[['row', 'column', 'old_value', 'new_value', 'change']].values.tolist() == [
+        [0, 'amount', 1.5, 9.0, 'edited'],
+        [2, None, None, None, 'removed'],
+        [None, 'branch', None, None, 'removed'],
+    ]
+
+
+def test_style_frame_prefers_edits_then_nulls_then_critical():
+    df = _original()
+    edited = pd.DataFrame(False, index=df.index, columns=df.columns)
+    edited.loc[1, 'amount'] = True
+    nulls = df.isna()
+    nulls.loc[0, 'id'] = True
+    styles = style_frame(df, edited, nulls, ['id', 'amount'])
+    assert styles.loc[1, 'amount'] == EDITED_STYLE
+    assert styles.loc[0, 'id'] == NULL_STYLE
+    assert styles.loc[1, 'id'] == CRITICAL_STYLE
+    assert styles.loc[0, 'branch'] == ''
@@ -0,0 +1,59 @@
+import pandas as pd
+import pytest
+
+from section.utils import disk_cache
+
+pytest.importorskip('pyarrow')
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, 'CACHE_DIR', str(tmp_path))
+    return tmp_path
+
+
+def _frame():
+    return pd.DataFrame({'id': pd.array(range(100), dtype='int16'), 'branch': pd.Categorical(['n', 's'] * 50),
+                         'amount': [1.5] * 99 + [None]})
+
+
+def test_datasets_round_trip_with_their_report():
+    report = pd.DataFrame({'Column': ['id'], 'Before': ['int64'], 'After': ['int16']})
+    assert disk_cache.store_dataset('t1', _frame(), 'accounts.csv', report, {'id': 'int64'}, owner='alice')
+
+    frame, meta = disk_cache.load_dataset('t1')
+    pd.testing.assert_frame_equal(frame, _frame())
+    pd.testing.assert_frame_equal(meta['report'], report)
+    assert meta['original_dtypes'] == {'id': 'int64'}
+    assert meta['owners'] == ['alice']
+
+
+def test_owners_only_see_their_own_files():
+    disk_cache.store_dataset('t1', _frame(), 'a.csv', owner='alice')
+    disk_cache.store_dataset('t2', _frame(), 'b.csv', owner='bob')
+    disk_cache.add_owner('t2', 'alice')
+    assert set(disk_cache.list_datasets('alice')['token']) == {'t1', 't2'}
+    assert list(disk_cache.list_datasets('bob')['token']) == ['t2']
+
+    disk_cache.disown('t2', 'bob')
+    assert disk_cache.list_datasets('bob').empty
+
+
+def test_least_recently_opened_datasets_are_evicted():
+    disk_cache.store_dataset('old', _frame(), 'old.csv')
+    disk_cache.store_dataset('new', _frame(), 'new.csv')
+    size = int(disk_cache.list_datasets()['bytes'].max())
+    disk_cache.evict(budget=size)
+    assert list(disk_cache.list_datasets()['token']) == ['new']
+
+
+def test_damaged_files_are_dropped(cache_dir):
+    disk_cache.store_dataset('t1', _frame(), 'a.csv')
+    (cache_dir / 't1.arrow').write_bytes(b'not arrow')
+    assert disk_cache.load_dataset('t1') is None
+    assert disk_cache.load_meta('t1') is None
+
+
+def test_missing_tokens():
+    assert disk_cache.load_dataset('missing') is None
+    assert disk_cache.load_meta('missing') is None
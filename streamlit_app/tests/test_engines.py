@@ -0,0 +1,61 @@
+import json
+
+import pytest
+
+from section.utils import engines
+from section.utils.engines import DATA_DB, configure, get_engine, load_settings, pool_stats, reset_engines
+
+
+@pytest.fixture(autouse=True)
+def clean(monkeypatch):
+    for name in ('DATABASE_1_URL', engines.CONFIG_ENV, 'DB_POOL_SIZE'):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.setattr(engines, 'DB_PASS', None)
+    yield
+    reset_engines()
+
+
+def test_a_missing_password_is_an_error():
+    with pytest.raises(RuntimeError, match='DB_PASS'):
+        load_settings(DATA_DB)
+
+
+def test_password_from_the_environment(monkeypatch):
+    monkeypatch.setattr(engines, 'DB_PASS', 'secret')
+    url = load_settings(DATA_DB)['url']
+    assert url.password == 'secret' and url.database == DATA_DB
+
+
+def test_settings_precedence(tmp_path, monkeypatch):
+    config = tmp_path / 'db.json'
+    config.write_text(json.dumps({'defaults': {'pool_size': 2, 'max_overflow': 3},
+                                  DATA_DB: {'password': 'from-file', 'max_overflow': 4}}))
+    monkeypatch.setenv(engines.CONFIG_ENV, str(config))
+    monkeypatch.setenv('DB_POOL_SIZE', '7')
+
+    settings = load_settings(DATA_DB)
+    assert settings['url'].password == 'from-file'
+    assert 'password' not in settings
+    assert (settings['pool_size'], settings['max_overflow']) == (7, 4)
+
+    configure(DATA_DB, max_overflow=9)
+    assert load_settings(DATA_DB)['max_overflow'] == 9
+
+
+def test_url_from_the_environment(monkeypatch, tmp_path):
+    monkeypatch.setenv('DATABASE_1_URL', f"sqlite:///{tmp_path / 'data.db'}")
+    assert load_settings(DATA_DB)['url'].endswith('data.db')
+
+
+def test_engines_are_shared_and_rebuilt_after_configure(tmp_path):
+    configure(DATA_DB, url=f"sqlite:///{tmp_path / 'a.db'}")
+    engine = get_engine(DATA_DB)
+    assert get_engine(DATA_DB) is engine
+    with engine.connect():
+        pass
+    stats = {row['engine']: row for row in pool_stats()}
+    assert stats[DATA_DB]['checkouts'] == 1
+
+    configure(DATA_DB, url=f"sqlite:///{tmp_path / 'b.db'}")
+    assert get_engine(DATA_DB) is not engine
+    assert get_engine(DATA_DB).url.database.endswith('b.db')
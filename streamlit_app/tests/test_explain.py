@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import text
+
+from section.utils.explain import HISTORY_SIZE, explain_query, history_summary, record_query, supports_analyze
+from section.utils.schema import invalidate
+
+
+@pytest.fixture
+def accounts(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE accounts (id INTEGER PRIMARY KEY, owner TEXT, branch TEXT)"))
+    yield sqlite_engine
+    invalidate(sqlite_engine)
+
+
+def test_full_scans_suggest_an_index(accounts):
+    plan, warnings, seconds = explain_query(accounts, "SELECT * FROM accounts WHERE owner = 'x'")
+    assert not plan.empty and seconds >= 0
+    assert warnings == ["Full table scan on `accounts`; consider an index on `owner`."]
+
+
+def test_indexed_lookups_are_not_flagged(accounts):
+    with accounts.begin() as conn:
+        conn.execute(text("CREATE INDEX ix_owner ON accounts (owner)"))
+    invalidate(accounts)
+    assert explain_query(accounts, "SELECT * FROM accounts WHERE owner = 'x'")[1] == []
+    assert explain_query(accounts, "SELECT * FROM accounts WHERE id = 1")[1] == []
+
+
+def test_only_plain_queries_are_explained(accounts):
+    assert not supports_analyze(accounts)
+    with pytest.raises(ValueError):
+        explain_query(accounts, "DELETE FROM accounts")
+    with pytest.raises(ValueError):
+        explain_query(accounts, "WITH t AS (SELECT 1) DELETE FROM accounts")
+
+
+def test_history_summary_ignores_cached_runs_and_explains():
+    history = []
+    for seconds in (0.1, 0.3, 0.2):
+        record_query(history, "SELECT * FROM accounts", {'seconds': seconds, 'rows': 5})
+    record_query(history, "select *  from accounts", {'seconds': 9.0, 'rows': 5, 'cached': True})
+    record_query(history, "SELECT * FROM accounts", {'seconds': 9.0}, mode='explain')
+
+    summary = history_summary(history)
+    row = summary.loc['select * from accounts']
+    assert (row['runs'], row['median_s'], row['max_s'], row['last_s']) == (3, 0.2, 0.3, 0.2)
+
+
+def test_history_is_bounded():
+    history = []
+    for i in range(HISTORY_SIZE + 10):
+        record_query(history, f"SELECT {i}", {'seconds': 0.0})
+    assert len(history) == HISTORY_SIZE
+    assert history[-1]['query'] == f"select {HISTORY_SIZE + 9}"
@@ -0,0 +1,81 @@
+import gzip
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from section.utils import export
+from section.utils.export import available_formats, export_file, write_export
+
+
+def _frame(n=250):
+    return pd.DataFrame({'id': np.arange(n, dtype='int32'), 'amount': np.linspace(0, 1, n),
+                         'branch': pd.Categorical(['north', 'south'] * (n // 2) + ['east'] * (n % 2)),
+                         'when': pd.date_range('2026-01-01', periods=n, freq='h', tz='UTC'),
+                         'late': [None] * (n - 1) + ['x']})
+
+
+@pytest.fixture(autouse=True)
+def small_chunks(monkeypatch, tmp_path):
+    # Several chunks per file, including a column that is null in the first one
+    monkeypatch.setattr(export, 'CHUNK_ROWS', 100)
+    monkeypatch.setattr(export, 'EXPORT_DIR', str(tmp_path / 'exports'))
+    monkeypatch.setattr(export, '_files', type(export._files)())
+
+
+def _read(label, path):
+    if label.startswith('CSV'):
+        if label == 'CSV (zstd)':
+            import pyarrow as pa
+            with pa.input_stream(path, compression='zstd') as f:
+                return pd.read_csv(f)
+        return pd.read_csv(gzip.open(path) if label == 'CSV (gzip)' else path)
+    if label == 'Parquet':
+        return pd.read_parquet(path)
+    if label == 'Feather (Arrow IPC)':
+        return pd.read_feather(path)
+    return pd.read_excel(path)
+
+
+@pytest.mark.parametrize('label', available_formats())
+def test_every_format_round_trips(label, tmp_path):
+    frame = _frame()
+    path = tmp_path / f'out.{export.FORMATS[label][0]}'
+    write_export(frame, label, str(path))
+    back = _read(label, str(path))
+    assert len(back) == len(frame)
+    assert back['id'].tolist() == frame['id'].tolist()
+    assert back['late'].iloc[-1] == 'x'
+
+
+def test_arrow_formats_keep_dtypes(tmp_path):
+    pytest.importorskip('pyarrow')
+    frame = _frame()
+    path = str(tmp_path / 'out.parquet')
+    write_export(frame, 'Parquet', path)
+    back = pd.read_parquet(path)
+    assert back['id'].dtype == 'int32'
+    assert isinstance(back['branch'].dtype, pd.CategoricalDtype)
+
+
+def test_unknown_formats_are_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        write_export(_frame(), 'PDF', str(tmp_path / 'out.pdf'))
+
+
+def test_exports_are_reused_per_key():
+    first = export_file(_frame(), 'CSV', ('dataset', 1))
+    assert export_file(_frame(), 'CSV', ('dataset', 1)) == first
+    assert export_file(_frame(), 'CSV', ('dataset', 2)) != first
+
+
+def test_old_exports_are_evicted_but_never_the_newest(monkeypatch):
+    monkeypatch.setattr(export, 'EXPORT_CACHE_BYTES', 1)
+    first = export_file(_frame(), 'CSV', ('dataset', 1))
+    assert os.path.exists(first)  # larger than the budget, but just written
+
+    second = export_file(_frame(), 'CSV', ('dataset', 2))
+    assert export.cached_export(('dataset', 1), 'CSV') is None
+    assert not os.path.exists(first)
+    assert export.cached_export(('dataset', 2), 'CSV') == second
@@ -0,0 +1,97 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from section.utils import helper
+from section.utils.dataset import VersionedDataset
+from section.utils.engines import DATA_DB, USERS_DB, configure, reset_engines
+from section.utils.persistence import forget_table
+from section.utils.query_cache import clear_results
+
+
+@pytest.fixture(autouse=True)
+def databases(tmp_path):
+    configure(DATA_DB, url=f"sqlite:///{tmp_path / 'data.db'}")
+    configure(USERS_DB, url=f"sqlite:///{tmp_path / 'users.db'}")
+    yield
+    forget_table(helper.data_engine())
+    clear_results()
+    reset_engines()
+
+
+def _accounts():
+    return pd.DataFrame({'accountID': [1, 2, 3], 'balance': [10.0, 20.0, 30.0]})
+
+
+def test_saves_are_full_then_incremental():
+    ok, message = helper.save_dataframe_to_db(_accounts(), 'My Accounts')
+    assert ok and 'saved to `my_accounts`' in message
+
+    edited = _accounts()
+    edited.loc[0, 'balance'] = 11.0
+    ok, message = helper.save_dataframe_to_db(edited, 'My Accounts')
+    assert ok and '0 inserted, 1 updated, 0 deleted' in message
+
+    ok, message = helper.save_dataframe_to_db(edited, 'My Accounts', incremental=False)
+    assert 'saved to' in message
+
+
+def test_save_dataset_hashes_only_the_rows_edited_since_the_last_save():
+    dataset = VersionedDataset(_accounts())
+    helper.save_dataset(dataset, 'accounts')
+    dataset.set_cells('balance', [2], [0.0])
+    ok, message = helper.save_dataset(dataset, 'accounts')
+    assert ok and '1 updated' in message
+    assert helper.search_database("SELECT balance FROM accounts WHERE accountID = 3").iloc[0, 0] == 0.0
+
+
+def test_searches_are_cached_until_the_table_is_saved():
+    helper.save_dataframe_to_db(_accounts(), 'accounts')
+    first = helper.start_search("SELECT * FROM accounts").wait()
+    again = helper.start_search("select * from accounts").wait()
+    assert not first.stats['cached'] and again.stats['cached']
+    assert helper.search_is_current(again)
+
+    edited = _accounts()
+    edited.loc[1, 'balance'] = 0.0
+    helper.save_dataframe_to_db(edited, 'accounts')
+    assert not helper.search_is_current(again)
+    assert helper.search_database("SELECT balance FROM accounts WHERE accountID = 2").iloc[0, 0] == 0.0
+
+
+def test_other_statements_make_the_next_save_compare_against_the_database():
+    helper.save_dataframe_to_db(_accounts(), 'accounts')
+    with helper.data_engine().begin() as conn:
+        conn.execute(text("DELETE FROM accounts WHERE accountID = 1"))
+    handle = helper.start_search("CREATE INDEX ix_balance ON accounts (balance)").wait()
+    assert handle.error is None and handle.cache_key is None
+
+    ok, message = helper.save_dataframe_to_db(_accounts(), 'accounts')
+    assert 'saved to' in message
+    assert len(helper.search_database("SELECT * FROM accounts")) == 3
+
+
+def test_accounts_and_logins():
+    with helper.users_engine().begin() as conn:
+        for table in ('user_information', 'admin_information'):
+            conn.execute(text(f"CREATE TABLE {table} (userID INTEGER, username TEXT, password TEXT, email TEXT, "
+                              "signup_time TEXT, role TEXT)"))
+    assert helper.authenticate_account('alice', 'hash') is None
+    helper.insert_user(1, 'alice', 'hash', 'a@example.com', '2026-01-01', 'User')
+    helper.insert_admin(2, 'root', 'hash2', 'r@example.com', '2026-01-01', 'Admin')
+    assert helper.authenticate_account('alice', 'hash') == 'user'
+    assert helper.authenticate_account('root', 'hash2') == 'admin'
+
+
+@pytest.mark.parametrize('columns, critical', [
+    (['AccountNumber', 'notes', 'CardNumber'], ['AccountNumber', 'CardNumber']),
+    (['filename', 'comments'], []),
+])
+def test_identify_critical_columns(columns, critical):
+    assert helper.identify_critical_columns(columns) == critical
+
+
+def test_is_safe_sql():
+    assert helper.is_safe_sql("SELECT * FROM t", 'user')
+    assert not helper.is_safe_sql("delete from t", 'user')
+    assert helper.is_safe_sql("DROP TABLE t", 'admin')
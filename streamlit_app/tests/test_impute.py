@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from section.utils.dataset import VersionedDataset
+from section.utils.impute import check_step, dataset_preview, parse_constant, plan_preview, run_plan
+
+
+def _frame():
+    return pd.DataFrame({
+        'amount': [10.0, np.nan, 30.0, np.nan, 50.0],
+        'count': pd.array([1, None, 4, 4, None], dtype='Int16'),
+        'branch': pd.Categorical(['north', None, 'north', 'south', None]),
+        'region': ['a', 'a', 'b', 'b', 'b'],
+        'flag': pd.array([True, None, False, True, None], dtype='boolean'),
+    })
+
+
+def test_mean_fills_a_float_column():
+    filled = run_plan(_frame(), [('amount', 'mean', None, None)])
+    assert filled['amount'].tolist() == [10.0, 30.0, 30.0, 30.0, 50.0]
+
+
+def test_nullable_integer_columns_stay_integer():
+    filled = run_plan(_frame(), [('count', 'mean', None, None)])
+    assert filled['count'].dtype == 'Int16'
+    assert filled['count'].tolist() == [1, 3, 4, 4, 3]
+
+
+def test_categorical_constant_adds_the_category():
+    filled = run_plan(_frame(), [('branch', 'constant', 'east', None)])
+    assert isinstance(filled['branch'].dtype, pd.CategoricalDtype)
+    assert filled['branch'].tolist() == ['north', 'east', 'north', 'south', 'east']
+
+
+def test_categorical_mode_keeps_the_dtype():
+    filled = run_plan(_frame(), [('branch', 'mode', None, None)])
+    assert isinstance(filled['branch'].dtype, pd.CategoricalDtype)
+    assert filled['branch'].isna().sum() == 0
+
+
+def test_boolean_constant():
+    filled = run_plan(_frame(), [('flag', 'constant', 'no', None)])
+    assert filled['flag'].dtype == 'boolean'
+    assert filled['flag'].tolist() == [True, False, False, True, False]
+
+
+def test_group_strategies_use_the_group_statistic():
+    filled = run_plan(_frame(), [('amount', 'group mean', None, 'region'),
+                                 ('branch', 'group mode', None, 'region')])
+    assert filled['amount'].tolist() == [10.0, 10.0, 30.0, 40.0, 50.0]
+    assert filled['branch'].tolist() == ['north', 'north', 'north', 'south', 'north']
+
+
+def test_fills_and_statistics_come_from_the_data_before_the_plan():
+    filled = run_plan(_frame(), [('amount', 'forward fill', None, None), ('count', 'back fill', None, None)])
+    assert filled['amount'].tolist() == [10.0, 10.0, 30.0, 30.0, 50.0]
+    assert filled['count'].tolist() == [1, 4, 4, 4, pd.NA]
+
+
+@pytest.mark.parametrize('dtype, text, expected', [
+    ('Int8', '12', 12),
+    ('float64', '2.5', 2.5),
+    ('boolean', 'yes', True),
+    ('datetime64[ns]', '2026-01-31', pd.Timestamp('2026-01-31')),
+    ('object', ' text ', 'text'),
+])
+def test_parse_constant(dtype, text, expected):
+    assert parse_constant(pd.Series([], dtype=dtype), text) == expected
+
+
+@pytest.mark.parametrize('dtype, text', [('Int8', '300'), ('uint8', '-1'), ('int16', '1.5'), ('boolean', 'maybe'),
+                                         ('float64', '')])
+def test_parse_constant_rejects_values_that_do_not_fit(dtype, text):
+    with pytest.raises(ValueError):
+        parse_constant(pd.Series([], dtype=dtype), text)
+
+
+def test_steps_that_cannot_run_are_reported_and_skipped():
+    df = _frame()
+    assert check_step(df, 'branch', 'mean') == "mean needs a numeric column"
+    assert check_step(df, 'count', 'constant', '99999999') is not None
+    assert check_step(df, 'amount', 'group mean', group_by='amount') == "group by another column"
+    assert check_step(df, 'missing', 'mode') == "column not found"
+
+    plan = [('branch', 'mean', None, None), ('amount', 'median', None, None)]
+    filled = run_plan(df, plan)
+    assert set(filled) == {'amount'}
+    preview = plan_preview(df, plan, filled).set_index('column')
+    assert preview.loc['branch', 'problem'] == "mean needs a numeric column"
+    assert preview.loc['amount', 'filled'] == 2
+
+
+def test_dataset_preview_is_cached_per_version():
+    dataset = VersionedDataset(_frame())
+    plan = [('amount', 'mean', None, None)]
+    first = dataset_preview(dataset, plan)
+    assert dataset_preview(dataset, plan) is first
+    dataset.set_cells('amount', [1], [1.0])
+    assert dataset_preview(dataset, plan).loc[0, 'nulls_before'] == 1
@@ -0,0 +1,85 @@
+import io
+
+import pandas as pd
+import pytest
+
+from section.utils import ingest
+from section.utils.ingest import read_delimited, read_excel, read_json_lines, sniff_delimiter, sniff_encoding
+from section.utils.optimize import REPORT_COLUMNS
+
+CSV = 'accountID,balance,branch\n' + ''.join(f'{i},{i * 1.5},{"north" if i % 2 else "south"}\n'
+                                              for i in range(1, 101))
+
+
+@pytest.mark.parametrize('sample, encoding', [
+    (b'\xef\xbb\xbfa,b\n', 'utf-8-sig'),
+    ('a,b\nZürich,1\n'.encode('utf-8'), 'utf-8'),
+    ('a,b\nZürich,1\n'.encode('latin1'), 'latin1'),
+    ('a,b\n€'.encode('utf-8')[:-1], 'utf-8'),  # a character cut off by the end of the sample
+])
+def test_sniff_encoding(sample, encoding):
+    assert sniff_encoding(sample) == encoding
+
+
+@pytest.mark.parametrize('text, delimiter', [('a;b\n1;2\n3;4\n', ';'), ('a\tb\n1\t2\n3\t4\n', '\t'),
+                                             ('single\n', ',')])
+def test_sniff_delimiter(text, delimiter):
+    assert sniff_delimiter(text) == delimiter
+
+
+@pytest.mark.parametrize('use_arrow', [True, False])
+def test_read_delimited_optimizes_and_reports_the_parsed_dtypes(use_arrow):
+    if use_arrow:
+        pytest.importorskip('pyarrow')
+    progress = []
+    frame, report = read_delimited(io.BytesIO(CSV.encode()), progress=progress.append, use_arrow=use_arrow,
+                                   chunk_rows=30)
+
+    assert len(frame) == 100
+    assert frame['accountID'].dtype == 'int8'
+    assert isinstance(frame['branch'].dtype, pd.CategoricalDtype)
+    assert progress and progress[-1] == 1.0
+
+    assert list(report.columns) == REPORT_COLUMNS
+    report = report.set_index('Column')
+    assert report.loc['accountID', ['Before', 'After', 'Action']].tolist() == ['int64', 'int8', 'downcast']
+    assert report.loc['branch', 'Action'] == 'category'
+    assert report.loc['branch', 'Before (MB)'] > report.loc['branch', 'After (MB)']
+
+
+def test_chunks_with_different_types_report_the_combined_dtype():
+    # The first chunk only has whole numbers, the second a blank
+    text = 'id,amount\n' + ''.join(f'{i},{i}\n' for i in range(10)) + '10,\n'
+    frame, report = read_delimited(io.BytesIO(text.encode()), use_arrow=False, chunk_rows=10)
+    assert frame['amount'].isna().sum() == 1
+    assert report.set_index('Column').loc['amount', 'Before'] == 'float64'
+
+
+def test_latin1_past_the_sample_is_read_again(monkeypatch):
+    monkeypatch.setattr(ingest, 'SAMPLE_BYTES', 16)
+    text = 'name,city\n' + 'plain,text\n' * 5 + 'Müller,Zürich\n'
+    frame, _ = read_delimited(io.BytesIO(text.encode('latin1')))
+    assert frame['name'].iloc[-1] == 'Müller'
+    assert frame['city'].astype(str).iloc[-1] == 'Zürich'
+
+
+def test_semicolon_files_are_sniffed():
+    frame, _ = read_delimited(io.BytesIO(b'a;b\n1;2\n3;4\n'))
+    assert list(frame.columns) == ['a', 'b']
+
+
+def test_read_json_lines():
+    text = ''.join(f'{{"id": {i}, "kind": "{"a" if i % 2 else "b"}"}}\n' for i in range(50))
+    frame, report = read_json_lines(io.BytesIO(text.encode()), chunk_rows=20)
+    assert len(frame) == 50
+    assert isinstance(frame['kind'].dtype, pd.CategoricalDtype)
+    assert report.set_index('Column').loc['id', 'Action'] == 'downcast'
+
+
+def test_read_excel():
+    pytest.importorskip('openpyxl')
+    buffer = io.BytesIO()
+    pd.DataFrame({'id': range(10), 'amount': [1.25] * 10}).to_excel(buffer, index=False)
+    frame, report = read_excel(buffer)
+    assert frame['id'].dtype == 'int8'
+    assert report.set_index('Column').loc['id', 'Before'] == 'int64'
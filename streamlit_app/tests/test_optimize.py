@@ -0,0 +1,51 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from section.utils.optimize import content_hash, downcast_numeric, is_low_cardinality, optimize_dtypes
+
+
+@pytest.mark.parametrize('values, dtype', [
+    ([1, 2, 3], 'int8'),
+    ([1, 70_000], 'int32'),
+    ([1.0, 2.0, 3.0], 'int8'),
+    ([0.5, 1.25], 'float32'),
+    ([0.1, 0.2], 'float64'),  # not exact in float32
+    ([1.0, np.nan], 'float32'),  # whole numbers with a blank stay float
+])
+def test_downcast_numeric(values, dtype):
+    assert downcast_numeric(pd.Series(values)).dtype == dtype
+
+
+def test_downcast_leaves_booleans_text_and_nullable_columns_alone():
+    for series in (pd.Series([True, False]), pd.Series(['a']), pd.Series([1, None], dtype='Int64')):
+        assert downcast_numeric(series).dtype == series.dtype
+
+
+def test_unsigned_stays_unsigned():
+    assert downcast_numeric(pd.Series([1, 200], dtype='uint64')).dtype == 'uint8'
+
+
+def test_is_low_cardinality():
+    assert is_low_cardinality(pd.Series(['a', 'b'] * 10))
+    assert not is_low_cardinality(pd.Series([str(i) for i in range(20)]))
+    assert not is_low_cardinality(pd.Series([], dtype=object))
+
+
+def test_optimize_dtypes_reports_each_column():
+    df = pd.DataFrame({'id': range(100), 'branch': ['north', 'south'] * 50, 'name': [f'n{i}' for i in range(100)]})
+    optimized, report = optimize_dtypes(df)
+    report = report.set_index('Column')
+    assert report['Action'].to_dict() == {'id': 'downcast', 'branch': 'category', 'name': 'unchanged'}
+    assert isinstance(optimized['branch'].dtype, pd.CategoricalDtype)
+    assert df['id'].dtype == 'int64'  # the input is left alone
+
+
+def test_content_hash_depends_only_on_the_bytes():
+    first = io.BytesIO(b'a,b\n1,2\n')
+    first.seek(3)
+    assert content_hash(first) == content_hash(io.BytesIO(b'a,b\n1,2\n'))
+    assert first.tell() == 3
+    assert content_hash(io.BytesIO(b'a,b\n1,3\n')) != content_hash(first)
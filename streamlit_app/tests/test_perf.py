@@ -0,0 +1,63 @@
+import contextvars
+import json
+
+import pandas as pd
+import pytest
+
+from section.utils import perf
+
+
+@pytest.fixture
+def recording():
+    perf.set_enabled(True)
+    perf.clear()
+    yield
+    perf.set_enabled(False)
+    perf.clear()
+
+
+def test_nothing_is_recorded_while_disabled():
+    perf.set_enabled(False)
+    perf.clear()
+    with perf.span('idle') as timing:
+        timing.bytes = 10
+    perf.record('idle', 1.0)
+    assert perf.process.summary().empty
+
+
+def test_spans_and_decorators_are_aggregated(recording):
+    @perf.timed('db.read', bytes_of=perf.frame_bytes)
+    def read():
+        return pd.DataFrame({'a': range(10)})
+
+    read()
+    read()
+    with perf.span('page.render', kind='section') as timing:
+        timing.bytes = 5
+
+    summary = perf.process.summary().set_index('span')
+    assert summary.loc['db.read', 'calls'] == 2
+    assert summary.loc['db.read', 'bytes'] > 0
+    assert summary.loc['page.render', 'bytes'] == 5
+    assert list(perf.process.summary(kind='db')['span']) == ['db.read']
+
+
+def test_sessions_get_their_own_aggregates(recording):
+    mine = perf.Aggregates()
+
+    def session():
+        perf.bind_session(mine, 'alice')
+        perf.record('query.search', 0.5, 'query', attributes={'fingerprint': 'select ?'})
+
+    contextvars.copy_context().run(session)
+    assert mine.summary()['span'].tolist() == ['query.search']
+    event = json.loads(perf.export_jsonl().splitlines()[-1])
+    assert event['session'] == 'alice'
+    assert event['attributes'] == {'fingerprint': 'select ?'}
+
+
+def test_laps_time_consecutive_sections(recording):
+    timer = perf.laps('dashboard')
+    timer.lap('upload')
+    timer.lap('charts')
+    assert set(perf.process.summary()['span']) == {'dashboard.upload', 'dashboard.charts'}
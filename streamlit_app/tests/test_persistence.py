@@ -0,0 +1,116 @@
+import pandas as pd
+import pytest
+from sqlalchemy import text
+
+from section.utils.persistence import ROW_ID_COLUMN, detect_primary_key, forget_table, sync_dataframe
+
+
+@pytest.fixture(autouse=True)
+def _forget(sqlite_engine):
+    yield
+    forget_table(sqlite_engine)
+
+
+def _accounts(n=5):
+    return pd.DataFrame({'accountID': range(1, n + 1), 'balance': [100.0 * i for i in range(1, n + 1)],
+                         'owner': [f'owner{i}' for i in range(1, n + 1)]})
+
+
+def _table(engine, name='accounts'):
+    with engine.connect() as conn:
+        table = pd.read_sql(text(f"SELECT * FROM {name}"), conn)
+    return table.sort_values(table.columns[0]).reset_index(drop=True)
+
+
+def test_detect_primary_key():
+    assert detect_primary_key(_accounts()) == 'accountID'
+    assert detect_primary_key(pd.DataFrame({'accountID': [1, 1], 'x': [1, 2]})) is None
+    assert detect_primary_key(pd.DataFrame({'name': ['a', 'b']})) is None
+
+
+def test_first_save_is_a_full_replace(sqlite_engine):
+    df = _accounts()
+    result = sync_dataframe(df, 'accounts', sqlite_engine)
+    assert result.get('mode') != 'delta'
+    pd.testing.assert_frame_equal(_table(sqlite_engine), df, check_dtype=False)
+
+
+def test_second_save_writes_only_the_changes(sqlite_engine):
+    df = _accounts()
+    sync_dataframe(df, 'accounts', sqlite_engine)
+    edited = df.copy()
+    edited.loc[1, 'balance'] = 999.0
+    edited = pd.concat([edited.drop(index=4), pd.DataFrame({'accountID': [6], 'balance': [1.0], 'owner': ['new']})],
+                       ignore_index=True)
+
+    result = sync_dataframe(edited, 'accounts', sqlite_engine)
+
+    assert result == {'mode': 'delta', 'inserted': 1, 'updated': 1, 'deleted': 1}
+    pd.testing.assert_frame_equal(_table(sqlite_engine), edited.sort_values('accountID').reset_index(drop=True),
+                                  check_dtype=False)
+
+
+def test_unchanged_frame_writes_nothing(sqlite_engine):
+    df = _accounts()
+    sync_dataframe(df, 'accounts', sqlite_engine)
+    assert sync_dataframe(df, 'accounts', sqlite_engine) == {'mode': 'delta', 'inserted': 0, 'updated': 0,
+                                                               'deleted': 0}
+
+
+def test_outside_delete_forces_a_full_replace(sqlite_engine):
+    df = _accounts()
+    sync_dataframe(df, 'accounts', sqlite_engine)
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("DELETE FROM accounts WHERE accountID = 2"))
+
+    result = sync_dataframe(df, 'accounts', sqlite_engine)
+
+    assert result.get('mode') != 'delta'
+    assert len(_table(sqlite_engine)) == len(df)
+
+
+def test_schema_change_forces_a_full_replace(sqlite_engine):
+    df = _accounts()
+    sync_dataframe(df, 'accounts', sqlite_engine)
+    result = sync_dataframe(df.assign(branch='north'), 'accounts', sqlite_engine)
+    assert result.get('mode') != 'delta'
+    assert 'branch' in _table(sqlite_engine).columns
+
+
+def test_frames_without_a_key_use_the_row_id(sqlite_engine):
+    df = pd.DataFrame({'name': ['a', 'b', 'c'], 'amount': [1.5, 2.5, 3.5]})
+    sync_dataframe(df, 'notes', sqlite_engine)
+    edited = df.copy()
+    edited.loc[2, 'amount'] = 9.0
+
+    result = sync_dataframe(edited, 'notes', sqlite_engine)
+
+    assert result == {'mode': 'delta', 'inserted': 0, 'updated': 1, 'deleted': 0}
+    table = _table(sqlite_engine, 'notes')
+    assert ROW_ID_COLUMN in table.columns
+    assert table.loc[table[ROW_ID_COLUMN] == 2, 'amount'].item() == 9.0
+
+
+def test_forget_table_forces_a_full_replace(sqlite_engine):
+    df = _accounts()
+    sync_dataframe(df, 'accounts', sqlite_engine)
+    forget_table(sqlite_engine, 'accounts')
+    assert sync_dataframe(df, 'accounts', sqlite_engine).get('mode') != 'delta'
+
+
+def test_rows_since_hashes_only_the_hinted_rows(sqlite_engine):
+    df = _accounts()
+    sync_dataframe(df, 'accounts', sqlite_engine, tag=('upload', 0))
+    edited = df.copy()
+    edited.loc[3, 'owner'] = 'changed'
+    asked = []
+
+    def rows_since(version):
+        asked.append(version)
+        return pd.Index([3])
+
+    result = sync_dataframe(edited, 'accounts', sqlite_engine, tag=('upload', 1), rows_since=rows_since)
+
+    assert asked == [0]
+    assert result == {'mode': 'delta', 'inserted': 0, 'updated': 1, 'deleted': 0}
+    assert _table(sqlite_engine).loc[3, 'owner'] == 'changed'
@@ -0,0 +1,35 @@
+import numpy as np
+import pandas as pd
+
+from section.utils.profile import approx_distinct, numeric_summary_table, profile_dataframe
+
+
+def test_approx_distinct_is_close():
+    values = pd.Series(np.random.default_rng(0).integers(0, 50_000, size=200_000))
+    exact = values.nunique()
+    assert abs(approx_distinct(values) - exact) / exact < 0.03
+
+
+def test_approx_distinct_is_exact_enough_for_small_counts():
+    assert approx_distinct(pd.Series(['a', 'b', 'c', None, 'a'])) == 3
+    assert approx_distinct(pd.Series([], dtype=float)) == 0
+
+
+def test_profile_dataframe():
+    df = pd.DataFrame({'amount': [1.0, 2.0, np.nan, 4.0], 'branch': pd.Categorical(['n', 's', 'n', None]),
+                       'when': pd.to_datetime(['2026-01-01', None, '2026-03-01', '2026-02-01']),
+                       'flag': [True, False, True, True]})
+    profile = profile_dataframe(df)
+    assert profile.loc['amount', ['nulls', 'distinct', 'min', 'max', 'p50']].tolist() == [1, 3, 1.0, 4.0, 2.0]
+    assert profile.loc['branch', 'distinct'] == 2
+    assert profile.loc['when', 'min'] == pd.Timestamp('2026-01-01')
+    assert np.isnan(profile.loc['flag', 'mean'])
+    assert not profile['approximate'].any()
+    assert list(numeric_summary_table(profile).index) == ['amount']
+
+
+def test_large_frames_are_estimated():
+    df = pd.DataFrame({'n': np.arange(1000)})
+    profile = profile_dataframe(df, approx_threshold=100)
+    assert profile.loc['n', 'approximate']
+    assert abs(profile.loc['n', 'distinct'] - 1000) < 30
@@ -0,0 +1,87 @@
+import pytest
+from sqlalchemy import text
+
+from section.utils.query import QueryHandle, fingerprint_sql, is_select, normalize_sql
+
+
+def test_normalize_sql_leaves_quoted_text_alone():
+    assert normalize_sql("SELECT  *\n FROM t -- note\n WHERE name = 'A  B';") == "select * from t where name = 'A  B'"
+
+
+def test_fingerprint_sql_replaces_literals():
+    assert fingerprint_sql("SELECT * FROM t WHERE id = 42 AND name = 'x'") == \
+        fingerprint_sql("select * from t where id = 7 and name = 'y'") == \
+        "select * from t where id = ? and name = ?"
+    assert fingerprint_sql("SELECT * FROM t WHERE id IN (1, 2, 3)") == "select * from t where id in (?)"
+    assert fingerprint_sql("SELECT `col1` FROM t2") == "select `col1` from t2"
+
+
+@pytest.mark.parametrize('sql', [
+    "SELECT * FROM t",
+    "  select 1;",
+    "-- comment\nSELECT 1",
+    "WITH t AS (SELECT 1) SELECT * FROM t",
+    "WITH RECURSIVE r(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM r WHERE n < 5), b AS (SELECT 2) SELECT * FROM r, b",
+    "SELECT 'a;b', 'for update', `into` FROM t",
+    "SELECT (SELECT max(x) FROM (SELECT 1 x) s) FROM t",
+])
+def test_is_select_accepts_plain_queries(sql):
+    assert is_select(sql)
+
+
+@pytest.mark.parametrize('sql', [
+    "DELETE FROM t",
+    "WITH t AS (SELECT 1) DELETE FROM x WHERE id IN (SELECT * FROM t)",
+    "WITH t AS (SELECT 1) INSERT INTO x SELECT * FROM t",
+    "SELECT * FROM t FOR UPDATE",
+    "SELECT * FROM t FOR SHARE",
+    "SELECT * FROM t LOCK IN SHARE MODE",
+    "SELECT * INTO copy FROM t",
+    "SELECT * FROM t INTO OUTFILE '/tmp/t.csv'",
+    "SELECT 1; DROP TABLE t",
+    "WITH x AS SELECT 1",
+    "",
+])
+def test_is_select_rejects_everything_else(sql):
+    assert not is_select(sql)
+
+
+@pytest.fixture
+def numbers(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE numbers (n INTEGER)"))
+        conn.execute(text("INSERT INTO numbers VALUES " + ', '.join(f'({i})' for i in range(25))))
+    return sqlite_engine
+
+
+def test_pages_are_read_from_the_cursor(numbers):
+    sql = "SELECT n FROM numbers ORDER BY n"
+    first = QueryHandle(numbers, sql, page=0, row_cap=10).start().wait()
+    assert first.error is None
+    assert first.frame['n'].tolist() == list(range(10))
+    assert first.stats['has_more']
+
+    last = QueryHandle(numbers, sql, **first.page_limits(2)).start().wait()
+    assert last.frame['n'].tolist() == list(range(20, 25))
+    assert not last.stats['has_more']
+
+
+def test_byte_budget_stops_reading(numbers):
+    handle = QueryHandle(numbers, "SELECT n FROM numbers", byte_budget=1).start().wait()
+    assert handle.stats['stopped_by'] == 'byte budget'
+    assert handle.stats['has_more']
+
+
+def test_errors_are_kept_on_the_handle(numbers):
+    handle = QueryHandle(numbers, "SELECT * FROM missing").start().wait()
+    assert handle.frame is None
+    assert 'missing' in str(handle.error)
+
+
+def test_other_statements_run_once(numbers):
+    done = []
+    handle = QueryHandle(numbers, "CREATE TABLE copy (n INTEGER)", on_done=done.append).start().wait()
+    assert handle.error is None and handle.frame is None
+    assert done == [handle]
+    with numbers.connect() as conn:
+        assert conn.execute(text("SELECT COUNT(*) FROM copy")).scalar() == 0
@@ -0,0 +1,66 @@
+import pandas as pd
+import pytest
+from sqlalchemy import create_engine
+
+from section.utils.query_cache import bump_table, cache_key, cache_stats, clear_results, get_result, put_result
+
+
+@pytest.fixture
+def engines(tmp_path):
+    data = create_engine(f"sqlite:///{tmp_path / 'data.db'}")
+    users = create_engine(f"sqlite:///{tmp_path / 'users.db'}")
+    yield data, users
+    clear_results()
+
+
+def test_only_plain_queries_have_a_key(engines):
+    data, _ = engines
+    assert cache_key(data, "SELECT * FROM accounts", 0, 100) is not None
+    assert cache_key(data, "DELETE FROM accounts", 0, 100) is None
+    assert cache_key(data, "SELECT * FROM accounts FOR UPDATE", 0, 100) is None
+
+
+def test_key_ignores_case_and_whitespace_but_not_the_page(engines):
+    data, _ = engines
+    key = cache_key(data, "SELECT * FROM accounts", 0, 100)
+    assert cache_key(data, "select *\n  from accounts;", 0, 100) == key
+    assert cache_key(data, "SELECT * FROM accounts", 1, 100) != key
+
+
+def test_changing_a_table_changes_the_keys_that_read_it(engines):
+    data, _ = engines
+    accounts = cache_key(data, "SELECT * FROM accounts", 0, 100)
+    branches = cache_key(data, "SELECT * FROM branches", 0, 100)
+    bump_table(data, 'accounts')
+    assert cache_key(data, "SELECT * FROM accounts", 0, 100) != accounts
+    assert cache_key(data, "SELECT * FROM branches", 0, 100) == branches
+    bump_table(data)
+    assert cache_key(data, "SELECT * FROM branches", 0, 100) != branches
+
+
+def test_a_change_in_another_database_invalidates_qualified_reads(engines):
+    data, users = engines
+    sql = "SELECT * FROM database_2.user_information"
+    key = cache_key(data, sql, 0, 100)
+    bump_table(users, 'user_information')
+    assert cache_key(data, sql, 0, 100) != key
+
+
+def test_results_are_evicted_least_recently_used_first(engines):
+    frame = pd.DataFrame({'n': range(100)})
+    size = int(frame.memory_usage(deep=True, index=True).sum())
+    evictions = cache_stats()['evictions']
+    put_result('a', frame, {'rows': 100}, budget=2 * size)
+    put_result('b', frame, {'rows': 100}, budget=2 * size)
+    assert get_result('a') is not None  # 'a' is now the most recent
+    put_result('c', frame, {'rows': 100}, budget=2 * size)
+
+    assert get_result('b') is None
+    assert get_result('a')[1] == {'rows': 100}
+    stats = cache_stats()
+    assert stats['entries'] == 2 and stats['evictions'] == evictions + 1
+
+
+def test_results_larger_than_the_budget_are_not_kept(engines):
+    put_result('big', pd.DataFrame({'n': range(1000)}), {}, budget=10)
+    assert get_result('big') is None
@@ -0,0 +1,54 @@
+import pytest
+from sqlalchemy import text
+
+from section.utils.schema import invalidate, is_ddl, table_info, table_names, table_stats
+
+
+@pytest.fixture
+def engine(sqlite_engine):
+    with sqlite_engine.begin() as conn:
+        conn.execute(text("CREATE TABLE accounts (id INTEGER PRIMARY KEY, owner TEXT)"))
+        conn.execute(text("CREATE INDEX ix_owner ON accounts (owner)"))
+        conn.execute(text("INSERT INTO accounts VALUES (1, 'a'), (2, 'b')"))
+    yield sqlite_engine
+    invalidate(sqlite_engine)
+
+
+@pytest.mark.parametrize('sql, ddl', [('CREATE TABLE t (a int)', True), ('  drop table t', True),
+                                      ('TRUNCATE t', True), ('SELECT 1', False), ('DELETE FROM t', False)])
+def test_is_ddl(sql, ddl):
+    assert is_ddl(sql) == ddl
+
+
+def test_table_info(engine):
+    info = table_info(engine, 'accounts')
+    assert [c['name'] for c in info['columns']] == ['id', 'owner']
+    assert info['primary_key'] == 'id'
+    assert info['indexes'] == [{'name': 'ix_owner', 'columns': ['owner'], 'unique': False}]
+
+
+def test_catalog_answers_are_cached_until_invalidated(engine):
+    assert table_names(engine) == ['accounts']
+    assert table_stats(engine).set_index('table').loc['accounts', 'rows'] == 2
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE branches (id INTEGER)"))
+        conn.execute(text("INSERT INTO accounts VALUES (3, 'c')"))
+    assert table_names(engine) == ['accounts']
+
+    invalidate(engine)
+    assert table_names(engine) == ['accounts', 'branches']
+    assert table_stats(engine).set_index('table').loc['accounts', 'rows'] == 3
+
+
+def test_invalidating_one_table_keeps_the_others(engine):
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE branches (id INTEGER)"))
+    table_info(engine, 'accounts')
+    table_info(engine, 'branches')
+    with engine.begin() as conn:
+        conn.execute(text("ALTER TABLE branches ADD COLUMN name TEXT"))
+        conn.execute(text("ALTER TABLE accounts ADD COLUMN note TEXT"))
+
+    invalidate(engine, 'branches')
+    assert len(table_info(engine, 'branches')['columns']) == 2
+    assert len(table_info(engine, 'accounts')['columns']) == 2
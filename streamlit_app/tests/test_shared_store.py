@@ -0,0 +1,69 @@
+import gc
+
+import pandas as pd
+import pytest
+
+from section.utils import disk_cache, shared_store
+
+
+@pytest.fixture(autouse=True)
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(disk_cache, 'CACHE_DIR', str(tmp_path))
+    monkeypatch.setattr(shared_store, '_entries', type(shared_store._entries)())
+    yield
+
+
+def _frame(n=100):
+    return pd.DataFrame({'accountID': range(n), 'balance': [1.5] * n})
+
+
+def test_sessions_share_one_frame():
+    first, meta = shared_store.share('t1', _frame(), 'accounts.csv', session='alice')
+    second, _ = shared_store.share('t1', _frame(), 'accounts.csv', session='bob')
+    assert meta['name'] == 'accounts.csv'
+    assert first.base is second.base
+    assert shared_store.holders('t1') == 2
+    assert shared_store.usage()[0].loc[0, 'sessions'] == 'alice, bob'
+
+
+def test_edits_do_not_reach_the_shared_frame():
+    first, _ = shared_store.share('t1', _frame(), 'accounts.csv')
+    second, _ = shared_store.lookup('t1')
+    first.set_cells('balance', [0], [99.0])
+    assert second.current.loc[0, 'balance'] == 1.5
+
+
+def test_holds_end_when_the_dataset_is_dropped():
+    dataset, _ = shared_store.share('t1', _frame(), 'accounts.csv')
+    assert shared_store.holders('t1') == 1
+    del dataset
+    gc.collect()
+    assert shared_store.holders('t1') == 0
+
+
+def test_held_datasets_are_never_spilled():
+    dataset, _ = shared_store.share('t1', _frame(), 'accounts.csv')
+    assert shared_store.trim(budget=0) == 0
+    assert shared_store.lookup('t1') is not None
+    del dataset
+
+
+def test_idle_datasets_spill_to_disk_and_come_back():
+    pytest.importorskip('pyarrow')
+    report = pd.DataFrame({'Column': ['balance'], 'Before': ['float64']})
+    dataset, _ = shared_store.share('t1', _frame(), 'accounts.csv', report, {'balance': 'float64'})
+    del dataset
+    gc.collect()
+
+    assert shared_store.trim(budget=0) == 1
+    assert shared_store.holders('t1') == 0
+    assert disk_cache.load_meta('t1') is not None
+
+    reloaded, meta = shared_store.lookup('t1', session='alice')
+    pd.testing.assert_frame_equal(reloaded.current, _frame())
+    assert meta['original_dtypes'] == {'balance': 'float64'}
+    pd.testing.assert_frame_equal(meta['report'], report)
+
+
+def test_unknown_tokens_are_not_found():
+    assert shared_store.lookup('missing') is None
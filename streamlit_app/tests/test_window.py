@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from section.utils.dataset import VersionedDataset
+from section.utils.window import change_summary, dataset_null_counts, dataset_window_order, page_of, window_order
+
+
+def _frame():
+    return pd.DataFrame({'id': [3, 1, 2, 5, 4], 'owner': ['Ann', 'bob', None, 'ANNA', 'cy'],
+                         'branch': pd.Categorical(['North', 'south', 'north', 'east', 'North']),
+                         'amount': [5.0, np.nan, 1.0, 3.0, 2.0]})
+
+
+def test_filter_is_case_insensitive_and_skips_nulls():
+    assert window_order(_frame(), 'owner', 'ann').tolist() == [0, 3]
+    assert window_order(_frame(), 'branch', 'NORTH').tolist() == [0, 2, 4]
+
+
+def test_sort_puts_nulls_last():
+    assert window_order(_frame(), sort_column='amount').tolist() == [2, 4, 3, 0, 1]
+    assert window_order(_frame(), sort_column='amount', descending=True).tolist() == [0, 3, 4, 2, 1]
+
+
+def test_filter_then_sort():
+    assert window_order(_frame(), 'branch', 'north', 'id', descending=True).tolist() == [4, 0, 2]
+
+
+def test_page_of():
+    df = _frame()
+    positions = window_order(df, sort_column='id')
+    assert page_of(df, positions, 1, 2)['id'].tolist() == [3, 4]
+
+
+def test_dataset_window_order_keeps_the_order_for_other_edits():
+    dataset = VersionedDataset(_frame())
+    first = dataset_window_order(dataset, sort_column='id')
+    dataset.set_cells('owner', [0], ['zed'])
+    assert dataset_window_order(dataset, sort_column='id') is first
+    dataset.set_cells('id', [0], [0])
+    assert dataset_window_order(dataset, sort_column='id').tolist()[0] == 0
+
+
+def test_null_counts_and_change_summary():
+    dataset = VersionedDataset(_frame())
+    assert dataset_null_counts(dataset).to_dict() == {'id': 0, 'owner': 1, 'branch': 0, 'amount': 1}
+    dataset.set_cells('amount', [1, 2], [7.0, np.nan])
+    nulls = dataset_null_counts(dataset)
+    assert nulls['amount'] == 1
+
+    summary = change_summary(dataset.change_set(), nulls).set_index('column')
+    assert summary.loc['amount', 'changed'] == 2
+    assert summary.loc['id', 'changed'] == 0